@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from ascii_engine import image_to_pixels, lut_encoding, output_size
+from ascii_glyphs import resize_subpixels
+from ascii_modes import MODE_SHAPE, MODE_THRESHOLD, render_codes
+
+# ASCII animation file (.asciianim): UTF-8 JSON lines.
+#   line 1:  {"format": "asciianim", "version": 1, "width": W, "height": H}
+#   frames:  {"delay": ms, "rows": [[row_index, "row text"], ...]}
+# The first frame lists every row; later frames list only rows that differ
+# from the previous frame, so static regions cost nothing.
+ANIMATION_FORMAT = 'asciianim'
+ANIMATION_VERSION = 1
+DEFAULT_DELAY = 100 # GIFs without a duration play at 10 fps
+
+
+def is_animated(path):
+    try:
+        with Image.open(path) as img:
+            return getattr(img, 'is_animated', False)
+    except Exception:
+        return False
+
+
+def iter_frames(path):
+    # Frames are decoded one at a time as the caller advances
+    with Image.open(path) as img:
+        for frame in ImageSequence.Iterator(img):
+            yield frame, frame.info.get('duration') or DEFAULT_DELAY
+
+
+def iter_ascii_frames(path, new_width, chars, mode=MODE_THRESHOLD, glyph_index=None):
+    # Yields (delay, changed rows); only the previous frame's codes are kept
+    encoding = lut_encoding(chars)
+    previous = None
+    for frame, delay in iter_frames(path):
+        if mode == MODE_SHAPE:
+            pixels = resize_subpixels(frame, output_size(frame.size, new_width))
+        else:
+            pixels = image_to_pixels(frame, new_width)
+        codes = render_codes(pixels, chars, mode, glyph_index)
+        if previous is None or previous.shape != codes.shape:
+            changed = np.arange(codes.shape[0])
+        else:
+            changed = np.flatnonzero((codes != previous).any(axis=1))
+        rows = [(int(i), codes[i].tobytes().decode(encoding)) for i in changed]
+        previous = codes
+        yield delay, rows
+
+
+def write_animation(path, out_path, new_width, chars, should_stop=None, mode=MODE_THRESHOLD, glyph_index=None):
+    # Streams frames to disk; returns the number of frames written
+    frame_count = 0
+    with open(out_path, 'w', encoding='utf-8') as f:
+        header_written = False
+        for delay, rows in iter_ascii_frames(path, new_width, chars, mode, glyph_index):
+            if should_stop is not None and should_stop():
+                break
+            if not header_written:
+                height = len(rows)
+                width = len(rows[0][1]) if rows else 0
+                f.write(json.dumps({'format': ANIMATION_FORMAT, 'version': ANIMATION_VERSION,
+                                    'width': width, 'height': height}) + '\n')
+                header_written = True
+            f.write(json.dumps({'delay': delay, 'rows': rows}, ensure_ascii=False) + '\n')
+            frame_count += 1
+    return frame_count
+
+
+def iter_animation(anim_path):
+    # Yields (delay, changed rows) exactly as stored; players apply the rows
+    # onto their current frame instead of rebuilding it
+    with open(anim_path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != ANIMATION_FORMAT:
+            raise ValueError(f"{anim_path} is not an ASCII animation file")
+        for line in f:
+            if line.strip():
+                frame = json.loads(line)
+                yield frame['delay'], frame['rows']
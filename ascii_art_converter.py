@@ -1,14 +1,161 @@
+import os
+import shutil
 import sys
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QLabel, QFileDialog, QLineEdit, QComboBox
-from PyQt5.QtGui import QPixmap, QImage, QFont, QFontDatabase
-from PyQt5.QtCore import Qt
-from PIL import Image
+import tempfile
+
+if __name__ == '__main__' and len(sys.argv) > 1:
+    # Command-line batch mode: dispatch before PyQt5 is imported
+    from ascii_batch import main
+    sys.exit(main(sys.argv[1:]))
+
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QLineEdit, QComboBox, QCheckBox
+from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from ascii_engine import CHAR_SETS, DEFAULT_WIDTH, load_thumbnail, open_grayscale, preview_pixels, resize_pixels, write_text
+from ascii_animation import is_animated, iter_animation, write_animation
+from ascii_cache import ConversionCache, default_cache_dir
+from ascii_color import iter_ansi, iter_html, open_color, palette_rgb, quantize, rgb_to_gray, write_colored
+from ascii_glyphs import load_glyph_index, open_subpixels
+from ascii_modes import MODE_SHAPE, MODE_THRESHOLD, RENDER_MODES, codes_to_ascii, render, render_codes
+from ascii_viewer import AsciiView
+
+RERENDER_DELAY = 300 # ms to wait after the last settings edit before re-rendering
+
+class ConversionThread(QThread):
+    conversion_preview = pyqtSignal(int, str)
+    conversion_finished = pyqtSignal(int, str)
+    animation_finished = pyqtSignal(int, str)
+    color_finished = pyqtSignal(int, str, object, object)
+    conversion_failed = pyqtSignal(int, str)
+
+    def __init__(self, job_id, image_path, new_width, chars, cache, color=False, mode=MODE_THRESHOLD, glyph_index=None):
+        super().__init__()
+        self.color = color
+        self.mode = mode
+        self.glyph_index = glyph_index # Built on the GUI thread from the viewer font in MODE_SHAPE
+        self.job_id = job_id
+        self.cache = cache
+        self.image_path = image_path
+        self.new_width = new_width
+        self.chars = chars
+        self.cancelled = False
+
+    def cancel(self):
+        # Checked between stages; a superseded job stops at the next one
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if is_animated(self.image_path):
+                fd, anim_path = tempfile.mkstemp(suffix='.asciianim')
+                os.close(fd)
+                write_animation(self.image_path, anim_path, self.new_width, self.chars,
+                                should_stop=lambda: self.cancelled, mode=self.mode, glyph_index=self.glyph_index)
+                if self.cancelled:
+                    os.remove(anim_path)
+                    return
+                self.animation_finished.emit(self.job_id, anim_path)
+                return
+
+            # Repeated width/charset toggles are served from the cache
+            digest = self.cache.file_digest(self.image_path)
+
+            if self.color:
+                rgb = self.cache.get_pixels(digest, self.new_width, 'RGB')
+                if rgb is None:
+                    rgb = open_color(self.image_path, self.new_width)
+                    self.cache.put_pixels(digest, self.new_width, rgb, 'RGB')
+                if self.cancelled:
+                    return
+                if self.mode == MODE_SHAPE:
+                    codes = render_codes(self.shapePixels(digest), self.chars, self.mode, self.glyph_index)
+                else:
+                    codes = render_codes(rgb_to_gray(rgb), self.chars, self.mode)
+                indices = quantize(rgb)
+                final_ascii_art = codes_to_ascii(codes, self.chars)
+                if self.cancelled:
+                    return
+                self.color_finished.emit(self.job_id, final_ascii_art, codes, indices)
+                return
+
+            if self.mode == MODE_THRESHOLD:
+                render_mode = None
+            elif self.mode == MODE_SHAPE:
+                render_mode = (self.mode, self.glyph_index.font_key)
+            else:
+                render_mode = self.mode
+            final_ascii_art = self.cache.get_ascii(digest, self.new_width, self.chars, render_mode)
+            if final_ascii_art is not None:
+                self.conversion_finished.emit(self.job_id, final_ascii_art)
+                return
+
+            if self.mode == MODE_SHAPE:
+                final_ascii_art = render(self.shapePixels(digest), self.chars, self.mode, self.glyph_index)
+                self.cache.put_ascii(digest, self.new_width, self.chars, final_ascii_art, render_mode)
+                if self.cancelled:
+                    return
+                self.conversion_finished.emit(self.job_id, final_ascii_art)
+                return
+
+            pixels = self.cache.get_pixels(digest, self.new_width)
+            if pixels is None:
+                # Decoded at reduced scale: memory follows the output grid, not the source
+                img, target_size = open_grayscale(self.image_path, self.new_width)
+                if self.cancelled:
+                    return
+                self.conversion_preview.emit(self.job_id, render(preview_pixels(img, target_size), self.chars, self.mode))
+                if self.cancelled:
+                    return
+                pixels = resize_pixels(img, target_size)
+                self.cache.put_pixels(digest, self.new_width, pixels)
+                if self.cancelled:
+                    return
+
+            final_ascii_art = render(pixels, self.chars, self.mode)
+            self.cache.put_ascii(digest, self.new_width, self.chars, final_ascii_art, render_mode)
+            if self.cancelled:
+                return
+            self.conversion_finished.emit(self.job_id, final_ascii_art)
+
+        except Exception as e:
+            self.conversion_failed.emit(self.job_id, str(e))
+
+    def shapePixels(self, digest):
+        # Grayscale sampled per glyph feature, cached next to the per-cell pixels
+        pixels = self.cache.get_pixels(digest, self.new_width, 'shape')
+        if pixels is None:
+            pixels = open_subpixels(self.image_path, self.new_width)
+            self.cache.put_pixels(digest, self.new_width, pixels, 'shape')
+        return pixels
 
 class AsciiArtConverter(QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
         self.image_path = None
+        self.ascii_text = None # Last full render; saved straight to disk from here
+        self.color_result = None # (character codes, palette indices, chars) in color mode
+
+        # Animated GIF playback: frames are read lazily from a converted .asciianim file
+        self.animation_path = None
+        self.animation_frames = None
+        self.animation_timer = QTimer(self)
+        self.animation_timer.setSingleShot(True)
+        self.animation_timer.timeout.connect(self.nextAnimationFrame)
+
+        # Conversion runs in ConversionThread; only the newest job's results are shown
+        self.conversion_job_id = 0
+        self.conversion_thread = None
+        self.conversion_threads = set() # Keeps cancelled threads alive until they exit
+        self.cache = ConversionCache(disk_dir=default_cache_dir())
+        self.rerender_timer = QTimer(self)
+        self.rerender_timer.setSingleShot(True)
+        self.rerender_timer.setInterval(RERENDER_DELAY)
+        self.rerender_timer.timeout.connect(self.autoRerender)
+        self.width_input.textEdited.connect(self.rerender_timer.start)
+        self.char_set_combo.currentIndexChanged.connect(self.rerender_timer.start)
+        self.color_checkbox.toggled.connect(self.rerender_timer.start)
+        self.mode_combo.currentIndexChanged.connect(self.rerender_timer.start)
 
     def initUI(self):
         self.setWindowTitle('ASCII Art Converter')
@@ -43,25 +190,27 @@ class AsciiArtConverter(QWidget):
         settings_layout = QHBoxLayout()
 
         settings_layout.addWidget(QLabel('Output Width:'))
-        self.width_input = QLineEdit('100') # Default width
+        self.width_input = QLineEdit(str(DEFAULT_WIDTH)) # Default width
         self.width_input.setFixedWidth(50)
         settings_layout.addWidget(self.width_input)
 
         settings_layout.addWidget(QLabel('Character Set:'))
         self.char_set_combo = QComboBox()
-        self.char_set_combo.addItem('''@%#*+=-:. ''') # Dark to Light (Simple)
-        self.char_set_combo.addItem(''' .:-=+*#%@''') # Light to Dark (Simple)
-        self.char_set_combo.addItem(''' .'`^",:;Il!i><~+_-?][}{1)(|\/tfjrxnumbROZCXJUVYPGQ$8&B@WM#''') # More detailed
-        self.char_set_combo.addItem(''' .'`^",:;Il!i><~+_-?][}{1)(|\/tfjrxnumbROZCXJUVYPGQ$8&B@WM#'''.replace(" ", "")) # More detailed (no spaces)
-        self.char_set_combo.addItem(''' .:-=+*#%@''') # Simple reversed
-        self.char_set_combo.addItem(''' .:-=+*#%@'''.replace(" ", "")) # Simple reversed (no spaces)
-        self.char_set_combo.addItem('''█▓▒░ ''') # Blocks
-        self.char_set_combo.addItem('''░▒▓█''') # Blocks reversed
-        self.char_set_combo.addItem('''MNHQ$OC?7>!:-;. ''') # Another common set
-        self.char_set_combo.addItem('''$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/\\|()1{}[]?-_+~<>i!lI;:,"^`'. ''') # Very detailed
+        self.char_set_combo.addItems(CHAR_SETS)
         settings_layout.addWidget(self.char_set_combo)
 
+        settings_layout.addWidget(QLabel('Mode:'))
+        self.mode_combo = QComboBox() # Brightness threshold, error-diffusion dithering or Sobel edges
+        self.mode_combo.addItems(RENDER_MODES)
+        settings_layout.addWidget(self.mode_combo)
+
+        self.color_checkbox = QCheckBox('Color') # Keep RGB and emit colored spans
+        settings_layout.addWidget(self.color_checkbox)
+
         settings_layout.addStretch(1) # Push elements to the left
+
+        self.cache_label = QLabel('') # Cache hit/miss counters
+        settings_layout.addWidget(self.cache_label)
         main_layout.addLayout(settings_layout)
 
         # Image preview and ASCII art display section
@@ -73,13 +222,8 @@ class AsciiArtConverter(QWidget):
         self.image_preview.setStyleSheet("border: 1px solid gray;")
         content_layout.addWidget(self.image_preview)
 
-        self.ascii_output = QTextEdit()
-        self.ascii_output.setReadOnly(True)
-        # Set a fixed-width font for ASCII art display
-        fixed_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
-        fixed_font.setPointSize(5) # Adjust font size as needed
-        self.ascii_output.setFont(fixed_font)
-        self.ascii_output.setLineWrapMode(QTextEdit.NoWrap) # No word wrap
+        # Virtualized fixed-width viewer: paints only the visible rows (Ctrl+wheel zooms)
+        self.ascii_output = AsciiView()
         content_layout.addWidget(self.ascii_output)
 
         main_layout.addLayout(content_layout)
@@ -87,11 +231,15 @@ class AsciiArtConverter(QWidget):
         self.setLayout(main_layout)
 
     def clearAll(self):
+        self.rerender_timer.stop()
+        self.cancelConversion()
+        self.stopAnimation()
         self.image_path = None
         self.image_preview.clear()
         self.image_preview.setText('No Image Loaded')
+        self.ascii_text = None
+        self.color_result = None
         self.ascii_output.clear()
-        self.ascii_output.setText('')
         self.convert_button.setEnabled(False)
         self.save_button.setEnabled(False)
 
@@ -101,16 +249,18 @@ class AsciiArtConverter(QWidget):
                                                    "Image Files (*.png *.jpg *.jpeg *.bmp *.gif);;All Files (*)", 
                                                    options=options)
         if file_path:
+            self.cancelConversion()
+            self.stopAnimation()
             self.image_path = file_path
             
-            # Display image preview
-            pixmap = QPixmap(file_path)
-            if not pixmap.isNull():
-                # Scale pixmap to fit the label while maintaining aspect ratio
-                scaled_pixmap = pixmap.scaled(self.image_preview.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.image_preview.setPixmap(scaled_pixmap)
+            # Display image preview, decoded at (or near) the label's size
+            try:
+                thumbnail = load_thumbnail(file_path, (self.image_preview.width(), self.image_preview.height()))
+                image = QImage(thumbnail.tobytes(), thumbnail.width, thumbnail.height,
+                               thumbnail.width * 3, QImage.Format_RGB888).copy()
+                self.image_preview.setPixmap(QPixmap.fromImage(image))
                 self.image_preview.setText("") # Clear 'No Image Loaded' text
-            else:
+            except Exception:
                 self.image_preview.setText("Failed to load image")
 
             self.ascii_output.setText(f"Image loaded: {self.image_path}\nClick 'Convert to ASCII' to process.")
@@ -122,59 +272,202 @@ class AsciiArtConverter(QWidget):
             self.ascii_output.setText("Please load an image first.")
             return
 
+        # Get settings from UI
         try:
-            img = Image.open(self.image_path).convert('L') # Convert to grayscale
-            
-            # Get settings from UI
-            try:
-                new_width = int(self.width_input.text())
-                if new_width <= 0:
-                    raise ValueError("Width must be a positive integer.")
-            except ValueError as e:
-                self.ascii_output.setText(f"Invalid Output Width: {e}")
-                return
+            new_width = int(self.width_input.text())
+            if new_width <= 0:
+                raise ValueError("Width must be a positive integer.")
+        except ValueError as e:
+            self.ascii_output.setText(f"Invalid Output Width: {e}")
+            return
+
+        self.startConversion(new_width, self.char_set_combo.currentText())
+
+    def autoRerender(self):
+        # Debounced re-render after width/charset edits; half-typed widths are ignored
+        if not self.image_path:
+            return
+        try:
+            new_width = int(self.width_input.text())
+        except ValueError:
+            return
+        if new_width > 0:
+            self.startConversion(new_width, self.char_set_combo.currentText())
 
-            chars = self.char_set_combo.currentText()
+    def startConversion(self, new_width, chars):
+        self.rerender_timer.stop()
+        self.cancelConversion()
+        self.stopAnimation()
+        self.ascii_text = None
+        self.color_result = None
 
-            # Resize image for ASCII art
-            width, height = img.size
-            aspect_ratio = height/width
-            new_height = int(new_width * aspect_ratio * 0.55) # Adjust 0.55 for character aspect ratio
-            img = img.resize((new_width, new_height))
+        self.conversion_job_id += 1
+        self.conversion_chars = chars
+        mode = self.mode_combo.currentText()
+        glyph_index = None
+        if mode == MODE_SHAPE:
+            # Rasterized once per font and charset, then loaded from the disk cache
+            glyph_index = load_glyph_index(chars, self.ascii_output.glyphFontKey(), self.ascii_output.rasterizeGlyphs)
+        thread = ConversionThread(self.conversion_job_id, self.image_path, new_width, chars, self.cache,
+                                  self.color_checkbox.isChecked(), mode, glyph_index)
+        thread.conversion_preview.connect(self.showConversionPreview)
+        thread.conversion_finished.connect(self.conversionComplete)
+        thread.animation_finished.connect(self.animationComplete)
+        thread.color_finished.connect(self.colorConversionComplete)
+        thread.conversion_failed.connect(self.conversionFailed)
+        thread.finished.connect(lambda: self.conversion_threads.discard(thread))
+        self.conversion_threads.add(thread)
+        self.conversion_thread = thread
+        thread.start()
 
-            pixels = img.getdata()
-            
-            ascii_art = ""
-            for pixel_value in pixels:
-                # Map pixel brightness to ASCII character
-                index = int((pixel_value / 255) * (len(chars) - 1))
-                ascii_art += chars[index]
-            
-            # Add newlines to form the image
-            final_ascii_art = ""
-            for i in range(0, len(ascii_art), new_width):
-                final_ascii_art += ascii_art[i:i+new_width] + "\n"
+    def cancelConversion(self):
+        # Results the cancelled job already queued are dropped by the job id checks
+        self.conversion_job_id += 1
+        if self.conversion_thread is not None:
+            self.conversion_thread.cancel()
+            self.conversion_thread = None
 
-            self.ascii_output.setText(final_ascii_art)
-            self.save_button.setEnabled(True)
+    def showConversionPreview(self, job_id, preview_ascii_art):
+        if job_id == self.conversion_job_id:
+            self.ascii_output.setText(preview_ascii_art)
 
-        except Exception as e:
-            self.ascii_output.setText(f"Error during conversion: {e}")
-            self.save_button.setEnabled(False)
+    def conversionComplete(self, job_id, final_ascii_art):
+        if job_id != self.conversion_job_id:
+            return
+        self.conversion_thread = None
+        self.ascii_text = final_ascii_art
+        self.ascii_output.setText(final_ascii_art)
+        self.save_button.setEnabled(True)
+        self.updateCacheStats()
+
+    def colorConversionComplete(self, job_id, final_ascii_art, codes, indices):
+        if job_id != self.conversion_job_id:
+            return
+        self.conversion_thread = None
+        self.ascii_text = final_ascii_art
+        self.color_result = (codes, indices, self.conversion_chars)
+        self.ascii_output.setColorText(final_ascii_art, indices, palette_rgb())
+        self.save_button.setEnabled(True)
+        self.updateCacheStats()
+
+    def updateCacheStats(self):
+        stats = self.cache.stats()
+        pixels, ascii_text = stats['pixels'], stats['ascii']
+        self.cache_label.setText(f"Cache hits - pixels: {pixels['hits']}/{pixels['hits'] + pixels['misses']}, "
+                                 f"text: {ascii_text['hits']}/{ascii_text['hits'] + ascii_text['misses']}")
+
+    def animationComplete(self, job_id, anim_path):
+        if job_id != self.conversion_job_id:
+            os.remove(anim_path) # Superseded while the last frame was being written
+            return
+        self.conversion_thread = None
+        self.animation_path = anim_path
+        self.save_button.setEnabled(True)
+        self.nextAnimationFrame()
+
+    def conversionFailed(self, job_id, error):
+        if job_id != self.conversion_job_id:
+            return
+        self.conversion_thread = None
+        self.ascii_output.setText(f"Error during conversion: {error}")
+        self.save_button.setEnabled(False)
+
+    def nextAnimationFrame(self):
+        if not self.animation_path:
+            return
+        if self.animation_frames is None:
+            self.animation_frames = iter_animation(self.animation_path)
+            first_frame = True
+        else:
+            first_frame = False
+
+        frame = next(self.animation_frames, None)
+        if frame is None:
+            # End of clip: loop from the first (full) frame
+            self.animation_frames = iter_animation(self.animation_path)
+            first_frame = True
+            frame = next(self.animation_frames, None)
+            if frame is None:
+                return
+
+        delay, rows = frame
+        if first_frame:
+            self.ascii_output.setRows([text for _, text in rows])
+        else:
+            # Replace (and repaint) only the rows that changed since the previous frame
+            self.ascii_output.replaceRows(rows)
+        self.animation_timer.start(delay)
+
+    def stopAnimation(self):
+        self.animation_timer.stop()
+        self.animation_frames = None
+        if self.animation_path:
+            try:
+                os.remove(self.animation_path)
+            except OSError:
+                pass
+            self.animation_path = None
+
+    def closeEvent(self, event):
+        self.cancelConversion()
+        for thread in list(self.conversion_threads):
+            thread.wait()
+        self.stopAnimation() # Remove the temporary animation file
+        super().closeEvent(event)
 
     def saveAsciiArt(self):
-        if not self.ascii_output.toPlainText():
+        if not self.ascii_text and not self.animation_path:
             self.ascii_output.setText("Nothing to save. Convert an image first.")
             return
 
         options = QFileDialog.Options()
+        if self.animation_path:
+            file_path, selected_filter = QFileDialog.getSaveFileName(self, "Save ASCII Animation", "ascii_art.asciianim",
+                                                                     "ASCII Animation (*.asciianim);;Text Files (*.txt);;All Files (*)",
+                                                                     options=options)
+            if file_path and (file_path.endswith('.asciianim') or selected_filter.startswith('ASCII Animation')):
+                try:
+                    shutil.copyfile(self.animation_path, file_path)
+                    self.ascii_output.append(f"\nASCII animation saved to: {file_path}")
+                except Exception as e:
+                    self.ascii_output.append(f"\nError saving file: {e}")
+                return
+            if not file_path:
+                return
+            # Text export of the frame currently on screen
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(self.ascii_output.contentText())
+                self.ascii_output.append(f"\nASCII art saved to: {file_path}")
+            except Exception as e:
+                self.ascii_output.append(f"\nError saving file: {e}")
+            return
+
+        if self.color_result is not None:
+            file_path, selected_filter = QFileDialog.getSaveFileName(self, "Save Color ASCII Art", "ascii_art.html",
+                                                                     "HTML Files (*.html);;ANSI Text (*.ans);;Text Files (*.txt);;All Files (*)",
+                                                                     options=options)
+            if not file_path:
+                return
+            codes, indices, chars = self.color_result
+            try:
+                if file_path.endswith('.html') or selected_filter.startswith('HTML'):
+                    write_colored(file_path, iter_html(codes, indices, chars))
+                elif file_path.endswith('.ans') or selected_filter.startswith('ANSI'):
+                    write_colored(file_path, iter_ansi(codes, indices, chars))
+                else:
+                    write_text(file_path, self.ascii_text)
+                self.ascii_output.append(f"\nASCII art saved to: {file_path}")
+            except Exception as e:
+                self.ascii_output.append(f"\nError saving file: {e}")
+            return
+
         file_path, _ = QFileDialog.getSaveFileName(self, "Save ASCII Art", "ascii_art.txt", 
                                                    "Text Files (*.txt);;All Files (*)", 
                                                    options=options)
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.ascii_output.toPlainText())
+                write_text(file_path, self.ascii_text)
                 self.ascii_output.append(f"\nASCII art saved to: {file_path}")
             except Exception as e:
                 self.ascii_output.append(f"\nError saving file: {e}")
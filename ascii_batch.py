@@ -0,0 +1,162 @@
+import argparse
+import glob
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from ascii_engine import CHAR_SETS, DEFAULT_WIDTH, load_grayscale
+from ascii_glyphs import load_pil_glyph_index, open_subpixels
+from ascii_modes import MODE_SHAPE, MODE_THRESHOLD, RENDER_MODES, render
+
+# Same extensions as the GUI's "Load Image" filter
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+
+def glob_root(pattern):
+    # The leading directories of a glob pattern that contain no wildcards;
+    # matches are named relative to it so a/cat.jpg and b/cat.jpg stay apart
+    parts = os.path.normpath(pattern).split(os.sep)
+    fixed = []
+    for part in parts[:-1]:
+        if glob.has_magic(part):
+            break
+        fixed.append(part)
+    return os.sep.join(fixed) or (os.sep if pattern.startswith(os.sep) else os.curdir)
+
+
+def output_names(rel_names):
+    # Maps each relative source name to its .txt name. Sources that would share
+    # one (foo.png and foo.jpg) keep their extension: foo.png.txt, foo.jpg.txt
+    stems = [os.path.splitext(rel_name)[0] for rel_name in rel_names]
+    counts = {}
+    for stem in stems:
+        counts[stem] = counts.get(stem, 0) + 1
+    return [(stem if counts[stem] == 1 else rel_name) + '.txt' for stem, rel_name in zip(stems, rel_names)]
+
+
+def expand_inputs(patterns, recursive=False):
+    # Yields (source path, output name relative to the output directory)
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                walker = ((root, files) for root, _, files in os.walk(pattern))
+            else:
+                walker = [(pattern, os.listdir(pattern))]
+            for root, files in walker:
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path) and path not in seen:
+                        seen.add(path)
+                        yield path, os.path.relpath(path, pattern)
+        else:
+            matches = sorted(glob.glob(pattern, recursive=recursive))
+            root = glob_root(pattern) if matches and glob.has_magic(pattern) else None
+            for path in matches or [pattern]:
+                if path not in seen and not os.path.isdir(path):
+                    seen.add(path)
+                    yield path, os.path.relpath(path, root) if root else os.path.basename(path)
+
+
+def _convert_job(job):
+    # Runs in a pool worker. Per-file outputs are written here so only a short
+    # status travels back to the parent; JSONL mode returns the text instead.
+    path, out_path, width, chars, mode = job
+    try:
+        if mode == MODE_SHAPE:
+            # Pillow-rasterized glyphs; the index is built once and then read from the disk cache
+            ascii_art = render(open_subpixels(path, width), chars, mode, load_pil_glyph_index(chars))
+        else:
+            ascii_art = render(load_grayscale(path, width), chars, mode)
+        if out_path is None:
+            return path, ascii_art, None
+        os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.write(ascii_art)
+        return path, None, None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Convert images to ASCII art without the GUI.')
+    parser.add_argument('inputs', nargs='+', help='image files, directories or glob patterns')
+    parser.add_argument('-w', '--width', type=int, default=DEFAULT_WIDTH, help='output width in characters')
+    parser.add_argument('-c', '--charset', type=int, default=0,
+                        help=f'index into the GUI character sets (0-{len(CHAR_SETS) - 1})')
+    parser.add_argument('--chars', help='custom character set, overrides --charset')
+    parser.add_argument('-m', '--mode', choices=RENDER_MODES, default=MODE_THRESHOLD,
+                        help='brightness threshold, error-diffusion dithering, Sobel edge lines or glyph shape matching')
+    parser.add_argument('-o', '--output-dir', help='write one .txt per image here (default: next to each image)')
+    parser.add_argument('--jsonl', help="stream all results into one JSONL file ('-' for stdout)")
+    parser.add_argument('-r', '--recursive', action='store_true', help='descend into subdirectories / ** globs')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='worker processes')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.width <= 0:
+        parser.error("--width must be a positive integer")
+    if args.chars:
+        chars = args.chars
+    elif 0 <= args.charset < len(CHAR_SETS):
+        chars = CHAR_SETS[args.charset]
+    else:
+        parser.error(f"--charset must be between 0 and {len(CHAR_SETS) - 1}")
+
+    inputs = list(expand_inputs(args.inputs, args.recursive))
+    if args.jsonl:
+        out_paths = [None] * len(inputs)
+    elif args.output_dir:
+        out_paths = [os.path.join(args.output_dir, name) for name in output_names([rel for _, rel in inputs])]
+    else:
+        out_paths = output_names([path for path, _ in inputs])
+    if not args.jsonl:
+        # Separate inputs can still name the same file (cat.jpg under two directory arguments)
+        owners = {}
+        for (path, _), out_path in zip(inputs, out_paths):
+            other = owners.setdefault(os.path.normcase(os.path.abspath(out_path)), path)
+            if other != path:
+                parser.error(f"{other} and {path} would both be written to {out_path}")
+    jobs = [(path, out_path, args.width, chars, args.mode) for (path, _), out_path in zip(inputs, out_paths)]
+    if not jobs:
+        print("No input images found.", file=sys.stderr)
+        return 1
+
+    sink = None
+    if args.jsonl:
+        sink = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+
+    failed = 0
+    # Small chunks keep workers busy without holding back early results
+    chunksize = max(1, min(16, len(jobs) // (args.jobs * 8)))
+    try:
+        with Pool(processes=args.jobs) as pool:
+            for done, (path, ascii_art, error) in enumerate(pool.imap_unordered(_convert_job, jobs, chunksize), 1):
+                if error:
+                    failed += 1
+                    print(f"[{done}/{len(jobs)}] {path}: error: {error}", file=sys.stderr)
+                else:
+                    print(f"[{done}/{len(jobs)}] {path}", file=sys.stderr)
+                if sink is not None:
+                    record = {'path': path, 'width': args.width}
+                    if error:
+                        record['error'] = error
+                    else:
+                        record['ascii'] = ascii_art
+                    sink.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    sink.flush()
+    finally:
+        if sink is not None and sink is not sys.stdout:
+            sink.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
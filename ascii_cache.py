@@ -0,0 +1,219 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PIXEL_CACHE_BYTES = 256 * 1024 * 1024
+ASCII_CACHE_BYTES = 64 * 1024 * 1024
+DISK_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def default_cache_dir():
+    return os.environ.get('ASCII_ART_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'ascii_art_converter')
+
+
+class LRUCache:
+    # Byte-bounded LRU; values are charged by the size function
+    def __init__(self, max_bytes, sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+
+class DiskCache:
+    # Byte-bounded LRU over files in one directory, ordered by last access time
+    def __init__(self, directory, max_bytes, suffix):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(suffix) and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+        self.entries = OrderedDict((name, size) for _, name, size in entries)
+        self.current_bytes = sum(self.entries.values())
+
+    def _name(self, key):
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + self.suffix
+
+    def path_for(self, key):
+        # Returns the file for key and marks it recently used, or None on a miss
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        with self.lock:
+            if name not in self.entries or not os.path.exists(path):
+                self.entries.pop(name, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(name)
+            self.hits += 1
+        try:
+            os.utime(path) # Persist recency across restarts
+        except OSError:
+            pass
+        return path
+
+    def store(self, key, write):
+        # write(file_obj) fills a temp file that is renamed into place
+        name = self._name(key)
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        size = os.path.getsize(path)
+        with self.lock:
+            self.current_bytes += size - self.entries.pop(name, 0)
+            self.entries[name] = size
+            while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+                evicted, evicted_size = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                try:
+                    os.remove(os.path.join(self.directory, evicted))
+                except OSError:
+                    pass
+
+
+class ConversionCache:
+    # Level 1: decoded + resized pixels, keyed by (content hash, width[, mode])
+    # Level 2: final ASCII text, keyed by (content hash, width, charset[, render mode])
+    def __init__(self, pixel_bytes=PIXEL_CACHE_BYTES, ascii_bytes=ASCII_CACHE_BYTES,
+                 disk_dir=None, disk_bytes=DISK_CACHE_BYTES):
+        self.pixels = LRUCache(pixel_bytes, lambda value: value.nbytes)
+        self.ascii = LRUCache(ascii_bytes, lambda value: len(value) * 4)
+        self.disk_pixels = None
+        self.disk_ascii = None
+        if disk_dir:
+            try:
+                self.disk_pixels = DiskCache(os.path.join(disk_dir, 'pixels'), disk_bytes // 2, '.npy')
+                self.disk_ascii = DiskCache(os.path.join(disk_dir, 'ascii'), disk_bytes // 2, '.txt')
+            except OSError as e:
+                # Read-only home or sandbox: keep going with the in-memory levels only
+                print(f"Disk cache disabled, cannot use {disk_dir}: {e}", file=sys.stderr)
+                self.disk_pixels = None
+                self.disk_ascii = None
+        self.digests = {}
+        self.digest_lock = threading.Lock()
+
+    def file_digest(self, path):
+        # Content hash, memoized on (path, size, mtime) so toggles don't re-read the file
+        stat = os.stat(path)
+        stamp = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self.digest_lock:
+            digest = self.digests.get(stamp)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            with self.digest_lock:
+                self.digests[stamp] = digest
+        return digest
+
+    def _pixel_key(self, digest, new_width, mode):
+        return (digest, new_width) if mode == 'L' else (digest, new_width, mode)
+
+    def get_pixels(self, digest, new_width, mode='L'):
+        key = self._pixel_key(digest, new_width, mode)
+        pixels = self.pixels.get(key)
+        if pixels is None and self.disk_pixels is not None:
+            path = self.disk_pixels.path_for(key)
+            if path is not None:
+                try:
+                    pixels = np.load(path)
+                except (OSError, ValueError):
+                    pixels = None
+                if pixels is not None:
+                    self.pixels.put(key, pixels)
+        return pixels
+
+    def put_pixels(self, digest, new_width, pixels, mode='L'):
+        key = self._pixel_key(digest, new_width, mode)
+        self.pixels.put(key, pixels)
+        if self.disk_pixels is not None:
+            self.disk_pixels.store(key, lambda f: np.save(f, pixels))
+
+    def _ascii_key(self, digest, new_width, chars, render_mode):
+        return (digest, new_width, chars) if render_mode is None else (digest, new_width, chars, render_mode)
+
+    def get_ascii(self, digest, new_width, chars, render_mode=None):
+        key = self._ascii_key(digest, new_width, chars, render_mode)
+        ascii_art = self.ascii.get(key)
+        if ascii_art is None and self.disk_ascii is not None:
+            path = self.disk_ascii.path_for(key)
+            if path is not None:
+                try:
+                    with open(path, 'r', encoding='utf-8', newline='') as f:
+                        ascii_art = f.read()
+                except OSError:
+                    ascii_art = None
+                if ascii_art is not None:
+                    self.ascii.put(key, ascii_art)
+        return ascii_art
+
+    def put_ascii(self, digest, new_width, chars, ascii_art, render_mode=None):
+        key = self._ascii_key(digest, new_width, chars, render_mode)
+        self.ascii.put(key, ascii_art)
+        if self.disk_ascii is not None:
+            self.disk_ascii.store(key, lambda f: f.write(ascii_art.encode('utf-8')))
+
+    def stats(self):
+        stats = {
+            'pixels': {'hits': self.pixels.hits, 'misses': self.pixels.misses, 'bytes': self.pixels.current_bytes},
+            'ascii': {'hits': self.ascii.hits, 'misses': self.ascii.misses, 'bytes': self.ascii.current_bytes},
+        }
+        if self.disk_pixels is not None:
+            stats['disk_pixels'] = {'hits': self.disk_pixels.hits, 'misses': self.disk_pixels.misses,
+                                    'bytes': self.disk_pixels.current_bytes}
+            stats['disk_ascii'] = {'hits': self.disk_ascii.hits, 'misses': self.disk_ascii.misses,
+                                   'bytes': self.disk_ascii.current_bytes}
+        return stats
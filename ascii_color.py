@@ -0,0 +1,112 @@
+import html
+
+import numpy as np
+from PIL import Image
+
+from ascii_engine import decode_reduced, lut_encoding, output_size
+
+COLOR_LEVELS = 6 # Steps per channel; 6 uses the xterm 256-color cube, so ANSI output can use 38;5 escapes
+XTERM_CUBE_LEVELS = (0, 95, 135, 175, 215, 255) # Channel values of the xterm color cube (not evenly spaced)
+ROWS_PER_CHUNK = 64 # Rows formatted per chunk when streaming colored output
+HTML_BACKGROUND = '#000000'
+
+
+def open_color(path, new_width):
+    # RGB pixels on the output grid, decoded at reduced scale like the grayscale path
+    img, target_size = decode_reduced(path, lambda size: output_size(size, new_width), 'RGB')
+    return np.asarray(img.resize(target_size), dtype=np.uint8)
+
+
+def rgb_to_gray(rgb):
+    return np.asarray(Image.fromarray(rgb).convert('L'), dtype=np.uint8)
+
+
+def channel_levels(levels=COLOR_LEVELS):
+    # Channel values of the palette: the xterm cube for 6 levels, evenly spaced otherwise
+    if levels == 6:
+        return np.array(XTERM_CUBE_LEVELS, dtype=np.int16)
+    return (np.arange(levels) * 255 // (levels - 1)).astype(np.int16)
+
+
+def quantize(rgb, levels=COLOR_LEVELS):
+    # Per-channel nearest palette level; returns one palette index per cell
+    values = channel_levels(levels)
+    nearest = np.abs(np.arange(256, dtype=np.int16)[:, None] - values).argmin(axis=1).astype(np.uint16)
+    steps = nearest[rgb]
+    return (steps[..., 0] * levels + steps[..., 1]) * levels + steps[..., 2]
+
+
+def palette_rgb(levels=COLOR_LEVELS):
+    # (levels**3, 3) uint8 colors for the indices produced by quantize()
+    steps = channel_levels(levels)
+    r, g, b = np.meshgrid(steps, steps, steps, indexing='ij')
+    return np.stack((r.ravel(), g.ravel(), b.ravel()), axis=1).astype(np.uint8)
+
+
+def span_starts(indices):
+    # Flat positions where a new run of equal color begins; every row starts a run
+    starts = np.ones(indices.shape, dtype=bool)
+    starts[:, 1:] = indices[:, 1:] != indices[:, :-1]
+    return np.flatnonzero(starts)
+
+
+def _iter_runs(codes, indices, encoding):
+    # Yields per row: list of (palette index, text) runs
+    height, width = indices.shape
+    starts = span_starts(indices)
+    row_of_start = starts // width
+    bounds = np.searchsorted(row_of_start, np.arange(height + 1))
+    flat_indices = indices.ravel()
+    for row in range(height):
+        text = codes[row].tobytes().decode(encoding)
+        row_starts = starts[bounds[row]:bounds[row + 1]] - row * width
+        row_ends = np.append(row_starts[1:], width)
+        colors = flat_indices[row * width + row_starts]
+        yield [(int(color), text[start:end]) for color, start, end in zip(colors, row_starts, row_ends)]
+
+
+def _ansi_prefixes(levels):
+    if levels == 6:
+        return [f'\x1b[38;5;{16 + index}m' for index in range(216)]
+    return [f'\x1b[38;2;{r};{g};{b}m' for r, g, b in palette_rgb(levels)]
+
+
+def _html_prefixes(levels):
+    return [f'<span style="color:#{r:02x}{g:02x}{b:02x}">' for r, g, b in palette_rgb(levels)]
+
+
+def iter_ansi(codes, indices, chars, levels=COLOR_LEVELS, rows_per_chunk=ROWS_PER_CHUNK):
+    # ANSI escape output; one escape per merged run, reset at each line end.
+    # codes is the per-cell character grid (ascii_modes.render_codes)
+    prefixes = _ansi_prefixes(levels)
+    chunk = []
+    for runs in _iter_runs(codes, indices, lut_encoding(chars)):
+        chunk.append(''.join(prefixes[color] + text for color, text in runs) + '\x1b[0m\n')
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def iter_html(codes, indices, chars, levels=COLOR_LEVELS, rows_per_chunk=ROWS_PER_CHUNK):
+    # Standalone HTML page; one <span> per merged run
+    prefixes = _html_prefixes(levels)
+    yield ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>ASCII Art</title></head>\n'
+           f'<body style="background:{HTML_BACKGROUND}">\n'
+           '<pre style="font-family:monospace;font-size:8px;line-height:1">')
+    chunk = []
+    for runs in _iter_runs(codes, indices, lut_encoding(chars)):
+        chunk.append(''.join(f'{prefixes[color]}{html.escape(text, quote=False)}</span>' for color, text in runs) + '\n')
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+    yield '</pre>\n</body></html>\n'
+
+
+def write_colored(path, chunks):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            f.write(chunk)
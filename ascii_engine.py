@@ -0,0 +1,207 @@
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+# Character sets offered by the GUI (AsciiArtConverter.char_set_combo) and the CLI
+CHAR_SETS = [
+    '''@%#*+=-:. ''', # Dark to Light (Simple)
+    ''' .:-=+*#%@''', # Light to Dark (Simple)
+    ''' .'`^",:;Il!i><~+_-?][}{1)(|\/tfjrxnumbROZCXJUVYPGQ$8&B@WM#''', # More detailed
+    ''' .'`^",:;Il!i><~+_-?][}{1)(|\/tfjrxnumbROZCXJUVYPGQ$8&B@WM#'''.replace(" ", ""), # More detailed (no spaces)
+    ''' .:-=+*#%@''', # Simple reversed
+    ''' .:-=+*#%@'''.replace(" ", ""), # Simple reversed (no spaces)
+    '''█▓▒░ ''', # Blocks
+    '''░▒▓█''', # Blocks reversed
+    '''MNHQ$OC?7>!:-;. ''', # Another common set
+    '''$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/\\|()1{}[]?-_+~<>i!lI;:,"^`'. ''', # Very detailed
+]
+
+DEFAULT_WIDTH = 100
+CHAR_ASPECT = 0.55 # Adjust 0.55 for character aspect ratio
+
+# Reduced-scale decoding keeps at least this multiple of the target grid so the
+# final bicubic resize still has real detail to filter
+REDUCE_OVERSAMPLE = 4
+TILE_ROWS = 256 # Source rows decoded per band on the tiled path
+TILED_MODES = ('L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK')
+SAVE_CHUNK_CHARS = 1 << 20 # Characters encoded and written per chunk when saving
+
+
+def output_size(image_size, new_width):
+    width, height = image_size
+    aspect_ratio = height / width
+    new_height = max(1, int(new_width * aspect_ratio * CHAR_ASPECT))
+    return new_width, new_height
+
+
+@lru_cache(maxsize=32)
+def build_lut(chars):
+    # 256-entry table: same index formula the old per-pixel loop used
+    scale = len(chars) - 1
+    codes = [ord(chars[int((value / 255) * scale)]) for value in range(256)]
+    if max(codes) < 128:
+        return np.array(codes, dtype=np.uint8)
+    return np.array(codes, dtype='<u4')
+
+
+def fit_size(image_size, box_size):
+    # Largest size with the image's aspect ratio that fits inside box_size
+    width, height = image_size
+    scale = min(box_size[0] / width, box_size[1] / height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def reduction_factor(image_size, target_size):
+    return max(1, min(image_size[0] // (target_size[0] * REDUCE_OVERSAMPLE),
+                      image_size[1] // (target_size[1] * REDUCE_OVERSAMPLE)))
+
+
+def _raw_strips(img):
+    # (y0, y1, offset, rawmode, stride, orientation) for uncompressed, full-width
+    # strips (BMP, PPM/PGM, uncompressed TIFF, ...); None if the layout is anything else
+    if img.mode not in TILED_MODES or not getattr(img, 'tile', None):
+        return None
+    width = img.size[0]
+    strips = []
+    try:
+        for tile in img.tile:
+            decoder, box, offset, args = tile[:4]
+            if decoder != 'raw' or box[0] != 0 or box[2] != width:
+                return None
+            if isinstance(args, str):
+                args = (args,)
+            rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+            if stride == 0:
+                stride = len(Image.new(img.mode, (width, 1)).tobytes('raw', rawmode))
+            strips.append((box[1], box[3], offset, rawmode, stride, orientation))
+    except Exception:
+        return None
+    return strips
+
+
+def _box_reduce(pixels, factor):
+    rows = pixels.shape[0] // factor * factor
+    cols = pixels.shape[1] // factor * factor
+    blocks = pixels[:rows, :cols].reshape((rows // factor, factor, cols // factor, factor) + pixels.shape[2:])
+    return blocks.mean(axis=(1, 3), dtype=np.float32).round().astype(np.uint8)
+
+
+def _decode_tiled(path, img, strips, factor, mode):
+    # Decodes TILE_ROWS-high bands straight from the file and box-reduces each
+    # one, so only a band plus the reduced result are ever held in memory
+    width = img.size[0]
+    band_rows = max(factor, TILE_ROWS // factor * factor)
+    reduced = []
+    pending = None
+    with open(path, 'rb') as f:
+        for y0, y1, offset, rawmode, stride, orientation in strips:
+            row = y0
+            while row < y1:
+                count = min(band_rows, y1 - row)
+                if orientation >= 0:
+                    f.seek(offset + (row - y0) * stride)
+                else:
+                    f.seek(offset + (y1 - row - count) * stride) # Bottom-up storage
+                data = f.read(count * stride)
+                if len(data) < count * stride:
+                    raise OSError("image file is truncated")
+                band = Image.frombuffer(img.mode, (width, count), data, 'raw', rawmode, stride, orientation)
+                band = np.asarray(band.convert(mode))
+                pending = band if pending is None else np.concatenate((pending, band))
+                usable = pending.shape[0] // factor * factor
+                if usable:
+                    reduced.append(_box_reduce(pending[:usable], factor))
+                    pending = pending[usable:]
+                row += count
+    if pending is not None and pending.shape[0]:
+        # Leftover rows (fewer than factor) still contribute one reduced row
+        reduced.append(_box_reduce(np.repeat(pending, factor, axis=0)[:factor], factor))
+    return Image.fromarray(np.concatenate(reduced))
+
+
+def decode_reduced(path, target_for, mode='L'):
+    # Opens path and decodes it at the smallest scale that still covers the
+    # target grid: JPEG DCT scaling via draft(), band-wise decoding for raw
+    # layouts, and reduce() right after decoding for everything else.
+    # target_for(original_size) returns the size the caller will resize to.
+    # Returns (reduced image in mode, target size).
+    with Image.open(path) as img:
+        target_size = target_for(img.size)
+        factor = reduction_factor(img.size, target_size)
+        if factor > 1 and img.format == 'JPEG':
+            img.draft(mode, (target_size[0] * REDUCE_OVERSAMPLE, target_size[1] * REDUCE_OVERSAMPLE))
+            factor = reduction_factor(img.size, target_size)
+        if factor > 1:
+            strips = _raw_strips(img)
+            if strips is not None:
+                return _decode_tiled(path, img, strips, factor, mode), target_size
+        img.load()
+        if factor > 1:
+            if img.mode not in ('L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'I', 'F'):
+                img = img.convert(mode)
+            img = img.reduce(factor)
+        return img.convert(mode), target_size
+
+
+def resize_pixels(img, target_size):
+    img = img.convert('L') # Convert to grayscale
+    img = img.resize(target_size)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def image_to_pixels(img, new_width):
+    return resize_pixels(img, output_size(img.size, new_width))
+
+
+def preview_pixels(img, target_size, factor=4):
+    # Cheap blocky preview: nearest-neighbour sample at 1/factor, blown back up
+    # to the full output grid so it can be swapped for the real render in place
+    img = img.convert('L')
+    small_size = (max(1, target_size[0] // factor), max(1, target_size[1] // factor))
+    small = img.resize(small_size, Image.NEAREST)
+    return np.asarray(small.resize(target_size, Image.NEAREST), dtype=np.uint8)
+
+
+def open_grayscale(path, new_width):
+    # Grayscale image reduced close to the output grid, plus that grid's size
+    return decode_reduced(path, lambda size: output_size(size, new_width), 'L')
+
+
+def load_grayscale(path, new_width):
+    img, target_size = open_grayscale(path, new_width)
+    return resize_pixels(img, target_size)
+
+
+def load_thumbnail(path, box_size):
+    # RGB preview scaled to fit box_size, decoded at reduced scale
+    img, target_size = decode_reduced(path, lambda size: fit_size(size, box_size), 'RGB')
+    return img.resize(target_size, Image.BICUBIC)
+
+
+def pixels_to_codes(pixels, chars):
+    return build_lut(chars)[pixels]
+
+
+def pixels_to_bytes(pixels, chars):
+    lut = build_lut(chars)
+    height, width = pixels.shape
+    grid = np.empty((height, width + 1), dtype=lut.dtype)
+    grid[:, :width] = lut[pixels]
+    grid[:, width] = ord('\n')
+    return grid.tobytes()
+
+
+def lut_encoding(chars):
+    return 'ascii' if build_lut(chars).dtype == np.uint8 else 'utf-32-le'
+
+
+def pixels_to_ascii(pixels, chars):
+    return pixels_to_bytes(pixels, chars).decode(lut_encoding(chars))
+
+
+def write_text(path, ascii_art, chunk_chars=SAVE_CHUNK_CHARS):
+    # Streams the result to disk in chunks so the encoded copy never exceeds one chunk
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, len(ascii_art), chunk_chars):
+            f.write(ascii_art[start:start + chunk_chars])
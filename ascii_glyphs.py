@@ -0,0 +1,159 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from ascii_cache import default_cache_dir
+from ascii_engine import build_lut, decode_reduced, output_size
+
+# Each character cell is described by FEATURE_SIZE (columns, rows) ink samples;
+# glyphs and image cells use the same layout so matching is a nearest-neighbour search
+FEATURE_SIZE = (3, 5)
+GLYPH_INDEX_VERSION = 1 # Bump when the feature layout changes; old .npz files are ignored
+MATCH_CHUNK_CELLS = 1 << 16 # Cells per matrix product, bounds the (cells x glyphs) temporary
+# Weight of the mean-ink (tone) term relative to one feature sample. Pure shape distance penalises
+# busy glyphs on flat areas, so flat grays would skip most of the charset
+TONE_WEIGHT = 16
+PIL_FONT_SIZE = 24
+PIL_FONT_NAMES = ('DejaVuSansMono.ttf', 'consola.ttf', 'cour.ttf', 'Menlo.ttc')
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+
+class GlyphIndex:
+    # Feature vectors for one charset in one font, plus the character codes to emit
+    def __init__(self, chars, font_key, features, ink_is_dark):
+        self.chars = chars
+        self.font_key = font_key
+        self.features = features.astype(np.float32) # (glyphs, FEATURE_SIZE[0] * FEATURE_SIZE[1])
+        self.ink_is_dark = ink_is_dark # True when the densest glyph stands for the darkest pixel
+        self.codes = np.array([ord(c) for c in chars], dtype=build_lut(chars).dtype)
+        # Glyph features are scaled to their own peak sample, but even the densest glyph only covers
+        # part of its cell; map full cell ink to the densest glyph's mean so flat tones keep their level
+        self.means = self.features.mean(axis=1)
+        self.ink_scale = float(self.means.max()) or 1.0
+        self.tone_weight = np.float32(TONE_WEIGHT * self.features.shape[1])
+        self.half_norms = 0.5 * ((self.features ** 2).sum(axis=1) + self.tone_weight * self.means ** 2)
+
+    def match(self, subpixels):
+        # subpixels: uint8 (rows * FEATURE_SIZE[1], columns * FEATURE_SIZE[0]).
+        # Nearest glyph per cell by L2 distance over the samples plus the weighted mean:
+        # argmin(|g|^2 / 2 - x.g), so the whole grid is one matrix product against the glyph table
+        columns, rows = FEATURE_SIZE
+        height, width = subpixels.shape[0] // rows, subpixels.shape[1] // columns
+        cells = subpixels[:height * rows, :width * columns].reshape(height, rows, width, columns)
+        cells = cells.transpose(0, 2, 1, 3).reshape(height * width, rows * columns).astype(np.float32)
+        if self.ink_is_dark:
+            cells = 255 - cells
+        cells *= self.ink_scale / 255
+        best = np.empty(height * width, dtype=np.intp)
+        for start in range(0, len(cells), MATCH_CHUNK_CELLS):
+            chunk = cells[start:start + MATCH_CHUNK_CELLS]
+            scores = chunk @ self.features.T + np.outer(chunk.mean(axis=1) * self.tone_weight, self.means)
+            best[start:start + len(chunk)] = (self.half_norms - scores).argmin(axis=1)
+        return self.codes[best].reshape(height, width)
+
+
+def sample_size(grid_size):
+    # Pixel size that gives every output cell its FEATURE_SIZE samples
+    return grid_size[0] * FEATURE_SIZE[0], grid_size[1] * FEATURE_SIZE[1]
+
+
+def resize_subpixels(img, grid_size):
+    img = img.convert('L').resize(sample_size(grid_size), Image.BOX)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def open_subpixels(path, new_width):
+    # Grayscale image sampled at FEATURE_SIZE per output cell, decoded at reduced scale
+    img, target_size = decode_reduced(path, lambda size: sample_size(output_size(size, new_width)), 'L')
+    return np.asarray(img.resize(target_size, Image.BOX), dtype=np.uint8)
+
+
+def glyph_features(bitmaps):
+    # bitmaps: (glyphs, height, width) ink coverage 0..1 -> (glyphs, features),
+    # box-averaged onto FEATURE_SIZE and scaled so the inkiest sample is 1
+    columns, rows = FEATURE_SIZE
+    features = []
+    for bitmap in bitmaps:
+        img = Image.fromarray((np.clip(bitmap, 0, 1) * 255).astype(np.uint8))
+        features.append(np.asarray(img.resize((columns, rows), Image.BOX), dtype=np.float32).ravel() / 255)
+    features = np.array(features, dtype=np.float32)
+    peak = features.max()
+    return features / peak if peak > 0 else features
+
+
+def build_index(chars, font_key, bitmaps):
+    features = glyph_features(bitmaps)
+    coverage = features.mean(axis=1)
+    return GlyphIndex(chars, font_key, features, ink_is_dark=coverage[0] > coverage[-1])
+
+
+def _index_path(cache_dir, font_key, chars):
+    key = repr((GLYPH_INDEX_VERSION, FEATURE_SIZE, font_key, chars))
+    return os.path.join(cache_dir, 'glyphs', hashlib.sha1(key.encode('utf-8')).hexdigest() + '.npz')
+
+
+def load_glyph_index(chars, font_key, rasterize, cache_dir=None):
+    # Index for chars in the font identified by font_key. rasterize(chars) returns
+    # (glyphs, height, width) coverage bitmaps and only runs on a cache miss;
+    # results are kept in memory and as one .npz per font and charset on disk
+    memo_key = (font_key, chars)
+    with _index_lock:
+        index = _index_cache.get(memo_key)
+    if index is not None:
+        return index
+
+    path = _index_path(cache_dir or default_cache_dir(), font_key, chars)
+    index = None
+    try:
+        with np.load(path) as data:
+            index = GlyphIndex(chars, font_key, data['features'], bool(data['ink_is_dark']))
+    except (OSError, KeyError, ValueError):
+        index = None
+    if index is None:
+        index = build_index(chars, font_key, rasterize(chars))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, features=index.features, ink_is_dark=index.ink_is_dark)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass # Still usable for this run
+
+    with _index_lock:
+        _index_cache[memo_key] = index
+    return index
+
+
+def pil_font():
+    # Monospace TrueType font when one is installed, Pillow's built-in bitmap font otherwise
+    for name in PIL_FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, PIL_FONT_SIZE), f"pil:{name}:{PIL_FONT_SIZE}"
+        except OSError:
+            continue
+    return ImageFont.load_default(), 'pil:default'
+
+
+def pil_rasterize(chars, font=None):
+    # Fallback rasterizer for batch mode, where no Qt font is available
+    if font is None:
+        font, _ = pil_font()
+    ascent, descent = font.getmetrics()
+    width = max(1, int(round(max(font.getlength(c) for c in chars))))
+    height = max(1, ascent + descent)
+    bitmaps = np.zeros((len(chars), height, width), dtype=np.float32)
+    for i, c in enumerate(chars):
+        img = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(img).text((0, 0), c, fill=255, font=font)
+        bitmaps[i] = np.asarray(img, dtype=np.float32) / 255
+    return bitmaps
+
+
+def load_pil_glyph_index(chars, cache_dir=None):
+    font, font_key = pil_font()
+    return load_glyph_index(chars, font_key, lambda c: pil_rasterize(c, font), cache_dir)
@@ -0,0 +1,125 @@
+import numpy as np
+
+from ascii_engine import build_lut, lut_encoding, pixels_to_ascii, pixels_to_codes
+
+# Rendering modes offered next to the plain brightness threshold
+MODE_THRESHOLD = 'Brightness'
+MODE_FLOYD_STEINBERG = 'Floyd-Steinberg'
+MODE_ATKINSON = 'Atkinson'
+MODE_EDGES = 'Edges'
+MODE_SHAPE = 'Shape' # Nearest glyph by shape, see ascii_glyphs
+RENDER_MODES = [MODE_THRESHOLD, MODE_FLOYD_STEINBERG, MODE_ATKINSON, MODE_EDGES, MODE_SHAPE]
+
+# Error-diffusion kernels as (dy, dx, weight)
+FLOYD_STEINBERG = [(0, 1, 7 / 16), (1, -1, 3 / 16), (1, 0, 5 / 16), (1, 1, 1 / 16)]
+ATKINSON = [(0, 1, 1 / 8), (0, 2, 1 / 8), (1, -1, 1 / 8), (1, 0, 1 / 8), (1, 1, 1 / 8), (2, 0, 1 / 8)]
+KERNELS = {MODE_FLOYD_STEINBERG: FLOYD_STEINBERG, MODE_ATKINSON: ATKINSON}
+
+EDGE_THRESHOLD = 160.0 # Sobel magnitude (0..~1440) above which a line character is drawn
+EDGE_CHARS = '|/-\\' # Indexed by edge orientation bin
+TAN_22_5 = 0.41421356 # Octant boundary between straight and diagonal lines
+
+
+def error_diffusion(pixels, levels, kernel):
+    # Quantizes pixels to `levels` steps with error diffusion and returns the
+    # level index per cell. Both kernels only push error right, or down-and-
+    # sideways, so every pixel on the anti-diagonal t = x + 2y depends only on
+    # earlier diagonals. The buffer is sheared so that diagonal t is the
+    # contiguous row sheared[t], turning width * height Python steps into
+    # width + 2 * height vectorized ones that use plain slices only.
+    height, width = pixels.shape
+    max_dy = max(dy for dy, _, _ in kernel)
+    steps = width + 2 * (height - 1)
+    reach = max(dx + 2 * dy for dy, dx, _ in kernel)
+    rows = np.arange(height)
+    sheared = np.zeros((steps + reach, height + max_dy), dtype=np.float64)
+    sheared[np.arange(width)[None, :] + 2 * rows[:, None], rows[:, None]] = pixels
+    levels_out = np.zeros_like(sheared[:steps, :height])
+    scale = (levels - 1) / 255
+    step = 255 / (levels - 1)
+    # Rows below go first so accumulation order matches a raster scan; taps
+    # sharing a weight (all of Atkinson's) reuse one scaled error row
+    ordered_kernel = sorted(kernel, key=lambda entry: -entry[0])
+    taps = []
+    for dy, dx, weight in ordered_kernel:
+        if taps and taps[-1][0] == weight:
+            taps[-1][1].append((dy, dx))
+        else:
+            taps.append((weight, [(dy, dx)]))
+
+    for t in range(steps):
+        first = max(0, (t - width + 2) // 2)
+        last = min(height - 1, t // 2) + 1
+        values = sheared[t, first:last]
+        quantized = levels_out[t, first:last]
+        np.rint(values * scale, out=quantized)
+        np.clip(quantized, 0, levels - 1, out=quantized)
+        error = values - quantized * step
+        for weight, offsets in taps:
+            weighted = error * weight
+            for dy, dx in offsets:
+                sheared[t + dx + 2 * dy, first + dy:last + dy] += weighted
+
+    # Un-shear: cell (y, x) lives at levels_out[x + 2y, y]
+    return levels_out[np.arange(width)[None, :] + 2 * rows[:, None], rows[:, None]].astype(np.uint8)
+
+
+def dither_codes(pixels, chars, kernel):
+    codes = np.array([ord(c) for c in chars], dtype=build_lut(chars).dtype)
+    return codes[error_diffusion(pixels, len(chars), kernel)]
+
+
+def sobel(pixels):
+    # Returns (gx, gy) on the same grid, edges replicated at the border
+    padded = np.pad(pixels.astype(np.float32), 1, mode='edge')
+    top, middle, bottom = padded[:-2], padded[1:-1], padded[2:]
+    gx = ((top[:, 2:] + 2 * middle[:, 2:] + bottom[:, 2:])
+          - (top[:, :-2] + 2 * middle[:, :-2] + bottom[:, :-2]))
+    gy = ((bottom[:, :-2] + 2 * bottom[:, 1:-1] + bottom[:, 2:])
+          - (top[:, :-2] + 2 * top[:, 1:-1] + top[:, 2:]))
+    return gx, gy
+
+
+def edge_codes(pixels, chars, threshold=EDGE_THRESHOLD):
+    # Brightness characters everywhere, replaced by a line character along
+    # strong gradients; the line runs perpendicular to the gradient
+    gx, gy = sobel(pixels)
+    strong = gx * gx + gy * gy > threshold * threshold
+    codes = pixels_to_codes(pixels, chars).copy() # EDGE_CHARS are ASCII, so the LUT dtype fits
+    if not strong.any():
+        return codes
+    # Orientation from the gradient's octant instead of arctan2; image y grows downwards
+    gx, gy = gx[strong], gy[strong]
+    ax, ay = np.abs(gx), np.abs(gy)
+    orientation = np.where(gx * gy > 0, 1, 3) # Diagonals: '/' or '\\'
+    orientation[ay <= TAN_22_5 * ax] = 0 # Mostly horizontal gradient: vertical line
+    orientation[ax <= TAN_22_5 * ay] = 2 # Mostly vertical gradient: horizontal line
+    codes[strong] = np.array([ord(c) for c in EDGE_CHARS], dtype=codes.dtype)[orientation]
+    return codes
+
+
+def render_codes(pixels, chars, mode=MODE_THRESHOLD, glyph_index=None):
+    # One character code per cell, same dtype as build_lut(chars). In MODE_SHAPE
+    # pixels are sampled per glyph feature (ascii_glyphs.open_subpixels) and
+    # glyph_index is the GlyphIndex for chars
+    if mode == MODE_SHAPE:
+        return glyph_index.match(pixels)
+    if mode in KERNELS:
+        return dither_codes(pixels, chars, KERNELS[mode])
+    if mode == MODE_EDGES:
+        return edge_codes(pixels, chars)
+    return pixels_to_codes(pixels, chars)
+
+
+def codes_to_ascii(codes, chars):
+    height, width = codes.shape
+    grid = np.empty((height, width + 1), dtype=codes.dtype)
+    grid[:, :width] = codes
+    grid[:, width] = ord('\n')
+    return grid.tobytes().decode(lut_encoding(chars))
+
+
+def render(pixels, chars, mode=MODE_THRESHOLD, glyph_index=None):
+    if mode == MODE_THRESHOLD:
+        return pixels_to_ascii(pixels, chars)
+    return codes_to_ascii(render_codes(pixels, chars, mode, glyph_index), chars)
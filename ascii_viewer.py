@@ -0,0 +1,265 @@
+from PyQt5.QtWidgets import QAbstractScrollArea, QApplication
+from PyQt5.QtGui import QPainter, QPalette, QColor, QFont, QFontMetrics, QFontDatabase, QImage, QKeySequence
+from PyQt5.QtCore import Qt
+import numpy as np
+
+MIN_POINT_SIZE = 2
+MAX_POINT_SIZE = 48
+GLYPH_PIXEL_SIZE = 24 # Glyphs are rasterized at a fixed size so the index does not depend on zoom
+
+
+class AsciiView(QAbstractScrollArea):
+    # Read-only viewer for fixed-width ASCII grids. Rows are sliced out of the
+    # engine's text on demand and only the rows/columns inside the exposed
+    # region are painted, so cost follows the window size, not the output size.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        font.setPointSize(5)
+        self.setFont(font)
+        self.viewport().setAutoFillBackground(True)
+        self.viewport().setBackgroundRole(QPalette.Base)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.clear()
+
+    # --- content --------------------------------------------------------
+
+    def clear(self):
+        self.text = ''
+        self.row_stride = 0 # > 0: text is a grid of equal rows, each ending in '\n'
+        self.row_count = 0
+        self.lines = [] # Used instead of text for free-form / animated content
+        self.footer = [] # Status lines appended below the art
+        self.max_columns = 0
+        self.color_indices = None # Per-cell palette indices in color mode
+        self.colors = []
+        self.viewport().setBackgroundRole(QPalette.Base)
+        self.contentChanged()
+
+    def setText(self, text):
+        self.clear()
+        first_newline = text.find('\n')
+        stride = first_newline + 1
+        rows = len(text) // stride if stride else 0
+        if (first_newline > 0 and len(text) % stride == 0 and text.count('\n') == rows
+                and text[first_newline::stride].count('\n') == rows):
+            # Fixed-width grid: keep the engine's string as-is and index rows arithmetically
+            self.text = text
+            self.row_stride = stride
+            self.row_count = len(text) // stride
+            self.max_columns = stride - 1
+        else:
+            self.lines = text.split('\n')
+            if self.lines and self.lines[-1] == '':
+                self.lines.pop()
+            self.row_count = len(self.lines)
+            self.max_columns = max((len(line) for line in self.lines), default=0)
+        self.contentChanged()
+
+    setPlainText = setText
+
+    def setColorText(self, text, color_indices, palette_rgb):
+        # Grid text plus one palette index per cell; painted as merged color runs
+        self.setText(text)
+        self.color_indices = color_indices
+        self.colors = [QColor(int(r), int(g), int(b)) for r, g, b in palette_rgb]
+        self.viewport().setBackgroundRole(QPalette.Shadow) # Dark background like the HTML export
+        self.viewport().update()
+
+    def setRows(self, rows):
+        # Replaces the art (e.g. an animation key frame); status lines appended below it stay
+        footer = self.footer
+        self.clear()
+        self.lines = list(rows)
+        self.row_count = len(self.lines)
+        self.footer = footer
+        self.max_columns = max((len(line) for line in self.lines + footer), default=0)
+        self.contentChanged()
+
+    def replaceRows(self, changed_rows):
+        # (index, text) pairs, e.g. animation deltas; repaints only those rows
+        if self.row_stride:
+            # Split the grid into lines once; the footer is left alone
+            self.lines = [self.row(i) for i in range(self.row_count)]
+            self.text = ''
+            self.row_stride = 0
+        top = self.verticalScrollBar().value()
+        line_height = self.lineHeight()
+        for index, text in changed_rows:
+            if index >= len(self.lines):
+                self.lines.extend([''] * (index + 1 - len(self.lines)))
+                self.row_count = len(self.lines)
+            self.lines[index] = text
+            self.max_columns = max(self.max_columns, len(text))
+            self.viewport().update(0, index * line_height - top, self.viewport().width(), line_height)
+        self.updateScrollBars()
+
+    def append(self, text):
+        self.footer.extend(text.split('\n'))
+        self.max_columns = max(self.max_columns, max(len(line) for line in self.footer))
+        self.contentChanged()
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def row(self, index):
+        if index < self.row_count:
+            if self.row_stride:
+                start = index * self.row_stride
+                return self.text[start:start + self.row_stride - 1]
+            return self.lines[index]
+        return self.footer[index - self.row_count]
+
+    def rowCount(self):
+        return self.row_count + len(self.footer)
+
+    def contentText(self):
+        # The art without the status footer
+        if self.row_stride:
+            return self.text
+        return '\n'.join(self.lines) + ('\n' if self.lines else '')
+
+    def toPlainText(self):
+        body = self.contentText()
+        if self.footer:
+            body += '\n'.join(self.footer) + '\n'
+        return body
+
+    def isEmpty(self):
+        return self.rowCount() == 0
+
+    # --- geometry -------------------------------------------------------
+
+    def lineHeight(self):
+        return QFontMetrics(self.font()).lineSpacing()
+
+    def charWidth(self):
+        return max(1, QFontMetrics(self.font()).horizontalAdvance('M'))
+
+    def contentChanged(self):
+        self.updateScrollBars()
+        self.viewport().update()
+
+    def updateScrollBars(self):
+        line_height = self.lineHeight()
+        viewport = self.viewport().size()
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, self.rowCount() * line_height - viewport.height()))
+        vbar.setPageStep(viewport.height())
+        vbar.setSingleStep(line_height)
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, self.max_columns * self.charWidth() - viewport.width()))
+        hbar.setPageStep(viewport.width())
+        hbar.setSingleStep(self.charWidth())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.updateScrollBars()
+
+    def scrollContentsBy(self, dx, dy):
+        # Blit what is already on screen; only the exposed strip gets repainted
+        self.viewport().scroll(dx, dy)
+
+    # --- glyph shapes ---------------------------------------------------
+
+    def glyphFont(self):
+        font = QFont(self.font())
+        font.setPixelSize(GLYPH_PIXEL_SIZE)
+        return font
+
+    def glyphFontKey(self):
+        # Identifies the rasterized glyphs for ascii_glyphs.load_glyph_index
+        font = self.glyphFont()
+        return f"qt:{font.family()}:{font.styleName()}:{font.weight()}:{GLYPH_PIXEL_SIZE}"
+
+    def rasterizeGlyphs(self, chars):
+        # (glyphs, height, width) ink coverage of each character in the viewer's font
+        font = self.glyphFont()
+        metrics = QFontMetrics(font)
+        width = max(1, max(metrics.horizontalAdvance(c) for c in chars))
+        height = max(1, metrics.height())
+        bitmaps = np.zeros((len(chars), height, width), dtype=np.float32)
+        for i, c in enumerate(chars):
+            image = QImage(width, height, QImage.Format_Grayscale8)
+            image.fill(0)
+            painter = QPainter(image)
+            painter.setFont(font)
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(0, metrics.ascent(), c)
+            painter.end()
+            data = np.frombuffer(image.constBits().asstring(image.sizeInBytes()), dtype=np.uint8)
+            bitmaps[i] = data.reshape(height, image.bytesPerLine())[:, :width] / 255
+        return bitmaps
+
+    # --- zoom -----------------------------------------------------------
+
+    def zoomBy(self, steps):
+        font = self.font()
+        size = min(MAX_POINT_SIZE, max(MIN_POINT_SIZE, font.pointSize() + steps))
+        if size == font.pointSize():
+            return
+        # Keep the row at the top of the view in place while the scale changes
+        vbar, hbar = self.verticalScrollBar(), self.horizontalScrollBar()
+        top_row = vbar.value() / self.lineHeight()
+        left_column = hbar.value() / self.charWidth()
+        font.setPointSize(size)
+        self.setFont(font)
+        self.updateScrollBars()
+        vbar.setValue(int(top_row * self.lineHeight()))
+        hbar.setValue(int(left_column * self.charWidth()))
+        self.viewport().update()
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            delta = event.angleDelta().y()
+            if delta:
+                self.zoomBy(1 if delta > 0 else -1)
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.ZoomIn):
+            self.zoomBy(1)
+        elif event.matches(QKeySequence.ZoomOut):
+            self.zoomBy(-1)
+        elif event.matches(QKeySequence.Copy):
+            QApplication.clipboard().setText(self.toPlainText())
+        else:
+            super().keyPressEvent(event)
+
+    # --- painting -------------------------------------------------------
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        painter.setPen(self.palette().color(QPalette.Text))
+        metrics = QFontMetrics(self.font())
+        line_height = metrics.lineSpacing()
+        char_width = self.charWidth()
+        top = self.verticalScrollBar().value()
+        left = self.horizontalScrollBar().value()
+
+        exposed = event.rect()
+        first_row = max(0, (top + exposed.top()) // line_height)
+        last_row = min(self.rowCount(), (top + exposed.bottom()) // line_height + 1)
+        first_column = max(0, (left + exposed.left()) // char_width)
+        column_count = exposed.width() // char_width + 2
+        x = first_column * char_width - left
+        y = first_row * line_height - top + metrics.ascent()
+        for index in range(first_row, last_row):
+            text = self.row(index)[first_column:first_column + column_count]
+            if self.color_indices is not None and index < self.row_count:
+                self.paintColorRow(painter, x, y, char_width, text,
+                                   self.color_indices[index, first_column:first_column + len(text)])
+            else:
+                painter.drawText(x, y, text)
+            y += line_height
+
+    def paintColorRow(self, painter, x, y, char_width, text, indices):
+        # One drawText per run of equal color within the visible slice
+        if not len(indices):
+            return
+        starts = np.flatnonzero(np.concatenate(([True], indices[1:] != indices[:-1])))
+        ends = np.append(starts[1:], len(indices))
+        for start, end in zip(starts, ends):
+            painter.setPen(self.colors[indices[start]])
+            painter.drawText(x + int(start) * char_width, y, text[start:end])
@@ -0,0 +1,297 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ascii_engine import CHAR_SETS, open_grayscale, pixels_to_ascii, pixels_to_codes, resize_pixels, write_text
+
+# Stage-by-stage benchmark of the image -> ASCII pipeline on synthetic images
+# generated at run time, with a stored baseline to catch regressions.
+#   python benchmarks/bench_ascii.py --save-baseline    # record this machine's numbers
+#   python benchmarks/bench_ascii.py --quick --check    # CI gate against that baseline
+#   python benchmarks/bench_ascii.py                    # full matrix, print table
+# The baseline holds absolute times, so it only means something on the machine
+# that wrote it; baseline.json is git-ignored and each machine records its own.
+# Stages: decode (file -> reduced image), resize (-> output grid), map (LUT
+# lookup that the other render modes and color output build on), text
+# (pixels_to_ascii, the converter's default map + join), save (write_text, as
+# the Save button does) and widget (AsciiView.setText + one paint).
+# Peak memory comes from a separate, untimed run of each stage: the larger of
+# the tracemalloc peak (NumPy buffers, Python objects) and, on Linux, the growth
+# of the process high-water mark after resetting it, which also sees Pillow's
+# image storage.
+
+IMAGE_SIZES = [(256, 256), (1024, 768), (1920, 1080), (3840, 2160), (7680, 4320)]
+WIDTHS = [80, 200, 500, 1000]
+QUICK_SIZES = [(256, 256), (1920, 1080), (7680, 4320)]
+QUICK_WIDTHS = [80, 500]
+QUICK_CHARSETS = [0, 2, 6]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25 # Allowed slowdown / memory growth over the baseline
+MIN_TIME_DELTA = 0.002 # Seconds; smaller absolute differences are treated as noise
+MMAP_THRESHOLD = 128 * 1024
+CONFIRM_ROUNDS = 2 # Extra measurements of flagged cases before --check fails
+WIDGET_REPEAT_FACTOR = 4 # Painting jitters by a few ms between runs; take the best of more samples
+
+
+def synthetic_image(size, seed=0):
+    # Gradients, rings and noise: compresses like a photo rather than a flat fill
+    width, height = size
+    rng = np.random.default_rng(seed)
+    y = np.linspace(-1, 1, height, dtype=np.float32)[:, None]
+    x = np.linspace(-1, 1, width, dtype=np.float32)[None, :]
+    base = 127 + 80 * np.sin(12 * np.sqrt(x * x + y * y)) + 40 * x
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, shift in enumerate((0, 30, 60)):
+        noise = rng.integers(-12, 13, size=(height, width), dtype=np.int16)
+        rgb[..., channel] = np.clip(base + shift - 30 + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(rgb)
+
+
+def write_images(directory, sizes, image_format):
+    paths = {}
+    for size in sizes:
+        path = os.path.join(directory, f"synthetic_{size[0]}x{size[1]}.{image_format}")
+        synthetic_image(size).save(path)
+        paths[size] = path
+    return paths
+
+
+def best_time(repeat, fn):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _rss_status(field):
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise OSError(field)
+
+
+def _reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM to the current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return _rss_status('VmRSS')
+    except OSError:
+        return None
+
+
+def peak_memory(fn):
+    gc.collect()
+    rss_before = _reset_peak_rss()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    if rss_before is not None:
+        peak = max(peak, _rss_status('VmHWM') - rss_before)
+    return peak
+
+
+class WidgetStage:
+    # AsciiView population + one synchronous paint, if PyQt5 is installed
+    def __init__(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        from ascii_viewer import AsciiView
+        self.app = QApplication.instance() or QApplication([])
+        self.view = AsciiView()
+        self.view.resize(800, 600)
+        self.view.show()
+
+    def __call__(self, text):
+        self.view.setText(text)
+        self.view.viewport().repaint()
+        self.app.processEvents()
+
+
+def run_suite(sizes, widths, charset_indices, image_format, repeat, with_widget, measure_memory):
+    results = {}
+    widget = None
+    if with_widget:
+        try:
+            widget = WidgetStage()
+        except ImportError:
+            print("PyQt5 not available: skipping the widget stage", file=sys.stderr)
+
+    def record(key, stage, seconds, cells, fn):
+        entry = {'seconds': seconds, 'cells_per_s': cells / seconds if seconds > 0 else 0.0}
+        if measure_memory:
+            entry['peak_bytes'] = peak_memory(fn)
+        results[f"{key}/{stage}"] = entry
+        print(f"{key:<28} {stage:<7} {seconds * 1000:10.2f} ms {entry['cells_per_s'] / 1e6:10.2f} Mcells/s"
+              + (f" {entry['peak_bytes'] / 1e6:9.2f} MB" if measure_memory else ''))
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_images(directory, sizes, image_format)
+        for size in sizes:
+            path = paths[size]
+            for width in widths:
+                key = f"{size[0]}x{size[1]}/w{width}"
+                decode = lambda: open_grayscale(path, width)
+                seconds, (img, target_size) = best_time(repeat, decode)
+                cells = target_size[0] * target_size[1]
+                record(key, 'decode', seconds, cells, decode)
+                resize = lambda: resize_pixels(img, target_size)
+                seconds, pixels = best_time(repeat, resize)
+                record(key, 'resize', seconds, cells, resize)
+                del img
+
+                for index in charset_indices:
+                    chars = CHAR_SETS[index]
+                    charset_key = f"{key}/cs{index}"
+                    mapping = lambda: pixels_to_codes(pixels, chars)
+                    seconds, codes = best_time(repeat, mapping)
+                    record(charset_key, 'map', seconds, cells, mapping)
+                    del codes
+                    to_text = lambda: pixels_to_ascii(pixels, chars)
+                    seconds, text = best_time(repeat, to_text)
+                    record(charset_key, 'text', seconds, cells, to_text)
+                    save = lambda: write_text(os.path.join(directory, 'output.txt'), text)
+                    seconds, _ = best_time(repeat, save)
+                    record(charset_key, 'save', seconds, cells, save)
+                    if widget is not None:
+                        populate = lambda: widget(text)
+                        seconds, _ = best_time(repeat * WIDGET_REPEAT_FACTOR, populate)
+                        record(charset_key, 'widget', seconds, cells, populate)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Returns [(case key, message)]; cases missing from either side are ignored
+    regressions = []
+    for key, entry in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        limit = base['seconds'] * (1 + tolerance)
+        if entry['seconds'] > limit and entry['seconds'] - base['seconds'] > MIN_TIME_DELTA:
+            regressions.append((key, f"{key}: {entry['seconds'] * 1000:.2f} ms vs baseline {base['seconds'] * 1000:.2f} ms"))
+        if 'peak_bytes' in entry and 'peak_bytes' in base:
+            if entry['peak_bytes'] > base['peak_bytes'] * (1 + tolerance) + 64 * 1024:
+                regressions.append((key, f"{key}: peak {entry['peak_bytes'] / 1e6:.2f} MB vs baseline {base['peak_bytes'] / 1e6:.2f} MB"))
+    return regressions
+
+
+def remeasure(results, keys, image_format, repeat, with_widget, measure_memory):
+    # Runs the flagged cases again and keeps the best time and lowest peak per case,
+    # so one noisy sample (scheduler, page cache, font cache) does not fail the gate
+    cases = set()
+    for key in keys:
+        parts = key.split('/')
+        size = tuple(int(v) for v in parts[0].split('x'))
+        charsets = (int(parts[2][2:]),) if len(parts) == 4 else ()
+        cases.add((size, int(parts[1][1:]), charsets))
+    for size, width, charsets in sorted(cases):
+        again = run_suite([size], [width], list(charsets), image_format, repeat, with_widget, measure_memory)
+        for key, entry in again.items():
+            old = results.get(key)
+            if old is None:
+                results[key] = entry
+                continue
+            old['seconds'] = min(old['seconds'], entry['seconds'])
+            old['cells_per_s'] = max(old['cells_per_s'], entry['cells_per_s'])
+            if 'peak_bytes' in entry:
+                old['peak_bytes'] = min(old.get('peak_bytes', entry['peak_bytes']), entry['peak_bytes'])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmark the ASCII conversion pipeline.')
+    parser.add_argument('--quick', action='store_true', help='small matrix for CI')
+    parser.add_argument('--sizes', nargs='+', help='image sizes WxH (default: 256x256 up to 7680x4320)')
+    parser.add_argument('--widths', nargs='+', type=int, help='output widths (default: 80 200 500 1000)')
+    parser.add_argument('--charsets', nargs='+', type=int, help='charset indices (default: all)')
+    parser.add_argument('--format', default='jpg', choices=['jpg', 'png', 'bmp'], help='synthetic image file format')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the best is kept')
+    parser.add_argument('--no-widget', action='store_true', help='skip the Qt widget stage')
+    parser.add_argument('--no-memory', action='store_true', help='skip peak-memory measurement')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='exit 1 if any case regresses beyond --tolerance')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--json', help='also write the raw results here')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if (argv is None and not args.no_memory and sys.platform.startswith('linux')
+            and 'MALLOC_MMAP_THRESHOLD_' not in os.environ):
+        # glibc raises its mmap threshold after large frees and then keeps those
+        # pages resident, hiding later peaks from VmHWM; a fixed threshold keeps
+        # big buffers mmapped so every stage's peak is visible. Needs a re-exec.
+        os.environ['MALLOC_MMAP_THRESHOLD_'] = str(MMAP_THRESHOLD)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    if args.sizes:
+        sizes = [tuple(int(v) for v in size.split('x')) for size in args.sizes]
+    else:
+        sizes = QUICK_SIZES if args.quick else IMAGE_SIZES
+    widths = args.widths or (QUICK_WIDTHS if args.quick else WIDTHS)
+    if args.charsets is not None:
+        charset_indices = args.charsets
+    else:
+        charset_indices = QUICK_CHARSETS if args.quick else list(range(len(CHAR_SETS)))
+
+    results = run_suite(sizes, widths, charset_indices, args.format, args.repeat,
+                        not args.no_widget, not args.no_memory)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results) # A --quick run refreshes its cases without dropping the rest
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline} ({len(results)} cases)")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 2
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for _ in range(CONFIRM_ROUNDS):
+            if not regressions:
+                break
+            print(f"\nRe-measuring {len(regressions)} flagged case(s)")
+            remeasure(results, {key for key, _ in regressions}, args.format, args.repeat * 2,
+                      not args.no_widget, not args.no_memory)
+            regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:", file=sys.stderr)
+            for _, line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
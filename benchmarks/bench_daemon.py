@@ -0,0 +1,169 @@
+import argparse
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# End-to-end throughput of the headless daemon: a local stand-in media server
+# serves synthetic files, the daemon is started as its own process, every URL
+# is submitted through POST /jobs and completion is followed on the /events
+# SSE stream, the way the thin GUI client sees it.
+#   python benchmarks/bench_daemon.py --files 12 --size 20 --concurrent 3 --rate 50
+
+DAEMON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'youtube_downloader', 'daemon.py')
+FINISHED = ('done', 'failed', 'cancelled', 'skipped')
+
+
+class ThrottledHandler(SimpleHTTPRequestHandler):
+    rate = None # bytes/s per connection; None is unthrottled
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        chunk = 256 * 1024
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            data = source.read(chunk)
+            if not data:
+                return
+            outputfile.write(data)
+            sent += len(data)
+            if self.rate:
+                delay = sent / self.rate - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def make_files(directory, count, size):
+    # one random blob copied per name so nothing compresses or dedups
+    blob = os.urandom(size)
+    with open(os.path.join(directory, 'warmup.mp4'), 'wb') as f:
+        f.write(blob[:1000 * 1000])
+    for i in range(count):
+        with open(os.path.join(directory, f"clip{i}.mp4"), 'wb') as f:
+            f.write(blob)
+
+
+# sent with every API request; start_daemon adds the daemon's token
+headers = {'Content-Type': 'application/json'}
+
+
+def start_daemon(concurrent, out_dir, journal, token_file):
+    process = subprocess.Popen([sys.executable, DAEMON, '--port', '0', '--max-concurrent', str(concurrent),
+                                '--output-dir', out_dir, '--journal', journal, '--no-resume',
+                                '--token-file', token_file],
+                               stdout=subprocess.PIPE, universal_newlines=True)
+    line = process.stdout.readline()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise RuntimeError(f"daemon did not start: {line!r}")
+    # keep draining the daemon's console log so it never blocks on a full pipe
+    threading.Thread(target=process.stdout.read, daemon=True).start()
+    with open(token_file, encoding='utf-8') as f:
+        headers['Authorization'] = f"Bearer {f.read().strip()}"
+    return process, line.split()[-1]
+
+
+def api(base, method, path, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = urllib.request.Request(base + path, data=data, method=method, headers=headers)
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)
+
+
+def wait_for(base, job_id):
+    while api(base, 'GET', f"/jobs/{job_id}")['state'] not in FINISHED:
+        time.sleep(0.05)
+
+
+def follow_events(base, ids, first_progress, finished):
+    # reads /events until every submitted job reached a finished state
+    with urllib.request.urlopen(urllib.request.Request(base + '/events', headers=headers)) as response:
+        kind, data = None, []
+        for raw in response:
+            line = raw.decode('utf-8').rstrip('\r\n')
+            if line.startswith('event:'):
+                kind = line[6:].strip()
+            elif line.startswith('data:'):
+                data.append(line[5:].strip())
+            elif not line and data:
+                event = json.loads('\n'.join(data))
+                now = time.perf_counter()
+                if kind == 'progress' and event['id'] not in first_progress:
+                    first_progress[event['id']] = now
+                elif kind == 'job' and event['state'] in FINISHED:
+                    finished[event['id']] = (now, event['state'])
+                if ids and ids.issubset(finished):
+                    return
+                kind, data = None, []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure daemon throughput end to end against a local media server.')
+    parser.add_argument('--files', type=int, default=12)
+    parser.add_argument('--size', type=float, default=20, help='size of each file in MB')
+    parser.add_argument('--concurrent', type=int, default=3, help='daemon download slots')
+    parser.add_argument('--rate', type=float, default=0, help='per-connection server rate in MB/s (0: unthrottled)')
+    args = parser.parse_args(argv)
+
+    ThrottledHandler.rate = args.rate * 1000 * 1000 or None
+    size = int(args.size * 1000 * 1000)
+    with tempfile.TemporaryDirectory() as serve_dir, tempfile.TemporaryDirectory() as out_dir:
+        make_files(serve_dir, args.files, size)
+        server = QuietServer(('127.0.0.1', 0), functools.partial(ThrottledHandler, directory=serve_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        media = f"http://127.0.0.1:{server.server_address[1]}"
+        daemon, base = start_daemon(args.concurrent, out_dir, os.path.join(out_dir, 'bench.db'),
+                                    os.path.join(out_dir, 'bench.token'))
+        try:
+            # one small job first so worker start-up is not counted in the batch
+            warmup = api(base, 'POST', '/jobs', {'urls': [f"{media}/warmup.mp4"]})['jobs'][0]
+            wait_for(base, warmup['id'])
+            # subscribe first so no event is missed; ids fill in once the submit returns
+            ids = set()
+            first_progress, finished = {}, {}
+            follower = threading.Thread(target=follow_events, args=(base, ids, first_progress, finished), daemon=True)
+            follower.start()
+            time.sleep(0.2)
+            start = time.perf_counter()
+            jobs = api(base, 'POST', '/jobs', {'urls': [f"{media}/clip{i}.mp4" for i in range(args.files)]})['jobs']
+            submitted = time.perf_counter()
+            ids.update(job['id'] for job in jobs)
+            follower.join()
+            elapsed = max(at for at, state in finished.values()) - start
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.shutdown()
+
+    failed = [job_id for job_id, (at, state) in finished.items() if state != 'done']
+    if failed:
+        print(f"{len(failed)} jobs did not finish: {sorted(failed)}", file=sys.stderr)
+        return 1
+    first_bytes = sorted(at - start for at in first_progress.values())
+    total = size * args.files
+    print(f"{args.files} files of {size / 1e6:.1f} MB, {args.concurrent} daemon slots, "
+          f"{f'{args.rate:g} MB/s per connection' if args.rate else 'unthrottled server'}")
+    print(f"submit     {1000 * (submitted - start):7.1f} ms for {args.files} URLs")
+    print(f"first data {1000 * first_bytes[0]:7.1f} ms after submit")
+    print(f"batch      {elapsed:7.2f} s | {total / elapsed / 1e6:.1f} MB/s | {args.files / elapsed:.2f} jobs/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
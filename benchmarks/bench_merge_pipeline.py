@@ -0,0 +1,158 @@
+import argparse
+import functools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'youtube_downloader'))
+
+from download_queue import DownloadQueue, FINISHED_STATES
+from info_cache import InfoCache
+from postprocess import PostProcessPool, ffmpeg_available
+from ydl_pool import WorkerPool
+
+# Batch wall-clock time with the stream merge done inside the download slot
+# (inline) versus handed to the separate post-processing pool (pipelined).
+# Each clip is served as a separate video-only and audio-only stream, the way
+# YouTube serves DASH formats, from a local server throttled per connection so
+# downloads take network-like time. Needs ffmpeg on PATH.
+#   python benchmarks/bench_merge_pipeline.py --clips 6 --concurrent 2 --rate 40
+
+
+class ThrottledHandler(SimpleHTTPRequestHandler):
+    rate = None # bytes/s per connection
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        chunk = 256 * 1024
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            data = source.read(chunk)
+            if not data:
+                return
+            outputfile.write(data)
+            sent += len(data)
+            delay = sent / self.rate - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass
+
+
+class Listener:
+    def job_changed(self, job):
+        pass
+
+    def job_output(self, job, line):
+        if line.startswith('ERROR'):
+            print(f"#{job.id} {line}", file=sys.stderr)
+
+    def job_progress(self, job, event):
+        pass
+
+
+def make_streams(directory, clips, seconds):
+    # one rendered clip copied per id; the bytes are what matter here
+    video = os.path.join(directory, 'video.mp4')
+    audio = os.path.join(directory, 'audio.m4a')
+    # lossless encode so the streams are large (~4 MB per second) like high-bitrate DASH video
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'testsrc2=size=1920x1080:rate=30',
+                    '-t', str(seconds), '-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0', '-an', video], check=True)
+    subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+                    '-c:a', 'aac', audio], check=True)
+    for i in range(clips):
+        shutil.copy(video, os.path.join(directory, f"v{i}.mp4"))
+        shutil.copy(audio, os.path.join(directory, f"a{i}.m4a"))
+
+
+def info_json(base, i):
+    return {'id': f"clip{i}", 'title': f"Clip {i}", 'extractor': 'generic', 'extractor_key': 'Generic',
+            'webpage_url': f"{base}/clip{i}", 'original_url': f"{base}/clip{i}",
+            'formats': [{'format_id': 'v', 'url': f"{base}/v{i}.mp4", 'ext': 'mp4', 'protocol': 'http',
+                         'vcodec': 'avc1.640028', 'acodec': 'none', 'width': 1920, 'height': 1080},
+                        {'format_id': 'a', 'url': f"{base}/a{i}.m4a", 'ext': 'm4a', 'protocol': 'http',
+                         'vcodec': 'none', 'acodec': 'mp4a.40.2'}]}
+
+
+def run_batch(base, clips, concurrent, out_dir, pipelined):
+    # the info cache is seeded directly because the synthetic URLs cannot be extracted
+    cache = InfoCache()
+    for i in range(clips):
+        def fetch(url, path, i=i):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(info_json(base, i), f)
+            return 'Generic', f"clip{i}", 'v+a', 'mp4'
+        cache.release(cache.resolve(f"{base}/clip{i}", fetch))
+    pool = WorkerPool(info_cache=cache)
+    pool.prewarm(concurrent)
+    while len(pool.idle) < concurrent:
+        time.sleep(0.01)
+    postprocessor = PostProcessPool() if pipelined else None
+    queue = DownloadQueue(concurrent, runner=pool.run, listener=Listener(), postprocessor=postprocessor)
+    start = time.perf_counter()
+    jobs = [queue.add(f"{base}/clip{i}", out_dir) for i in range(clips)]
+    while any(job.state not in FINISHED_STATES for job in jobs):
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    queue.shutdown()
+    pool.shutdown()
+    if postprocessor:
+        postprocessor.shutdown()
+    cache.close()
+    failed = [job for job in jobs if job.state != 'done']
+    if failed:
+        raise RuntimeError(f"{len(failed)} jobs did not finish: {failed}")
+    return elapsed, [job.merge_seconds for job in jobs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare inline and pipelined stream merging.')
+    parser.add_argument('--clips', type=int, default=6)
+    parser.add_argument('--concurrent', type=int, default=2, help='download slots')
+    parser.add_argument('--seconds', type=int, default=10, help='length of each synthetic clip')
+    parser.add_argument('--rate', type=float, default=40, help='per-connection server rate in MB/s')
+    args = parser.parse_args(argv)
+    if not ffmpeg_available():
+        print('ffmpeg is required for this benchmark', file=sys.stderr)
+        return 1
+
+    ThrottledHandler.rate = args.rate * 1000 * 1000
+    with tempfile.TemporaryDirectory() as serve_dir, tempfile.TemporaryDirectory() as out_dir:
+        make_streams(serve_dir, args.clips, args.seconds)
+        size = os.path.getsize(os.path.join(serve_dir, 'v0.mp4')) + os.path.getsize(os.path.join(serve_dir, 'a0.m4a'))
+        server = QuietServer(('127.0.0.1', 0), functools.partial(ThrottledHandler, directory=serve_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            results = {}
+            for name, pipelined in (('inline', False), ('pipelined', True)):
+                target = os.path.join(out_dir, name)
+                os.makedirs(target)
+                results[name] = run_batch(base, args.clips, args.concurrent, target, pipelined)
+        finally:
+            server.shutdown()
+
+    print(f"{args.clips} clips of {size / 1e6:.1f} MB, {args.concurrent} download slots, {args.rate:g} MB/s per connection")
+    for name, (elapsed, merges) in results.items():
+        line = f"{name:<10} batch {elapsed:6.2f} s"
+        if any(merges):
+            line += f" | merge per job: mean {sum(merges) / len(merges):.2f} s, max {max(merges):.2f} s"
+        print(line)
+    print(f"speedup: {results['inline'][0] / results['pipelined'][0]:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ascii_engine import CHAR_SETS, pixels_to_ascii
+from ascii_modes import ATKINSON, FLOYD_STEINBERG, MODE_ATKINSON, MODE_EDGES, MODE_FLOYD_STEINBERG, error_diffusion, render
+
+# Compares the vectorized rendering modes against straightforward per-pixel
+# Python loops on the same grids, and checks that both produce the same output.
+#   python benchmarks/bench_modes.py
+#   python benchmarks/bench_modes.py --sizes 80x44 200x110 --repeat 5
+
+
+def synthetic_pixels(width, height, seed=0):
+    # Smooth gradients plus noise and a few hard edges, so every mode has work to do
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = 127 + 100 * np.sin(x / 7.0) * np.cos(y / 5.0) + rng.normal(0, 20, (height, width))
+    pixels[height // 3:2 * height // 3, width // 4:width // 2] = 240
+    return np.clip(pixels, 0, 255).astype(np.uint8)
+
+
+def naive_threshold(pixels, chars):
+    # The original convertToAscii loop
+    rows = []
+    for row in pixels.tolist():
+        rows.append(''.join(chars[int((value / 255) * (len(chars) - 1))] for value in row))
+    return '\n'.join(rows) + '\n'
+
+
+def naive_error_diffusion(pixels, levels, kernel):
+    height, width = pixels.shape
+    buf = pixels.astype(np.float64).tolist()
+    out = [[0] * width for _ in range(height)]
+    for y in range(height):
+        for x in range(width):
+            value = buf[y][x]
+            level = min(levels - 1, max(0, round(value * (levels - 1) / 255)))
+            out[y][x] = level
+            error = value - level * 255 / (levels - 1)
+            for dy, dx, weight in kernel:
+                if 0 <= y + dy < height and 0 <= x + dx < width:
+                    buf[y + dy][x + dx] += error * weight
+    return np.array(out, dtype=np.uint8)
+
+
+def best_of(repeat, fn, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ASCII rendering modes.')
+    parser.add_argument('--sizes', nargs='+', default=['80x44', '200x110', '500x275'], help='grid sizes WxH')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--naive-limit', type=int, default=60000, help='skip naive loops above this many cells')
+    args = parser.parse_args(argv)
+
+    chars = CHAR_SETS[2]
+    print(f"{'grid':>10} {'mode':>16} {'vectorized ms':>14} {'naive ms':>10} {'speedup':>8} {'match':>7}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split('x'))
+        pixels = synthetic_pixels(width, height)
+        run_naive = width * height <= args.naive_limit
+
+        cases = [
+            ('Brightness', lambda: pixels_to_ascii(pixels, chars), lambda: naive_threshold(pixels, chars)),
+            (MODE_FLOYD_STEINBERG, lambda: error_diffusion(pixels, len(chars), FLOYD_STEINBERG),
+             lambda: naive_error_diffusion(pixels, len(chars), FLOYD_STEINBERG)),
+            (MODE_ATKINSON, lambda: error_diffusion(pixels, len(chars), ATKINSON),
+             lambda: naive_error_diffusion(pixels, len(chars), ATKINSON)),
+            (MODE_EDGES, lambda: render(pixels, chars, MODE_EDGES), None),
+        ]
+        for name, fast, naive in cases:
+            fast_time, fast_result = best_of(args.repeat, fast)
+            if naive is not None and run_naive:
+                naive_time, naive_result = best_of(1, naive)
+                if isinstance(fast_result, str):
+                    match = f"{100.0 if fast_result == naive_result else 0.0:.1f}%"
+                else:
+                    # Float accumulation order differs slightly, so report agreement
+                    match = f"{100.0 * np.mean(fast_result == naive_result):.1f}%"
+                print(f"{size:>10} {name:>16} {fast_time * 1000:14.2f} {naive_time * 1000:10.1f} "
+                      f"{naive_time / fast_time:7.1f}x {match:>7}")
+            else:
+                print(f"{size:>10} {name:>16} {fast_time * 1000:14.2f} {'-':>10} {'-':>8} {'-':>7}")
+        # Full-mode render cost including the text join, for the interactive path
+        for mode in (MODE_FLOYD_STEINBERG, MODE_ATKINSON):
+            full_time, _ = best_of(args.repeat, render, pixels, chars, mode)
+            print(f"{size:>10} {mode + ' text':>16} {full_time * 1000:14.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
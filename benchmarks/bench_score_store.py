@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game'))
+
+from score_store import COLUMNS, ScoreStore
+
+# What a game-over costs the UI thread when it saves the score, and how fast the
+# leaderboard queries are once the history is large. Saving: rewriting a JSON
+# file (write, fsync, rename), one SQLite commit per game, and ScoreStore.record
+# (queued; a writer thread batches the commits). Queries: top 10 and personal
+# best over N stored sessions. Everything runs in a temporary directory.
+#   python benchmarks/bench_score_store.py
+#   python benchmarks/bench_score_store.py --games 500 --history 1000000
+
+LANGUAGES = ('korean', 'english')
+DIFFICULTIES = ('easy', 'normal', 'hard')
+
+
+def save_json(path, scores, language, difficulty, score):
+    scores.setdefault(language, {})
+    scores[language][difficulty] = max(score, scores[language].get(difficulty, 0))
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(scores, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def percentile(times, fraction):
+    ordered = sorted(times)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, times):
+    print(f"{name:>22} {sum(times) / len(times) * 1000:9.3f} {percentile(times, 0.99) * 1000:9.3f} "
+          f"{max(times) * 1000:9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark score saving and leaderboard queries.')
+    parser.add_argument('--games', type=int, default=200, help='game-overs to save per method')
+    parser.add_argument('--history', type=int, nargs='+', default=[10000, 200000], help='stored sessions for queries')
+    args = parser.parse_args(argv)
+    random.seed(0)
+    games = [(random.choice(LANGUAGES), random.choice(DIFFICULTIES), random.randrange(100)) for _ in range(args.games)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"save on the UI thread, {args.games} game-overs")
+        print(f"{'method':>22} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        path, scores, times = os.path.join(directory, 'high_scores.json'), {}, []
+        for language, difficulty, score in games:
+            start = time.perf_counter()
+            save_json(path, scores, language, difficulty, score)
+            times.append(time.perf_counter() - start)
+        report('json write+rename', times)
+
+        db, times = sqlite3.connect(os.path.join(directory, 'commit.db'), isolation_level=None), []
+        db.execute('CREATE TABLE sessions (language TEXT, difficulty TEXT, score INTEGER, ended REAL)')
+        for language, difficulty, score in games:
+            start = time.perf_counter()
+            db.execute('INSERT INTO sessions VALUES (?, ?, ?, ?)', (language, difficulty, score, time.time()))
+            times.append(time.perf_counter() - start)
+        db.close()
+        report('sqlite commit per game', times)
+
+        store, times = ScoreStore(os.path.join(directory, 'store.db'), os.path.join(directory, 'none.json')), []
+        for language, difficulty, score in games:
+            start = time.perf_counter()
+            store.record(language, difficulty, score, duration=60.0, started=time.time())
+            times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        store.close()
+        report('ScoreStore.record', times)
+        print(f"{'(writer flush on close':>22} {(time.perf_counter() - start) * 1000:9.3f} ms)")
+
+        print()
+        print(f"{'sessions':>9} {'top 10 ms':>10} {'best ms':>10}")
+        for count in args.history:
+            path = os.path.join(directory, f'history{count}.db')
+            store = ScoreStore(path, os.path.join(directory, 'none.json'), player='player0')
+            rows = [(f'{i}', f'player{i % 50}', random.choice(LANGUAGES), random.choice(DIFFICULTIES),
+                     random.randrange(1000), 60.0, i, i) for i in range(count)]
+            store.db.execute('BEGIN')
+            store.db.executemany(f'INSERT INTO sessions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            store.db.execute('COMMIT')
+            repeat = 200
+            start = time.perf_counter()
+            for _ in range(repeat):
+                store.top_scores('korean', 'hard', 10)
+            top = (time.perf_counter() - start) / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                store.personal_best('korean', 'hard')
+            best = (time.perf_counter() - start) / repeat
+            store.close()
+            print(f"{count:>9} {top * 1000:10.3f} {best * 1000:10.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game'))
+
+from PyQt5.QtWidgets import QApplication, QLabel, QWidget
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt
+
+from word_canvas import WordCanvas
+
+# Frame time of the falling-word game area with many words on screen: the
+# original one-QLabel-per-word widgets against the single painted WordCanvas.
+# Every frame moves all words (one 30 ms game step for the canvas), lets Qt
+# paint, and replaces a few words the way typing (caught words) and falling
+# off the bottom do. Runs offscreen by default.
+#   python benchmarks/bench_word_canvas.py --words 50 200 500 --frames 300
+#   QT_QPA_PLATFORM=xcb python benchmarks/bench_word_canvas.py
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game',
+                          'english_words.txt')
+BACKGROUND = "#ADD8E6"
+FRAME_SECONDS = 0.030 # the original game_timer interval
+
+
+class LabelWord(QLabel):
+    # the original FallingWord
+    def __init__(self, word, parent=None):
+        super().__init__(word, parent)
+        self.word = word
+        self.speed = 0
+        self.y_pos = 0
+        self.x_pos = 0
+        self.setFont(QFont("Arial", 28, QFont.Bold))
+        self.setStyleSheet("color: black;")
+        self.setAlignment(Qt.AlignCenter)
+        self.adjustSize()
+
+    def move_down(self):
+        self.y_pos += self.speed
+        self.move(int(self.x_pos), int(self.y_pos))
+
+
+class LabelArea:
+    def __init__(self, window):
+        self.area = QWidget(window)
+        self.area.setStyleSheet("background-color: transparent;")
+        self.area.setGeometry(window.rect())
+        self.area.show()
+        self.words = []
+
+    def spawn(self, text, speed, y_pos=0):
+        word = LabelWord(text, self.area)
+        word.speed = speed
+        max_x = self.area.width() - word.width()
+        word.x_pos = random.randint(0, max_x) if max_x > 0 else 0
+        word.y_pos = y_pos
+        word.move(word.x_pos, int(word.y_pos))
+        word.show()
+        self.words.append(word)
+
+    def remove(self, word):
+        self.words.remove(word)
+        word.deleteLater()
+
+    def advance(self):
+        fallen = []
+        for word in self.words:
+            word.move_down()
+            if word.y_pos > self.area.height():
+                fallen.append(word)
+        return fallen
+
+
+class CanvasArea:
+    def __init__(self, window):
+        self.canvas = WordCanvas(QColor(BACKGROUND), window)
+        self.canvas.setGeometry(window.rect())
+        self.canvas.show()
+        self.words = self.canvas.words
+
+    def spawn(self, text, speed, y_pos=0):
+        # speed is in pixels per frame like the labels; the canvas moves in pixels per second
+        word = self.canvas.spawn(text, speed / FRAME_SECONDS)
+        # spread the starting heights like a game that has been running for a while
+        word.y_pos = word.prev_y = y_pos
+        word.rect.moveTop(int(y_pos))
+
+    def remove(self, word):
+        self.canvas.remove(word)
+
+    def advance(self):
+        fallen = self.canvas.step(FRAME_SECONDS)
+        self.canvas.render()
+        return fallen
+
+
+def run(app, area_class, words, count, frames, churn, size, speed):
+    random.seed(0)
+    window = QWidget()
+    window.setFixedSize(*size)
+    window.setAutoFillBackground(True)
+    palette = window.palette()
+    palette.setColor(window.backgroundRole(), QColor(BACKGROUND))
+    window.setPalette(palette)
+    window.show()
+    area = area_class(window)
+    for _ in range(count):
+        area.spawn(random.choice(words), speed, random.uniform(0, size[1]))
+    app.processEvents()
+    times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        for word in area.advance():
+            area.remove(word)
+            area.spawn(random.choice(words), speed)
+        for _ in range(churn):
+            area.remove(random.choice(area.words))
+            area.spawn(random.choice(words), speed)
+        app.processEvents()
+        times.append(time.perf_counter() - start)
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    times.sort()
+    return sum(times) / len(times), times[int(len(times) * 0.95)], times[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the falling-word renderers.')
+    parser.add_argument('--words', type=int, nargs='+', default=[50, 200, 500], help='words on screen')
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--churn', type=int, default=2, help='words caught and respawned per frame')
+    parser.add_argument('--size', default='1920x1080')
+    parser.add_argument('--speed', type=float, default=13.5, help='pixels per frame (hard at 1080p)')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv[:1])
+    with open(WORDS_FILE, encoding='utf-8') as f:
+        words = [line.strip() for line in f if line.strip()]
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    print(f"{args.size}, {args.frames} frames, {args.churn} caught words per frame ({os.environ['QT_QPA_PLATFORM']})")
+    print(f"{'words':>6} {'renderer':>8} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for count in args.words:
+        results = {}
+        for name, area_class in (('labels', LabelArea), ('canvas', CanvasArea)):
+            results[name] = run(app, area_class, words, count, args.frames, args.churn, size, args.speed)
+            mean, p95, worst = results[name]
+            print(f"{count:>6} {name:>8} {mean * 1000:8.2f} {p95 * 1000:8.2f} {worst * 1000:8.2f}")
+        print(f"{count:>6} {'speedup':>8} {results['labels'][0] / results['canvas'][0]:7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
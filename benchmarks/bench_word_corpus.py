@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game'))
+
+from word_corpus import DIFFICULTIES, Corpus, compile_corpus
+
+# Selecting a language and spawning words from a large dictionary: the original
+# load_words (read and strip the whole .txt on every selection, random.choice over
+# every word) against a compiled .corpus opened with mmap and sampled per
+# difficulty. The dictionary is synthetic Hangul or Latin words, written to a
+# temporary directory.
+#   python benchmarks/bench_word_corpus.py
+#   python benchmarks/bench_word_corpus.py --words 100000 1000000 --lang english
+
+
+def synthetic_words(count, lang, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        length = rng.choice((1, 2, 2, 3, 3, 3, 4, 5, 6))
+        if lang == 'korean':
+            words.add(''.join(chr(0xAC00 + rng.randrange(11172)) for _ in range(length)))
+        else:
+            words.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length + 2)))
+    return sorted(words)
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def load_text(path):
+    # the original load_words
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark word list loading and sampling.')
+    parser.add_argument('--words', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--lang', choices=['korean', 'english'], default='korean')
+    parser.add_argument('--samples', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{args.lang}, best of {args.repeat}, {args.samples} samples")
+    print(f"{'words':>8} {'format':>7} {'load ms':>9} {'peak MB':>8} {'us/sample':>10} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.words:
+            text_path = os.path.join(directory, f'{count}.txt')
+            corpus_path = os.path.join(directory, f'{count}.corpus')
+            with open(text_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(synthetic_words(count, args.lang)) + '\n')
+            build, _ = timed(lambda: compile_corpus(text_path, corpus_path), 1)
+
+            load, words = timed(lambda: load_text(text_path), args.repeat)
+            peak, _ = peak_memory(lambda: load_text(text_path))
+            sample, _ = timed(lambda: [random.choice(words) for _ in range(args.samples)], args.repeat)
+            print(f"{count:>8} {'txt':>7} {load * 1000:9.2f} {peak / 1e6:8.1f} {sample / args.samples * 1e6:10.3f} "
+                  f"{os.path.getsize(text_path) / 1e6:8.1f}")
+
+            def open_corpus():
+                corpus = Corpus(corpus_path)
+                corpus.close()
+
+            load, _ = timed(open_corpus, args.repeat)
+            corpus = Corpus(corpus_path)
+            peak, _ = peak_memory(lambda: Corpus(corpus_path).close())
+            sample, _ = timed(lambda: [corpus.sample(DIFFICULTIES[i % 3]) for i in range(args.samples)], args.repeat)
+            corpus.close()
+            print(f"{count:>8} {'corpus':>7} {load * 1000:9.2f} {peak / 1e6:8.1f} {sample / args.samples * 1e6:10.3f} "
+                  f"{os.path.getsize(corpus_path) / 1e6:8.1f}   (build {build * 1000:.0f} ms, once)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
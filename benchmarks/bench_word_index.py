@@ -0,0 +1,111 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game'))
+
+from word_index import WordIndex, word_key
+
+# Cost of one keystroke in the word game as the number of words on screen grows:
+# the original linear scan over the falling words (startswith for highlighting,
+# == for the match) against WordIndex (hash for the match, prefix trie for the
+# highlight). Every keystroke types the next jamo of a word that is on screen,
+# catches it when complete and spawns a replacement, so the screen stays full.
+#   python benchmarks/bench_word_index.py
+#   python benchmarks/bench_word_index.py --words 100 1000 10000 --lang english
+
+WORDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'word_erasing_game')
+
+
+class Word:
+    __slots__ = ('word', 'key')
+
+    def __init__(self, word):
+        self.word = word
+        self.key = word_key(word)
+
+
+class ScanScreen:
+    def __init__(self):
+        self.words = []
+
+    def add(self, word_obj):
+        self.words.append(word_obj)
+
+    def remove(self, word_obj):
+        self.words.remove(word_obj)
+
+    def keystroke(self, typed):
+        for word_obj in self.words:
+            if word_obj.key == typed:
+                return word_obj, ()
+        return None, [word_obj for word_obj in self.words if word_obj.key.startswith(typed)]
+
+
+class IndexScreen:
+    def __init__(self):
+        self.index = WordIndex()
+
+    def add(self, word_obj):
+        self.index.add(word_obj.key, word_obj)
+
+    def remove(self, word_obj):
+        self.index.remove(word_obj.key, word_obj)
+
+    def keystroke(self, typed):
+        word_obj = self.index.find(typed)
+        if word_obj is not None:
+            return word_obj, ()
+        return None, self.index.matches(typed)
+
+
+def run(screen_class, vocabulary, count, keystrokes):
+    random.seed(0)
+    screen = screen_class()
+    on_screen = []
+    for _ in range(count):
+        word_obj = Word(random.choice(vocabulary))
+        screen.add(word_obj)
+        on_screen.append(word_obj)
+    target, typed, highlighted = random.choice(on_screen), '', 0
+    start = time.perf_counter()
+    for _ in range(keystrokes):
+        typed = target.key[:len(typed) + 1]
+        caught, matches = screen.keystroke(typed)
+        highlighted += len(matches)
+        if caught is not None:
+            screen.remove(caught)
+            on_screen[on_screen.index(caught)] = replacement = Word(random.choice(vocabulary))
+            screen.add(replacement)
+            target, typed = random.choice(on_screen), ''
+    elapsed = time.perf_counter() - start
+    return elapsed / keystrokes, highlighted / keystrokes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark per-keystroke word matching.')
+    parser.add_argument('--words', type=int, nargs='+', default=[50, 500, 5000], help='words on screen')
+    parser.add_argument('--keystrokes', type=int, default=20000)
+    parser.add_argument('--lang', choices=['korean', 'english'], default='korean')
+    args = parser.parse_args(argv)
+
+    with open(os.path.join(WORDS_DIR, f'{args.lang}_words.txt'), encoding='utf-8') as f:
+        vocabulary = [line.strip() for line in f if line.strip()]
+
+    print(f"{args.lang}, {args.keystrokes} keystrokes")
+    print(f"{'words':>6} {'matcher':>8} {'us/key':>8} {'matches/key':>12}")
+    for count in args.words:
+        results = {}
+        for name, screen_class in (('scan', ScanScreen), ('index', IndexScreen)):
+            # on_screen.index() in the replacement bookkeeping is O(n) for both; catches are rare enough not to matter
+            results[name] = run(screen_class, vocabulary, count, args.keystrokes)
+            per_key, matches = results[name]
+            print(f"{count:>6} {name:>8} {per_key * 1e6:8.2f} {matches:12.1f}")
+        print(f"{count:>6} {'speedup':>8} {results['scan'][0] / results['index'][0]:7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
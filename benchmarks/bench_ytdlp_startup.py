@@ -0,0 +1,105 @@
+import argparse
+import functools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'youtube_downloader'))
+
+from download_queue import DownloadJob, run_yt_dlp
+from ydl_pool import WorkerPool
+
+# Per-job startup latency of the two yt-dlp execution backends, measured
+# against a local HTTP server so no real network is involved:
+#   subprocess - one `python -m yt_dlp` per job (the original behaviour)
+#   pool       - warm worker processes with yt_dlp already imported
+# "first event" is the time from submitting a job to its first output line or
+# progress event; "total" is the time until the job has finished.
+#   python benchmarks/bench_ytdlp_startup.py --jobs 10 --size 1000000
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass # yt-dlp may close a connection early while probing
+
+
+def serve(directory):
+    server = QuietServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_job(runner, url):
+    job = DownloadJob(0, url)
+    start = time.perf_counter()
+    first = []
+
+    def mark(*_):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    returncode = runner(job, mark, lambda state: None, mark)
+    total = time.perf_counter() - start
+    if returncode != 0:
+        raise RuntimeError(f"download of {url} failed with {returncode}")
+    return first[0] if first else total, total
+
+
+def report(name, samples):
+    firsts = [first for first, _ in samples]
+    totals = [total for _, total in samples]
+    print(f"{name:<12} first event: median {statistics.median(firsts) * 1000:8.1f} ms, "
+          f"mean {statistics.mean(firsts) * 1000:8.1f} ms | "
+          f"total: median {statistics.median(totals) * 1000:8.1f} ms, mean {statistics.mean(totals) * 1000:8.1f} ms")
+    return statistics.median(totals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare yt-dlp backend startup latency against a local server.')
+    parser.add_argument('--jobs', type=int, default=8, help='downloads per backend (run one after another)')
+    parser.add_argument('--size', type=int, default=256 * 1024, help='bytes per served file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as serve_dir, tempfile.TemporaryDirectory() as out_dir:
+        for i in range(2 * args.jobs):
+            with open(os.path.join(serve_dir, f"clip{i}.mp4"), 'wb') as f:
+                f.write(os.urandom(args.size))
+        server = serve(serve_dir)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        cwd = os.getcwd()
+        os.chdir(out_dir) # Both backends write into the current directory
+        try:
+            subprocess_samples = [time_job(run_yt_dlp, f"{base}/clip{i}.mp4") for i in range(args.jobs)]
+
+            pool = WorkerPool()
+            warm_start = time.perf_counter()
+            pool.prewarm(1)
+            while not pool.idle:
+                time.sleep(0.005)
+            warm_up = time.perf_counter() - warm_start
+            try:
+                pool_samples = [time_job(pool.run, f"{base}/clip{args.jobs + i}.mp4") for i in range(args.jobs)]
+            finally:
+                pool.shutdown()
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+
+    print(f"{args.jobs} sequential downloads of {args.size} bytes per backend")
+    subprocess_median = report('subprocess', subprocess_samples)
+    pool_median = report('pool', pool_samples)
+    print(f"pool warm-up (once): {warm_up * 1000:.1f} ms; median speedup per job: {subprocess_median / pool_median:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+from collections import deque
+
+from PyQt5.QtCore import QElapsedTimer, QObject, Qt, QTimer
+
+# 화면 주사율과 상관없이 같은 속도로 도는 게임 루프.
+# 타이머가 늦게 오거나 (GC, 느린 그리기) 컴퓨터가 느려도 게임 시간은 QElapsedTimer로 잰 실제 경과 시간을 따른다.
+# 시뮬레이션은 항상 STEP초 단위로 진행하고 (프레임 사이에 여러 번 또는 0번), 그리기는 마지막 두 단계
+# 사이를 남은 시간 비율(alpha)로 보간해서 주사율이 시뮬레이션 주기와 달라도 부드럽게 움직인다.
+SIMULATION_HZ = 120
+STEP = 1.0 / SIMULATION_HZ # 초
+MAX_FRAME_TIME = 0.25 # 초; 이보다 긴 멈춤은 잘라서 한 번에 몰아 진행하지 않는다
+DEFAULT_REFRESH_RATE = 60
+REFRESH_RATES = [30, 60, 75, 120, 144, 165, 240]
+EARLY_TOLERANCE = 0.0005 # 초; 마감보다 이만큼 넘게 일찍 온 tick은 그리지 않고 남은 시간만큼 다시 기다린다
+HITCH_FACTOR = 2.0 # 프레임 간격이 목표의 이 배수를 넘으면 끊김(hitch)으로 센다
+STATS_WINDOW = 300 # 통계에 쓰는 최근 프레임 수
+
+
+def available_refresh_rates(display_rate):
+    # 화면 주사율 이하의 선택지 (화면 주사율 자체도 포함)
+    display_rate = int(round(display_rate)) if display_rate and display_rate > 0 else DEFAULT_REFRESH_RATE
+    rates = [rate for rate in REFRESH_RATES if rate <= display_rate]
+    if display_rate not in rates:
+        rates.append(display_rate)
+    return rates
+
+
+class FrameStats:
+    # 최근 프레임 간격과 한 프레임의 작업 시간으로 끊김/흔들림을 잰다 (초 단위로 넣고 ms로 보여 준다)
+    def __init__(self, target_interval, window=STATS_WINDOW):
+        self.target_interval = target_interval
+        self.intervals = deque(maxlen=window)
+        self.work = deque(maxlen=window)
+        self.hitches = 0 # 시작부터 센 끊김 수
+        self.clamped = 0 # MAX_FRAME_TIME을 넘어 게임 시간을 버린 횟수
+        self.frames = 0
+
+    def record(self, interval, work, clamped=False):
+        self.intervals.append(interval)
+        self.work.append(work)
+        self.frames += 1
+        if interval > self.target_interval * HITCH_FACTOR:
+            self.hitches += 1
+        if clamped:
+            self.clamped += 1
+
+    def summary(self):
+        if not self.intervals:
+            return {'frames': 0, 'fps': 0.0, 'mean_ms': 0.0, 'jitter_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0,
+                    'work_ms': 0.0, 'hitches': self.hitches, 'clamped': self.clamped}
+        count = len(self.intervals)
+        mean = sum(self.intervals) / count
+        jitter = (sum((interval - mean) ** 2 for interval in self.intervals) / count) ** 0.5 # 표준편차
+        ordered = sorted(self.intervals)
+        return {
+            'frames': self.frames,
+            'fps': 1.0 / mean if mean > 0 else 0.0,
+            'mean_ms': mean * 1000,
+            'jitter_ms': jitter * 1000,
+            'p99_ms': ordered[min(count - 1, int(count * 0.99))] * 1000,
+            'max_ms': ordered[-1] * 1000,
+            'work_ms': sum(self.work) / count * 1000,
+            'hitches': self.hitches,
+            'clamped': self.clamped,
+        }
+
+    def reset(self):
+        self.intervals.clear()
+        self.work.clear()
+        self.hitches = 0
+        self.clamped = 0
+        self.frames = 0
+
+
+class GameLoop(QObject):
+    # simulate(dt)는 dt=STEP초씩 게임 상태를 진행하고, render(alpha)는 이전 단계와 지금 단계 사이
+    # alpha(0~1) 지점을 그린다. stop()한 동안의 시간은 게임 시간에 들어가지 않는다 (일시정지)
+    def __init__(self, simulate, render, refresh_rate=DEFAULT_REFRESH_RATE, step=STEP, parent=None):
+        super().__init__(parent)
+        self.simulate = simulate
+        self.render = render
+        self.step = step
+        self.clock = QElapsedTimer()
+        # QTimer 간격은 ms 정수라서 그대로 쓰면 (60Hz -> 16ms) 목표보다 빨리 돈다. 대신 다음 프레임 마감을
+        # QElapsedTimer 시간으로 정해 두고 tick마다 남은 시간만큼만 한 번씩 타이머를 건다
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._tick)
+        self.active = False
+        self.accumulator = 0.0
+        self.last = 0 # ns
+        self.deadline = 0 # ns; 다음 프레임을 그릴 시각
+        self.steps = 0 # 시작부터 진행한 시뮬레이션 단계 수
+        self.refresh_rate = refresh_rate
+        self.stats = FrameStats(1.0 / refresh_rate)
+        self.set_refresh_rate(refresh_rate)
+
+    @property
+    def running(self):
+        return self.active
+
+    def set_refresh_rate(self, refresh_rate):
+        # 화면을 다시 그리는 횟수 (초당). 게임 속도는 바뀌지 않는다
+        self.refresh_rate = refresh_rate
+        self.frame_ns = int(round(1e9 / refresh_rate))
+        self.stats.target_interval = 1.0 / refresh_rate
+        if self.active:
+            self.deadline = self.last + self.frame_ns
+            self._schedule(self.clock.nsecsElapsed())
+
+    def start(self):
+        self.clock.start()
+        self.last = self.clock.nsecsElapsed()
+        self.deadline = self.last + self.frame_ns
+        self.active = True
+        self._schedule(self.last)
+
+    def stop(self):
+        self.active = False
+        self.timer.stop()
+
+    def _schedule(self, now):
+        self.timer.start(max(0, round((self.deadline - now) / 1e6)))
+
+    def _tick(self):
+        now = self.clock.nsecsElapsed()
+        if self.deadline - now > EARLY_TOLERANCE * 1e9:
+            self._schedule(now) # 타이머가 일찍 왔다
+            return
+        # 다음 마감은 이번 마감에서 한 프레임 뒤 (늦게 그려도 평균 주사율은 그대로).
+        # 한 프레임 넘게 밀렸으면 따라잡으려고 몰아 그리지 않고 지금부터 다시 센다
+        self.deadline += self.frame_ns
+        if self.deadline <= now:
+            self.deadline = now + self.frame_ns
+        interval = (now - self.last) / 1e9
+        self.last = now
+        frame_time = min(interval, MAX_FRAME_TIME)
+        self.accumulator += frame_time
+        while self.accumulator >= self.step and self.active:
+            self.simulate(self.step) # 게임 오버 등으로 루프가 멈추면 남은 단계는 버린다
+            self.steps += 1
+            self.accumulator -= self.step
+        if self.active:
+            self.render(self.accumulator / self.step)
+        self.stats.record(interval, (self.clock.nsecsElapsed() - now) / 1e9, clamped=interval > MAX_FRAME_TIME)
+        if self.active:
+            self._schedule(self.clock.nsecsElapsed())
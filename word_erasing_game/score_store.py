@@ -0,0 +1,221 @@
+from collections import namedtuple
+import getpass
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+# 게임 기록 (SQLite, WAL 모드).
+# 게임이 끝날 때마다 언어/난이도/점수를 한 줄(session)로 남긴다. record()는 큐에 넣기만 하고 바로 돌아오며,
+# 쓰기는 별도 스레드가 BATCH_DELAY 동안 모인 기록을 트랜잭션 하나로 묶어서 한다 (화면 루프가 디스크를 기다리지 않는다).
+# 조회는 색인을 타고, 아직 쓰지 않은 기록도 함께 보여 준다.
+# 예전 high_scores.json(언어 -> 난이도 -> 최고 점수)은 처음 열 때 한 번만 옮겨 온다.
+# open_score_store()는 게임 폴더에 쓸 수 없거나 DB가 잠겼거나 깨졌으면 사용자 데이터 폴더, 그것도 안 되면
+# 메모리(MEMORY; 이번 실행 동안만)에 기록한다.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORES_PATH = os.path.join(PACKAGE_DIR, 'scores.db')
+LEGACY_PATH = os.path.join(PACKAGE_DIR, 'high_scores.json')
+BATCH_DELAY = 0.5 # 초; 첫 기록이 들어온 뒤 이만큼 더 모아서 쓴다
+BATCH_SIZE = 256
+LEGACY_PLAYER = 'legacy' # high_scores.json에는 누가 세운 기록인지 없다
+MEMORY = ':memory:'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    player TEXT NOT NULL,
+    language TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    duration REAL,
+    started REAL,
+    ended REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_rank ON sessions (language, difficulty, score DESC, ended);
+CREATE INDEX IF NOT EXISTS sessions_player ON sessions (player, language, difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS sessions_recent ON sessions (ended DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+COLUMNS = 'id, player, language, difficulty, score, duration, started, ended'
+
+Session = namedtuple('Session', COLUMNS.split(', '))
+
+
+def default_player():
+    # 따로 이름을 받지 않으므로 OS 사용자 이름으로 개인 기록을 나눈다
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return 'player'
+
+
+def user_data_dir():
+    base = (os.environ.get('APPDATA') or os.environ.get('XDG_DATA_HOME')
+            or os.path.join(os.path.expanduser('~'), '.local', 'share'))
+    return os.path.join(base, 'word_erasing_game')
+
+
+def _connect(path):
+    if path.startswith('file:'): # 메모리 DB (두 연결이 같은 DB를 보도록 shared cache)
+        db = sqlite3.connect(path, isolation_level=None, uri=True)
+        db.execute('PRAGMA read_uncommitted=1') # 쓰기 스레드의 표 잠금을 기다리지 않는다
+        return db
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('PRAGMA synchronous=NORMAL') # WAL에서는 전원이 꺼져도 DB가 깨지지 않는다
+    return db
+
+
+def open_score_store(legacy_path=LEGACY_PATH, player=None):
+    # 게임 폴더 -> 사용자 데이터 폴더 -> 메모리 순으로 열리는 곳을 쓴다
+    for path in (SCORES_PATH, os.path.join(user_data_dir(), 'scores.db')):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return ScoreStore(path, legacy_path, player)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"{path}를 열 수 없습니다: {exc}", file=sys.stderr)
+    print("게임 기록은 이번 실행 동안만 남습니다.", file=sys.stderr)
+    return ScoreStore(MEMORY, legacy_path, player)
+
+
+class ScoreStore:
+    def __init__(self, path=SCORES_PATH, legacy_path=LEGACY_PATH, player=None):
+        self.path = path
+        if path == MEMORY:
+            self.path = f'file:scores-{uuid.uuid4().hex}?mode=memory&cache=shared'
+        self.player = player or default_player()
+        # 조회용 (UI 스레드). 쓰기 스레드는 자기 연결을 쓴다.
+        # 메모리 DB는 연결이 하나라도 열려 있는 동안만 있으므로 이 연결로 표를 만든다
+        self.db = _connect(self.path)
+        try:
+            self.db.executescript(SCHEMA)
+            self._migrate(self.db, legacy_path)
+        except sqlite3.Error:
+            self.db.close()
+            raise
+        self.pending = {} # id -> 아직 쓰지 않은 Session
+        self.queue = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self._run, name='score-writer', daemon=True)
+        self.writer.start()
+
+    def _migrate(self, db, legacy_path):
+        # high_scores.json의 최고 점수를 기록 한 줄씩으로 옮긴다. 옮겼다는 표시와 같은 트랜잭션이라 한 번만 된다
+        if db.execute("SELECT 1 FROM meta WHERE key = 'legacy_json'").fetchone():
+            return
+        rows = []
+        try:
+            with open(legacy_path, encoding='utf-8') as f:
+                legacy = json.load(f)
+            ended = os.path.getmtime(legacy_path)
+            for language, scores in legacy.items():
+                for difficulty, score in scores.items():
+                    if score:
+                        rows.append((f'legacy-{language}-{difficulty}', LEGACY_PLAYER, language, difficulty, int(score),
+                                     None, None, ended))
+        except (OSError, ValueError, AttributeError, TypeError) as exc:
+            if os.path.exists(legacy_path):
+                print(f"{legacy_path}를 옮기지 못했습니다: {exc}", file=sys.stderr)
+        db.execute('BEGIN')
+        db.executemany(f'INSERT OR IGNORE INTO sessions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        db.execute("INSERT INTO meta (key, value) VALUES ('legacy_json', ?)", (str(len(rows)),))
+        db.execute('COMMIT')
+
+    # --- 쓰기 ---
+
+    def record(self, language, difficulty, score, duration=None, started=None):
+        # 끝난 게임 하나를 남긴다. 디스크에 쓰는 것은 쓰기 스레드가 한다
+        session = Session(uuid.uuid4().hex, self.player, language, difficulty, score, duration, started, time.time())
+        self.pending[session.id] = session
+        self.queue.put(session)
+        return session
+
+    def _run(self):
+        try:
+            db = _connect(self.path)
+        except sqlite3.Error as exc:
+            # 기록은 pending에 남아 이번 실행 동안은 보인다
+            print(f"게임 기록을 저장하지 못했습니다: {exc}", file=sys.stderr)
+            return
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + BATCH_DELAY
+            while batch[-1] is not None and len(batch) < BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None # close()
+            sessions = [session for session in batch if session is not None]
+            if not sessions:
+                continue
+            try:
+                db.execute('BEGIN')
+                db.executemany(f'INSERT OR IGNORE INTO sessions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', sessions)
+                db.execute('COMMIT')
+            except sqlite3.Error as exc:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                # 이번 실행 동안은 pending에 남아 있어서 점수는 계속 보인다
+                print(f"게임 기록을 저장하지 못했습니다: {exc}", file=sys.stderr)
+                continue
+            for session in sessions:
+                self.pending.pop(session.id, None)
+        db.close()
+
+    def close(self):
+        # 남은 기록을 다 쓰고 닫는다
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+        self.db.close()
+
+    # --- 조회 ---
+
+    def _pending(self, language, difficulty, player=None):
+        # 조회 전에 떠 두어야, 그 사이에 쓰기가 끝난 기록이 빠지지 않는다 (겹치면 id로 걸러낸다)
+        return [session for session in list(self.pending.values())
+                if session.language == language and session.difficulty == difficulty
+                and (player is None or session.player == player)]
+
+    def top_scores(self, language, difficulty, limit=10):
+        # 언어/난이도별 높은 점수 순 (같은 점수면 먼저 세운 기록이 위)
+        pending = self._pending(language, difficulty)
+        rows = [Session(*row) for row in self.db.execute(
+            f'SELECT {COLUMNS} FROM sessions WHERE language = ? AND difficulty = ? '
+            'ORDER BY score DESC, ended LIMIT ?', (language, difficulty, limit))]
+        seen = {session.id for session in rows}
+        rows.extend(session for session in pending if session.id not in seen)
+        rows.sort(key=lambda session: (-session.score, session.ended))
+        return rows[:limit]
+
+    def personal_best(self, language, difficulty, player=None):
+        # 이 사람의 언어/난이도별 최고 점수 (기록이 없으면 0). 옮겨 온 예전 기록도 내 기록으로 친다
+        player = player or self.player
+        pending = self._pending(language, difficulty, player)
+        row = self.db.execute('SELECT MAX(score) FROM sessions WHERE player IN (?, ?) AND language = ? AND difficulty = ?',
+                              (player, LEGACY_PLAYER, language, difficulty)).fetchone()
+        return max([row[0] or 0] + [session.score for session in pending])
+
+    def recent(self, limit=20):
+        # 최근에 끝난 게임부터
+        pending = list(self.pending.values())
+        rows = [Session(*row) for row in self.db.execute(
+            f'SELECT {COLUMNS} FROM sessions ORDER BY ended DESC LIMIT ?', (limit,))]
+        seen = {session.id for session in rows}
+        rows.extend(session for session in pending if session.id not in seen)
+        rows.sort(key=lambda session: session.ended, reverse=True)
+        return rows[:limit]
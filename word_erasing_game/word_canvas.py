@@ -0,0 +1,224 @@
+from collections import OrderedDict
+import random
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPixmap
+from PyQt5.QtCore import Qt, QRect
+
+from word_index import WordIndex, word_key
+
+# 떨어지는 단어를 위젯 하나에 직접 그리는 캔버스.
+# 단어마다 QLabel을 만들고 move()하던 방식은 단어가 많아지면 위젯 생성/삭제와 배치 비용 때문에 끊긴다.
+# 여기서는 단어 글자를 한 번만 QPixmap으로 그려 캐시해 두고, 프레임마다 움직인 단어의
+# 이전 위치와 새 위치만 다시 그린다. 움직임은 step(dt)(게임 시간)과 render(alpha)(보간해서 그리기)로 나뉜다
+# (game_loop.GameLoop). 단어 객체(FallingWord)는 잡히거나 떨어지면 풀에 돌려 두고 다시 쓴다.
+# 화면의 단어는 WordIndex에도 들어 있어서 입력한 단어/접두사로 바로 찾고, 접두사가 맞는 단어는 다른 색으로 그린다.
+WORD_FONT = ("Arial", 28) # 굵게
+WORD_COLOR = "black"
+HIGHLIGHT_COLOR = "#C62828" # 입력 중인 글자로 시작하는 단어
+PIXMAP_CACHE_SIZE = 512 # 캐시해 두는 단어 그림 수 (오래 안 쓴 것부터 버린다)
+# 한 프레임에 다시 그릴 칸이 이보다 많으면 하나씩 update()하지 않고 TILE_SIZE 격자로 묶는다.
+# 칸이 수백 개면 Qt가 그 칸들을 합치는 비용과 복잡한 clip 영역에 그리는 비용이 더 크다
+DIRTY_RECT_LIMIT = 48
+TILE_SIZE = 64
+
+
+class FallingWord:
+    # 화면에 떨어지고 있는 단어 하나 (위젯이 아니라 캔버스가 그리는 데이터)
+    def __init__(self):
+        self.reset("", None, 0, 0)
+
+    def reset(self, word, pixmap, x_pos, speed):
+        self.word = word
+        self.key = word_key(word) # WordIndex 키
+        self.highlighted = False
+        self.pixmap = pixmap
+        self.speed = speed # 초당 내려가는 픽셀 수
+        self.slot = 0 # WordCanvas.words에서의 위치
+        self.x_pos = x_pos
+        self.y_pos = 0
+        self.prev_y = 0 # 지난 시뮬레이션 단계의 위치 (그릴 때 보간용)
+        self.rect = QRect(x_pos, 0, *_logical_size(pixmap)) if pixmap is not None else QRect() # 지금 그려진 칸
+
+    def move_down(self, dt):
+        self.prev_y = self.y_pos
+        self.y_pos += self.speed * dt
+
+    def place(self, alpha):
+        # 두 단계 사이 alpha 지점으로 옮긴다. 화면에서 차지하는 칸이 바뀌었으면 (이전 칸 | 새 칸)을 돌려준다
+        top = int(self.prev_y + (self.y_pos - self.prev_y) * alpha)
+        if top == self.rect.top():
+            return None
+        old = QRect(self.rect)
+        self.rect.moveTop(top)
+        return old.united(self.rect)
+
+
+def _logical_size(pixmap):
+    ratio = pixmap.devicePixelRatio()
+    return int(pixmap.width() / ratio), int(pixmap.height() / ratio)
+
+
+class PixmapCache:
+    # 단어 -> 글자를 그려 둔 투명 QPixmap (고해상도 화면이면 그 배율로 그린다)
+    def __init__(self, font=None, color=WORD_COLOR, max_entries=PIXMAP_CACHE_SIZE):
+        self.font = font if font is not None else QFont(*WORD_FONT, QFont.Bold)
+        self.color = QColor(color)
+        self.metrics = QFontMetrics(self.font)
+        self.max_entries = max_entries
+        self.pixmaps = OrderedDict()
+
+    def get(self, word, ratio=1.0):
+        key = (word, ratio)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+        pixmap = self._render(word, ratio)
+        self.pixmaps[key] = pixmap
+        if len(self.pixmaps) > self.max_entries:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+
+    def _render(self, word, ratio):
+        width = max(1, self.metrics.horizontalAdvance(word))
+        height = self.metrics.height()
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(self.font)
+        painter.setPen(self.color)
+        painter.drawText(QRect(0, 0, width, height), Qt.AlignCenter, word)
+        painter.end()
+        return pixmap
+
+    def clear(self):
+        self.pixmaps.clear()
+
+
+class WordCanvas(QWidget):
+    # 게임 화면의 단어 영역. 배경을 직접 칠하므로 부모를 다시 그리지 않는다
+    def __init__(self, background, parent=None, cache=None, highlight_cache=None):
+        super().__init__(parent)
+        self.background = QColor(background)
+        self.cache = cache if cache is not None else PixmapCache()
+        self.highlight_cache = highlight_cache if highlight_cache is not None else PixmapCache(color=HIGHLIGHT_COLOR)
+        self.words = [] # 떨어지고 있는 단어 (순서 없음; 지울 때 마지막 단어를 그 자리로 옮긴다)
+        self.pool = [] # 다시 쓸 FallingWord
+        self.index = WordIndex()
+        self.prefix = "" # 강조 중인 접두사 (word_key)
+        self.highlighted = {} # 강조된 FallingWord
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def spawn(self, word, speed):
+        # 맨 위의 임의의 x 위치에 단어를 추가한다
+        pixmap = self.cache.get(word, self.devicePixelRatioF())
+        width = _logical_size(pixmap)[0]
+        max_x = self.width() - width
+        word_obj = self.pool.pop() if self.pool else FallingWord()
+        word_obj.reset(word, pixmap, random.randint(0, max_x) if max_x > 0 else 0, speed)
+        word_obj.slot = len(self.words)
+        self.words.append(word_obj)
+        self.index.add(word_obj.key, word_obj)
+        if self.prefix and word_obj.key.startswith(self.prefix):
+            self._set_highlighted(word_obj, True)
+        self.update(word_obj.rect)
+        return word_obj
+
+    def step(self, dt):
+        # 모든 단어를 dt초만큼 내린다. 바닥을 지난 단어 목록을 돌려준다
+        fallen = []
+        height = self.height()
+        for word_obj in self.words:
+            word_obj.move_down(dt)
+            if word_obj.y_pos > height:
+                fallen.append(word_obj)
+        return fallen
+
+    def render(self, alpha=1.0):
+        # 단어를 보간한 위치로 옮기고 움직인 곳만 다시 그리게 한다
+        dirty = []
+        for word_obj in self.words:
+            rect = word_obj.place(alpha)
+            if rect is not None:
+                dirty.append(rect)
+        self._invalidate(dirty)
+
+    def _invalidate(self, rects):
+        if len(rects) <= DIRTY_RECT_LIMIT:
+            for rect in rects:
+                self.update(rect)
+            return
+        # 격자 줄마다 더러운 칸을 비트로 모아서, 이어진 칸끼리 사각형 하나로 update()한다
+        rows = {}
+        for rect in rects:
+            left = max(0, rect.left()) // TILE_SIZE
+            bits = ((1 << (max(0, rect.right()) // TILE_SIZE - left + 1)) - 1) << left
+            for row in range(max(0, rect.top()) // TILE_SIZE, max(0, rect.bottom()) // TILE_SIZE + 1):
+                rows[row] = rows.get(row, 0) | bits
+        for row, bits in rows.items():
+            column = 0
+            while bits:
+                if not bits & 1:
+                    skip = (bits & -bits).bit_length() - 1 # 다음 더러운 칸까지
+                    bits >>= skip
+                    column += skip
+                run = (~bits & (bits + 1)).bit_length() - 1 # 이어진 더러운 칸 수
+                self.update(column * TILE_SIZE, row * TILE_SIZE, run * TILE_SIZE, TILE_SIZE)
+                bits >>= run
+                column += run
+
+    def find(self, word):
+        # 입력한 단어와 같은 단어 중 가장 먼저 생긴 것 (한글은 자모가 같으면 같은 단어)
+        return self.index.find(word_key(word))
+
+    def highlight(self, text):
+        # text로 시작하는 단어만 강조한다. 바뀐 단어만 다시 그린다
+        self.prefix = word_key(text)
+        matches = self.index.matches(self.prefix)
+        for word_obj in [w for w in self.highlighted if w not in matches]:
+            self._set_highlighted(word_obj, False)
+        for word_obj in matches:
+            if not word_obj.highlighted:
+                self._set_highlighted(word_obj, True)
+
+    def _set_highlighted(self, word_obj, highlighted):
+        cache = self.highlight_cache if highlighted else self.cache
+        word_obj.pixmap = cache.get(word_obj.word, self.devicePixelRatioF()) # 같은 글꼴이라 크기는 같다
+        word_obj.highlighted = highlighted
+        if highlighted:
+            self.highlighted[word_obj] = None
+        else:
+            del self.highlighted[word_obj]
+        self.update(word_obj.rect)
+
+    def remove(self, word_obj):
+        last = self.words.pop()
+        if last is not word_obj:
+            self.words[word_obj.slot] = last
+            last.slot = word_obj.slot
+        self.index.remove(word_obj.key, word_obj)
+        self.highlighted.pop(word_obj, None)
+        self.update(word_obj.rect)
+        word_obj.pixmap = None
+        self.pool.append(word_obj)
+
+    def clear(self):
+        for word_obj in self.words:
+            word_obj.pixmap = None
+        self.pool.extend(self.words)
+        self.words.clear()
+        self.index.clear()
+        self.highlighted.clear()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = event.rect()
+        painter.fillRect(area, self.background)
+        for word_obj in self.words:
+            if word_obj.rect.intersects(area):
+                painter.drawPixmap(word_obj.rect.topLeft(), word_obj.pixmap)
+        painter.end()
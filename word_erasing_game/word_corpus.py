@@ -0,0 +1,155 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+
+from word_index import word_key
+
+# 단어 목록(한 줄에 한 단어인 .txt)을 난이도별로 나눠 둔 바이너리 파일(.corpus)로 미리 만들어 두고,
+# 게임에서는 mmap으로 열어 필요한 단어만 읽는다. 단어가 10만 개가 넘어도 여는 데 시간이 들지 않고,
+# 난이도별 무작위 단어는 오프셋 표에서 바로 찾으므로 O(1)이다.
+#
+# 파일 구조 (리틀 엔디언):
+#   헤더      MAGIC, 버전(u16), 난이도 수(u16), 단어 수 N(u32)
+#   난이도 표  난이도마다 (시작 번호 u32, 단어 수 u32) - 단어는 어려운 순으로 정렬되어 있어서 난이도마다 이어진 구간이다
+#   오프셋 표  N+1개의 u32 - i번째 단어는 blob[offsets[i]:offsets[i+1]]
+#   blob      UTF-8 단어를 이어 붙인 것
+#
+#   python word_corpus.py                      # 게임의 korean/english 단어 목록을 모두 다시 만든다
+#   python word_corpus.py big_dict.txt -o big_dict.corpus
+MAGIC = b"WDCP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+BUCKET = struct.Struct("<II")
+OFFSET = struct.Struct("<I")
+DIFFICULTIES = ("easy", "normal", "hard")
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+LANGUAGES = ("korean", "english")
+SHIFT_KEYS = set("ㄲㄸㅃㅆㅉㅒㅖ") # 두벌식에서 Shift를 같이 누르는 자모
+
+
+def source_path(language):
+    return os.path.join(PACKAGE_DIR, f"{language}_words.txt")
+
+
+def corpus_path(language):
+    return os.path.join(PACKAGE_DIR, f"{language}_words.corpus")
+
+
+def complexity(word):
+    # 치는 데 드는 품: 자판을 누르는 횟수 (한글은 겹모음/겹받침까지 자모로 푼 길이) + Shift를 누르는 횟수
+    key = word_key(word)
+    return len(key) + sum(1 for char in key if char in SHIFT_KEYS or char.isupper())
+
+
+def read_words(path):
+    # 빈 줄과 중복은 빼고 처음 나온 순서대로
+    with open(path, encoding="utf-8") as f:
+        return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+
+def build_corpus(words):
+    # 단어 목록 -> .corpus 파일 내용 (bytes). 쉬운 단어부터 정렬해서 난이도마다 1/3씩 나눈다
+    ordered = sorted(words, key=lambda word: (complexity(word), word))
+    count = len(ordered)
+    bounds = [count * i // len(DIFFICULTIES) for i in range(len(DIFFICULTIES) + 1)]
+    encoded = [word.encode("utf-8") for word in ordered]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    parts = [HEADER.pack(MAGIC, VERSION, len(DIFFICULTIES), count)]
+    parts.extend(BUCKET.pack(bounds[i], bounds[i + 1] - bounds[i]) for i in range(len(DIFFICULTIES)))
+    parts.append(struct.pack(f"<{count + 1}I", *offsets))
+    parts.extend(encoded)
+    return b"".join(parts)
+
+
+def compile_corpus(source, target):
+    # source(.txt)로 target(.corpus)을 만든다. 다 쓴 뒤 이름을 바꾸므로 게임이 반쯤 쓴 파일을 열 일은 없다
+    data = build_corpus(read_words(source))
+    temp_path = f"{target}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, target)
+    return data
+
+
+class Corpus:
+    # .corpus 파일 (또는 그 내용 bytes)을 읽는다. 파일은 mmap으로 열어서 읽는 단어만 메모리에 올라온다
+    def __init__(self, path=None, data=None):
+        self.file = None
+        if data is None:
+            self.file = open(path, "rb")
+            data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = data
+        magic, version, bucket_count, self.count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: 단어 파일 형식이 아닙니다")
+        self.buckets = {}
+        for i in range(bucket_count):
+            self.buckets[DIFFICULTIES[i]] = BUCKET.unpack_from(data, HEADER.size + i * BUCKET.size)
+        self.offsets_pos = HEADER.size + bucket_count * BUCKET.size
+        self.blob_pos = self.offsets_pos + (self.count + 1) * OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def bucket_size(self, difficulty):
+        return self.buckets[difficulty][1]
+
+    def word(self, index):
+        begin, end = struct.unpack_from("<II", self.data, self.offsets_pos + index * OFFSET.size)
+        return self.data[self.blob_pos + begin:self.blob_pos + end].decode("utf-8")
+
+    def sample(self, difficulty=None):
+        # 난이도의 단어 중 하나를 무작위로 (단어가 너무 적어 빈 난이도면 전체에서)
+        start, count = self.buckets.get(difficulty, (0, 0))
+        if count == 0:
+            start, count = 0, self.count
+        return self.word(start + random.randrange(count))
+
+    def words(self, difficulty=None):
+        start, count = self.buckets[difficulty] if difficulty else (0, self.count)
+        return [self.word(i) for i in range(start, start + count)]
+
+    def close(self):
+        if self.file is not None:
+            self.data.close()
+            self.file.close()
+            self.file = None
+
+
+def load_corpus(language):
+    # 게임 폴더의 <language>_words.corpus를 연다. 없거나 .txt보다 오래됐으면 먼저 다시 만든다
+    source, target = source_path(language), corpus_path(language)
+    if os.path.exists(source) and (not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source)):
+        try:
+            compile_corpus(source, target)
+        except OSError:
+            # 게임 폴더에 쓸 수 없으면 (설치된 경우 등) 메모리에 만든 것을 쓴다
+            return Corpus(data=build_corpus(read_words(source)))
+    return Corpus(target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="단어 목록(.txt)을 난이도별 .corpus 파일로 만듭니다.")
+    parser.add_argument("sources", nargs="*", help="한 줄에 한 단어인 텍스트 파일 (없으면 게임의 단어 목록 전부)")
+    parser.add_argument("-o", "--output", help="출력 파일 (입력이 하나일 때만; 기본값은 입력 옆의 .corpus)")
+    args = parser.parse_args(argv)
+    if args.output and len(args.sources) != 1:
+        parser.error("-o는 입력 파일이 하나일 때만 쓸 수 있습니다")
+
+    sources = args.sources or [source_path(language) for language in LANGUAGES]
+    for source in sources:
+        target = args.output or os.path.splitext(source)[0] + ".corpus"
+        corpus = Corpus(data=compile_corpus(source, target))
+        buckets = ", ".join(f"{name} {corpus.bucket_size(name)}" for name in DIFFICULTIES)
+        print(f"{target}: {len(corpus)} words ({buckets})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
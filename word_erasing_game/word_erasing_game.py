@@ -1,25 +1,50 @@
 import sys
+import time
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit, QMessageBox
-from PyQt5.QtGui import QColor, QPalette, QFont
-from PyQt5.QtCore import Qt, QTimer, QPoint
-import random
-
-# FallingWord 클래스 정의
-class FallingWord(QLabel):
-    def __init__(self, word, parent=None):
-        super().__init__(word, parent)
-        self.word = word
-        self.speed = 0 # 난이도에 따라 설정될 속도
-        self.y_pos = 0 # 초기 y 위치
-        self.x_pos = 0 # 초기 x 위치 (랜덤하게 설정)
-        self.setFont(QFont("Arial", 28, QFont.Bold))
-        self.setStyleSheet("color: black;")
-        self.setAlignment(Qt.AlignCenter)
-        self.adjustSize()
-
-    def move_down(self):
-        self.y_pos += self.speed
-        self.move(int(self.x_pos), int(self.y_pos))
+from PyQt5.QtGui import QColor, QGuiApplication, QPalette, QFont
+from PyQt5.QtCore import Qt, QPoint, pyqtSignal
+
+from game_loop import DEFAULT_REFRESH_RATE, GameLoop, available_refresh_rates
+from word_canvas import HIGHLIGHT_COLOR, PixmapCache, WordCanvas
+from word_corpus import corpus_path, load_corpus
+from score_store import open_score_store
+
+TOP_SCORES_SHOWN = 5 # 게임 오버 창에 보여 주는 순위 수
+
+REFERENCE_TICK = 0.030 # 초; 난이도별 base_speed는 예전 30ms 타이머 한 번에 내려가던 픽셀 수
+STATS_UPDATE_FRAMES = 30 # 프레임 통계 표시(F3)를 이 프레임마다 갱신
+
+class TypingField(QLineEdit):
+    # 글자를 칠 때마다 지금 입력 중인 글자를 알린다. textEdited와 달리 IME가 조합 중인 한글
+    # (아직 확정되지 않은 마지막 음절)도 넣어서 보낸다
+    typingChanged = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.in_input_method_event = False
+        self.textEdited.connect(self._text_edited)
+
+    def _text_edited(self, text):
+        if not self.in_input_method_event: # 조합 이벤트가 끝난 뒤 조합 중인 글자까지 붙여서 한 번만 보낸다
+            self.typingChanged.emit(text)
+
+    def inputMethodEvent(self, event):
+        self.in_input_method_event = True
+        try:
+            super().inputMethodEvent(event)
+        finally:
+            self.in_input_method_event = False
+        text, cursor = self.text(), self.cursorPosition()
+        self.typingChanged.emit(text[:cursor] + event.preeditString() + text[cursor:])
+
+    def clear_typing(self):
+        # 입력란과 IME 조합 중인 글자를 함께 비운다
+        self.blockSignals(True)
+        self.clear()
+        QGuiApplication.inputMethod().reset()
+        self.clear() # reset이 조합 중이던 글자를 확정해 버리는 IME도 있다
+        self.blockSignals(False)
+
 
 class WordErasingGame(QWidget):
     def __init__(self):
@@ -33,15 +58,23 @@ class WordErasingGame(QWidget):
         self.current_difficulty = None
         self.current_language = None
         self.score = 0
-        self.words = [] # 현재 게임에서 사용할 단어 목록
-        self.falling_words = [] # 현재 화면에 떨어지고 있는 FallingWord 객체들
+        self.corpus = None # 현재 언어의 단어 목록 (word_corpus.Corpus)
+        self.corpora = {} # 언어 -> 한 번 연 Corpus (언어를 다시 골라도 다시 읽지 않는다)
+        self.game_area = None # 단어들이 떨어지는 WordCanvas (게임 중에만 있음)
+        self.word_pixmaps = PixmapCache() # 단어 그림 캐시 (게임을 다시 시작해도 그대로 쓴다)
+        self.highlight_pixmaps = PixmapCache(color=HIGHLIGHT_COLOR) # 입력 중인 글자로 시작하는 단어
         self.game_running = False
 
-        self.game_timer = QTimer(self) # 단어 낙하 및 게임 로직 업데이트 타이머
-        self.game_timer.timeout.connect(self.update_game)
+        # 화면 갱신 횟수는 모니터 주사율까지 고를 수 있다 (기본은 60Hz 이하에서 가장 높은 값)
+        self.refresh_rates = available_refresh_rates(QApplication.primaryScreen().refreshRate())
+        self.current_refresh_index = max(i for i, rate in enumerate(self.refresh_rates)
+                                         if rate <= DEFAULT_REFRESH_RATE or i == 0)
 
-        self.word_spawn_timer = QTimer(self) # 새 단어 생성 타이머
-        self.word_spawn_timer.timeout.connect(self.spawn_new_word)
+        # 단어 낙하, 새 단어 생성 등 게임 로직은 고정된 시간 간격으로, 그리기는 화면 갱신마다
+        self.game_loop = GameLoop(self.update_game, self.render_game, self.refresh_rates[self.current_refresh_index], parent=self)
+        self.spawn_elapsed = 0.0 # 마지막으로 단어를 만든 뒤 지난 게임 시간 (초)
+        self.settings_page = None
+        self.scores = open_score_store() # 게임 기록 (scores.db; 열 수 없으면 다른 곳이나 메모리)
 
         self.init_ui()
 
@@ -52,18 +85,15 @@ class WordErasingGame(QWidget):
         self.show_main_menu()
 
     def load_words(self, language):
-        file_path = ""
-        if language == "korean":
-            file_path = "C:\\Users\\SBA\\github\\gemini-cli-tutorial\\korean_words.txt"
-        elif language == "english":
-            file_path = "C:\\Users\\SBA\\github\\gemini-cli-tutorial\\english_words.txt"
-
+        # 게임 폴더의 단어 파일을 처음 고를 때만 연다 (word_corpus.py 참고)
+        self.corpus = self.corpora.get(language)
+        if self.corpus is not None:
+            return
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                self.words = [line.strip() for line in f if line.strip()]
-        except FileNotFoundError:
-            QMessageBox.critical(self, "오류", f"{file_path} 파일을 찾을 수 없습니다.")
-            self.words = []
+            self.corpus = self.corpora[language] = load_corpus(language)
+        except (OSError, ValueError):
+            QMessageBox.critical(self, "오류", f"{corpus_path(language)} 파일을 읽을 수 없습니다.")
+            self.corpus = None
 
     def clear_layout(self, layout):
         if layout is not None:
@@ -113,7 +143,7 @@ class WordErasingGame(QWidget):
     def set_language_and_show_difficulty(self, language):
         self.current_language = language
         self.load_words(language)
-        if not self.words:
+        if not self.corpus:
             QMessageBox.critical(self, "오류", "단어 로드에 실패했습니다. 언어 선택 화면으로 돌아갑니다.")
             self.show_language_selection() # 단어 로드 실패 시 언어 선택 화면으로 돌아감
             return
@@ -162,11 +192,8 @@ class WordErasingGame(QWidget):
 
     def show_main_menu(self):
         self.clear_layout(self.main_layout)
-        self.game_timer.stop()
-        self.word_spawn_timer.stop()
-        for word_obj in self.falling_words:
-            word_obj.deleteLater()
-        self.falling_words.clear()
+        self.game_loop.stop()
+        self.game_area = None # 레이아웃과 함께 삭제된다
 
         if hasattr(self, 'pause_overlay') and self.pause_overlay.isVisible():
             self.pause_overlay.hide() # 메인 메뉴로 돌아올 때 일시정지 오버레이 숨기기
@@ -206,35 +233,87 @@ class WordErasingGame(QWidget):
 
         self.set_background_color(QColor("#87CEEB")) # 하늘색 (SkyBlue)
 
+    def _create_option_row(self, prev_callback, next_callback):
+        # [<] 현재 값 [>] 한 줄; 값을 보여 주는 QLabel과 레이아웃을 돌려준다
+        prev_button = QPushButton("<")
+        prev_button.setFont(QFont("Arial", 20))
+        prev_button.clicked.connect(prev_callback)
+        prev_button.setFixedSize(50, 50)
+
+        display_label = QLabel()
+        display_label.setFont(QFont("Arial", 24, QFont.Bold))
+        display_label.setAlignment(Qt.AlignCenter)
+        display_label.setStyleSheet("color: black;")
+        display_label.setFixedWidth(250)
+
+        next_button = QPushButton(">")
+        next_button.setFont(QFont("Arial", 20))
+        next_button.clicked.connect(next_callback)
+        next_button.setFixedSize(50, 50)
+
+        row_layout = QHBoxLayout()
+        row_layout.addStretch(1)
+        row_layout.addWidget(prev_button)
+        row_layout.addWidget(display_label)
+        row_layout.addWidget(next_button)
+        row_layout.addStretch(1)
+        return display_label, row_layout
+
     def _create_settings_ui(self, return_callback):
-        self.confirm_button = QPushButton("확인")
-        self.confirm_button.setFont(QFont("Arial", 24))
-        self.confirm_button.clicked.connect(return_callback)
-        self.confirm_button.setFixedSize(200, 70)
+        # 설정 화면은 지금 화면(메인 메뉴나 멈춘 게임) 위에 덮는 페이지로 띄운다.
+        # 그래야 게임 도중에 설정을 열어도 게임 화면이 지워지지 않고 그대로 돌아갈 수 있다
+        self.settings_snapshot = (self.current_resolution_index, self.current_refresh_index)
+        self.settings_page = QWidget(self)
+        self.settings_page.setGeometry(0, 0, self.width(), self.height())
+        palette = self.settings_page.palette()
+        palette.setColor(QPalette.Window, QColor("#87CEEB")) # 하늘색 (SkyBlue)
+        self.settings_page.setPalette(palette)
+        self.settings_page.setAutoFillBackground(True)
+
+        settings_label = QLabel("설정")
+        settings_label.setFont(QFont("Arial", 36, QFont.Bold))
+        settings_label.setAlignment(Qt.AlignCenter)
+        settings_label.setStyleSheet("color: black;")
+
+        self.resolution_display_label, resolution_change_layout = self._create_option_row(self.prev_resolution, self.next_resolution)
+        self.refresh_display_label, refresh_change_layout = self._create_option_row(self.prev_refresh_rate, self.next_refresh_rate)
+        self.update_resolution_display()
+        self.update_refresh_display()
 
-        self.back_button = QPushButton("뒤로가기")
-        self.back_button.setFont(QFont("Arial", 18))
-        self.back_button.clicked.connect(return_callback)
-        self.back_button.setFixedSize(150, 50)
+        confirm_button = QPushButton("확인")
+        confirm_button.setFont(QFont("Arial", 24))
+        confirm_button.clicked.connect(lambda: self._close_settings(return_callback, True))
+        confirm_button.setFixedSize(200, 70)
+
+        back_button = QPushButton("뒤로가기") # 바꾼 값은 버리고 돌아간다
+        back_button.setFont(QFont("Arial", 18))
+        back_button.clicked.connect(lambda: self._close_settings(return_callback, False))
+        back_button.setFixedSize(150, 50)
 
-        settings_layout = QVBoxLayout()
+        settings_layout = QVBoxLayout(self.settings_page)
         settings_layout.addStretch(1)
         settings_layout.addWidget(settings_label, alignment=Qt.AlignCenter)
         settings_layout.addLayout(resolution_change_layout)
+        settings_layout.addLayout(refresh_change_layout)
         settings_layout.addSpacing(30)
         settings_layout.addWidget(confirm_button, alignment=Qt.AlignCenter)
         settings_layout.addWidget(back_button, alignment=Qt.AlignCenter)
         settings_layout.addStretch(1)
 
-        self.main_layout.addLayout(settings_layout)
-        self.set_background_color(QColor("#87CEEB")) # 하늘색 (SkyBlue)
+        self.settings_page.show()
+        self.settings_page.raise_()
+
+    def _close_settings(self, return_callback, apply):
+        if not apply:
+            self.current_resolution_index, self.current_refresh_index = self.settings_snapshot
+        self.settings_page.deleteLater()
+        self.settings_page = None
+        return_callback()
 
     def show_settings_menu_from_main(self):
-        self.clear_layout(self.main_layout)
         self._create_settings_ui(self.apply_resolution_and_return_to_main)
 
     def show_settings_menu_from_pause(self):
-        self.clear_layout(self.main_layout)
         if hasattr(self, 'pause_overlay'):
             self.pause_overlay.hide() # 일시정지 오버레이 숨기기
         self._create_settings_ui(self.apply_resolution_and_return_to_pause_menu)
@@ -251,14 +330,29 @@ class WordErasingGame(QWidget):
         width, height = self.resolutions[self.current_resolution_index]
         self.resolution_display_label.setText(f"{width} x {height}")
 
-    def apply_resolution_and_return_to_main(self):
+    def prev_refresh_rate(self):
+        self.current_refresh_index = (self.current_refresh_index - 1) % len(self.refresh_rates)
+        self.update_refresh_display()
+
+    def next_refresh_rate(self):
+        self.current_refresh_index = (self.current_refresh_index + 1) % len(self.refresh_rates)
+        self.update_refresh_display()
+
+    def update_refresh_display(self):
+        self.refresh_display_label.setText(f"{self.refresh_rates[self.current_refresh_index]} Hz")
+
+    def apply_display_settings(self):
         width, height = self.resolutions[self.current_resolution_index]
         self.setFixedSize(width, height)
+        self.game_loop.set_refresh_rate(self.refresh_rates[self.current_refresh_index])
+
+    def apply_resolution_and_return_to_main(self):
+        self.apply_display_settings()
         self.show_main_menu()
 
     def apply_resolution_and_return_to_pause_menu(self):
-        width, height = self.resolutions[self.current_resolution_index]
-        self.setFixedSize(width, height)
+        self.apply_display_settings()
+        self.update_word_speed() # 새로 나오는 단어부터 바뀐 화면 높이에 맞춘다
         self.resume_game()
 
     def start_game(self, difficulty):
@@ -266,7 +360,6 @@ class WordErasingGame(QWidget):
         self.score = 0
         self.clear_layout(self.main_layout)
         self.game_running = True
-        self.falling_words.clear() # 기존 단어들 초기화
 
         # Top Bar (Score and Pause Button)
         top_bar_layout = QHBoxLayout()
@@ -274,8 +367,22 @@ class WordErasingGame(QWidget):
         self.score_label.setFont(QFont("Arial", 24, QFont.Bold))
         self.score_label.setStyleSheet("color: black;")
         top_bar_layout.addWidget(self.score_label, alignment=Qt.AlignLeft | Qt.AlignTop)
+
+        # 이 언어/난이도에서 내 최고 점수
+        self.best_score = self.scores.personal_best(self.current_language, difficulty)
+        self.best_label = QLabel(f"최고: {self.best_score}")
+        self.best_label.setFont(QFont("Arial", 18))
+        self.best_label.setStyleSheet("color: black;")
+        top_bar_layout.addWidget(self.best_label, alignment=Qt.AlignLeft | Qt.AlignTop)
         top_bar_layout.addStretch(1) # Push score to left
 
+        # 프레임 통계 (F3으로 켜고 끈다)
+        self.stats_label = QLabel()
+        self.stats_label.setFont(QFont("Arial", 11))
+        self.stats_label.setStyleSheet("color: black;")
+        self.stats_label.hide()
+        top_bar_layout.addWidget(self.stats_label, alignment=Qt.AlignRight | Qt.AlignTop)
+
         pause_button = QPushButton("일시정지")
         pause_button.setFont(QFont("Arial", 18))
         pause_button.clicked.connect(self.show_pause_menu)
@@ -283,11 +390,12 @@ class WordErasingGame(QWidget):
         top_bar_layout.addWidget(pause_button, alignment=Qt.AlignRight | Qt.AlignTop)
 
         # Input Field
-        self.input_field = QLineEdit()
+        self.input_field = TypingField()
         self.input_field.setFont(QFont("Arial", 24))
         self.input_field.setStyleSheet("background-color: white; color: black;")
         self.input_field.setPlaceholderText("여기에 단어를 입력하세요...")
-        self.input_field.returnPressed.connect(self.check_word) # Enter 키 입력 시 단어 확인
+        self.input_field.typingChanged.connect(self.on_typing) # 글자를 칠 때마다 단어 확인
+        self.input_field.returnPressed.connect(self.check_word) # Enter 키는 입력란을 비운다
 
         # 구름 표현 (QLabel 사용) - 메인 윈도우의 자식으로 생성
         self.cloud_label = QLabel(self) # 메인 윈도우의 자식으로 생성
@@ -296,8 +404,7 @@ class WordErasingGame(QWidget):
         self.cloud_label.show()
 
         # Game Screen Layout
-        self.game_area = QWidget(self) # 단어들이 떨어질 영역
-        self.game_area.setStyleSheet("background-color: transparent;") # 배경 투명하게
+        self.game_area = WordCanvas(QColor("#ADD8E6"), self, self.word_pixmaps, self.highlight_pixmaps) # 단어들이 떨어질 영역 (배경은 창과 같은 색)
 
         # Main layout for game screen
         self.main_layout.addLayout(top_bar_layout) # 점수/일시정지 버튼을 가장 먼저 추가
@@ -308,83 +415,98 @@ class WordErasingGame(QWidget):
         self.set_background_color(QColor("#ADD8E6")) # 밝은 하늘색 (LightBlue)
 
         # Set speed based on difficulty and resolution
-        base_speed = 0 # 픽셀/프레임 (나중에 해상도에 비례하여 조정)
+        self.base_speed = 0 # 픽셀/REFERENCE_TICK (나중에 해상도에 비례하여 조정)
         if difficulty == "easy":
-            base_speed = 2
+            self.base_speed = 2
             self.spawn_interval = 2000 # 2초마다 단어 생성
         elif difficulty == "normal":
-            base_speed = 4
+            self.base_speed = 4
             self.spawn_interval = 1500 # 1.5초마다 단어 생성
         elif difficulty == "hard":
-            base_speed = 6
+            self.base_speed = 6
             self.spawn_interval = 1000 # 1초마다 단어 생성
+        self.update_word_speed()
 
-        # 단어 속도를 화면 높이에 비례하여 조정
+        self.spawn_elapsed = 0.0
+        self.game_time = 0.0 # 멈춘 시간을 뺀 게임 시간 (초)
+        self.game_started = time.time()
+        self.game_loop.stats.reset()
+        self.game_loop.start()
+
+    def update_word_speed(self):
+        # 단어 속도(픽셀/초)를 화면 높이에 비례하여 조정
         # 기준 해상도 높이를 480으로 가정 (가장 작은 해상도)
         reference_height = 480
-        self.word_speed = base_speed * (self.height() / reference_height)
-
-        self.game_timer.start(30) # 약 30ms마다 업데이트 (초당 약 33프레임)
-        self.word_spawn_timer.start(self.spawn_interval)
+        self.word_speed = self.base_speed * (self.height() / reference_height) / REFERENCE_TICK
 
     def spawn_new_word(self):
-        if not self.words:
+        if not self.corpus:
             QMessageBox.warning(self, "경고", "선택된 언어의 단어 목록이 비어있습니다. 게임을 종료합니다.")
             self.game_over()
             return
 
-        word_text = random.choice(self.words)
-        new_word_obj = FallingWord(word_text, self.game_area) # game_area를 부모로 설정
-        new_word_obj.speed = self.word_speed
-
-        # 단어의 x 위치를 랜덤하게 설정 (화면 너비 내에서)
-        max_x = self.game_area.width() - new_word_obj.width()
-        new_word_obj.x_pos = random.randint(0, max_x) if max_x > 0 else 0
-        new_word_obj.y_pos = 0 # game_area의 맨 위에서 시작
-        new_word_obj.move(new_word_obj.x_pos, new_word_obj.y_pos)
-        new_word_obj.show()
-        self.falling_words.append(new_word_obj)
-
-    def update_game(self):
-        words_to_remove = []
-        game_over_triggered = False
-
-        for word_obj in self.falling_words:
-            word_obj.move_down()
-            # 단어가 화면 하단에 닿았는지 확인
-            if word_obj.y_pos > self.game_area.height():
-                words_to_remove.append(word_obj)
-                game_over_triggered = True # 단어가 바닥에 닿으면 게임 오버
-
-        for word_obj in words_to_remove:
-            self.falling_words.remove(word_obj)
-            word_obj.deleteLater() # 위젯 삭제
-
-        if game_over_triggered:
+        word_text = self.corpus.sample(self.current_difficulty) # 난이도에 맞는 단어
+        # game_area의 맨 위, 랜덤한 x 위치에서 시작
+        self.game_area.spawn(word_text, self.word_speed)
+
+    def update_game(self, dt):
+        # 게임 시간 dt초만큼 진행 (GameLoop가 고정된 간격으로 부른다)
+        self.game_time += dt
+        self.spawn_elapsed += dt
+        if self.spawn_elapsed >= self.spawn_interval / 1000:
+            self.spawn_elapsed -= self.spawn_interval / 1000
+            self.spawn_new_word()
+            if not self.game_running:
+                return
+        # 단어가 화면 하단에 닿으면 게임 오버
+        if self.game_area.step(dt):
             self.game_over()
 
+    def render_game(self, alpha):
+        self.game_area.render(alpha)
+        if self.stats_label.isVisible() and self.game_loop.stats.frames % STATS_UPDATE_FRAMES == 0:
+            self.update_stats_display()
+
+    def update_stats_display(self):
+        stats = self.game_loop.stats.summary()
+        self.stats_label.setText(f"{stats['fps']:.0f} fps / {self.game_loop.refresh_rate} Hz | "
+                                 f"간격 {stats['mean_ms']:.1f}±{stats['jitter_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms | "
+                                 f"끊김 {stats['hitches']}")
+
+    def on_typing(self, text):
+        # 입력한 글자가 화면의 단어와 같으면 Enter 없이 바로 없애고, 아니면 그 글자로 시작하는 단어를 강조한다
+        if not self.game_running:
+            return
+        typed_word = text.strip()
+        matched_word_obj = self.game_area.find(typed_word)
+        if matched_word_obj:
+            self.catch_word(matched_word_obj)
+            self.input_field.clear_typing()
+            typed_word = ""
+        self.game_area.highlight(typed_word)
+
     def check_word(self):
         typed_word = self.input_field.text().strip()
-        self.input_field.clear()
+        self.input_field.clear_typing()
 
-        matched_word_obj = None
-        for word_obj in self.falling_words:
-            if word_obj.word == typed_word:
-                matched_word_obj = word_obj
-                break
+        matched_word_obj = self.game_area.find(typed_word)
 
         if matched_word_obj:
-            self.score += 1
-            self.score_label.setText(f"점수: {self.score}")
-            self.falling_words.remove(matched_word_obj)
-            matched_word_obj.deleteLater() # 위젯 삭제
+            self.catch_word(matched_word_obj)
         else:
             # 틀렸을 경우 처리 (예: 경고 메시지)
             pass # 현재는 아무것도 하지 않음
+        self.game_area.highlight("")
+
+    def catch_word(self, word_obj):
+        self.score += 1
+        self.score_label.setText(f"점수: {self.score}")
+        if self.score > self.best_score:
+            self.best_label.setText(f"최고: {self.score}")
+        self.game_area.remove(word_obj)
 
     def show_pause_menu(self):
-        self.game_timer.stop()
-        self.word_spawn_timer.stop()
+        self.game_loop.stop() # 멈춘 동안은 게임 시간이 흐르지 않는다
         self.game_running = False
 
         # 반투명 배경 위젯
@@ -416,31 +538,47 @@ class WordErasingGame(QWidget):
             pause_layout.addWidget(settings_button, alignment=Qt.AlignCenter)
             pause_layout.addWidget(exit_button, alignment=Qt.AlignCenter)
         
+        self.pause_overlay.setGeometry(0, 0, self.width(), self.height()) # 해상도가 바뀌었을 수 있다
         self.pause_overlay.show() # 항상 보이도록
+        self.pause_overlay.raise_()
 
     def resume_game(self):
-        self.clear_layout(self.main_layout) # 설정 화면 레이아웃 정리
+        # 게임 화면은 멈춘 동안에도 그대로 있으므로 오버레이만 숨기고 루프를 다시 돌린다
         self.pause_overlay.hide()
-        self.game_timer.start(30)
-        self.word_spawn_timer.start(self.spawn_interval)
+        self.game_loop.start()
         self.game_running = True
 
     def game_over(self):
         self.game_running = False
-        self.game_timer.stop()
-        self.word_spawn_timer.stop()
+        self.game_loop.stop()
 
         # 모든 떨어지는 단어 제거
-        for word_obj in self.falling_words:
-            word_obj.deleteLater()
-        self.falling_words.clear()
+        if self.game_area is not None:
+            self.game_area.clear()
 
         if hasattr(self, 'pause_overlay'):
             self.pause_overlay.hide() # 일시정지 메뉴 숨기기
 
-        QMessageBox.information(self, "게임 오버!", f"총 점수: {self.score}점")
+        # 기록은 쓰기 스레드에 넘기기만 한다
+        self.scores.record(self.current_language, self.current_difficulty, self.score,
+                           duration=self.game_time, started=self.game_started)
+        message = f"총 점수: {self.score}점"
+        if self.score > self.best_score:
+            message += "\n최고 기록입니다!"
+        else:
+            message += f"\n최고 점수: {self.best_score}점"
+        ranking = self.scores.top_scores(self.current_language, self.current_difficulty, TOP_SCORES_SHOWN)
+        if ranking:
+            message += "\n\n순위\n" + "\n".join(f"{rank}. {session.score}점 ({session.player})"
+                                                for rank, session in enumerate(ranking, 1))
+        QMessageBox.information(self, "게임 오버!", message)
         self.show_main_menu()
 
+    def closeEvent(self, event):
+        self.game_loop.stop()
+        self.scores.close() # 아직 쓰지 않은 기록을 마저 쓴다
+        super().closeEvent(event)
+
     def set_background_color(self, color):
         palette = self.palette()
         palette.setColor(QPalette.Window, color)
@@ -448,7 +586,10 @@ class WordErasingGame(QWidget):
         self.setAutoFillBackground(True)
 
     def keyPressEvent(self, event):
-        if event.key() == Qt.Key_Escape:
+        if event.key() == Qt.Key_F3 and self.game_area is not None:
+            self.stats_label.setVisible(not self.stats_label.isVisible())
+            self.update_stats_display()
+        elif event.key() == Qt.Key_Escape:
             if self.game_running:
                 self.show_pause_menu()
             elif hasattr(self, 'pause_overlay') and self.pause_overlay.isVisible():
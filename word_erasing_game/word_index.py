@@ -0,0 +1,98 @@
+# 화면에 있는 단어를 입력한 글자로 바로 찾기 위한 색인.
+# 단어는 비교용 키(word_key)로 바꿔서 해시(완전히 같은 단어)와 접두사 트리(입력 중인 앞부분이 같은 단어)에 넣는다.
+# 한 글자를 칠 때마다 드는 비용은 입력 길이와 맞는 단어 수에만 비례하고, 화면의 전체 단어 수와는 상관없다.
+#
+# 한글은 음절을 자판으로 치는 자모 순서로 풀어서 비교한다 (두벌식 기준: 겹모음/겹받침도 두 번 치는 자모로 나눈다).
+# IME가 조합 중인 글자는 받침이 다음 음절로 넘어갈 수 있어서 ('산' -> '사나') 음절 단위로는 접두사가 아니지만,
+# 자모로 풀면 'ㅅㅏㄴ'은 'ㅅㅏㄴㅏ'의 접두사다.
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+# 자판에서 두 번 눌러 만드는 겹모음/겹받침 (ㄲ, ㅆ 같은 된소리는 Shift로 한 번에 친다)
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+
+def _split(jamo):
+    return COMPOUND_JAMO.get(jamo, jamo)
+
+
+def word_key(text):
+    # 비교용 키: 한글 음절과 낱자모는 자판 순서의 자모로 풀고, 나머지 글자는 그대로 둔다
+    parts = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            code -= HANGUL_BASE
+            parts.append(CHOSEONG[code // 588])
+            parts.append(_split(JUNGSEONG[code // 28 % 21]))
+            parts.append(_split(JONGSEONG[code % 28]))
+        else:
+            parts.append(_split(char))
+    return "".join(parts)
+
+
+class _TrieNode:
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children = {}
+        self.items = {} # 이 접두사로 시작하는 항목 (넣은 순서를 지키는 집합으로 쓴다)
+
+
+class WordIndex:
+    # 키 -> 항목. 같은 키의 항목이 여럿이면 먼저 넣은 것부터 찾는다
+    def __init__(self):
+        self.exact = {} # 키 -> {항목: None}
+        self.root = _TrieNode()
+
+    def __len__(self):
+        return sum(len(items) for items in self.exact.values())
+
+    def add(self, key, item):
+        self.exact.setdefault(key, {})[item] = None
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            node.items[item] = None
+
+    def remove(self, key, item):
+        items = self.exact.get(key)
+        if items is None or item not in items:
+            return
+        del items[item]
+        if not items:
+            del self.exact[key]
+        node = self.root
+        for char in key:
+            child = node.children[char]
+            del child.items[item]
+            if not child.items:
+                del node.children[char] # 아래 노드도 모두 비었다
+                return
+            node = child
+
+    def find(self, key):
+        # 키가 완전히 같은 항목 중 가장 먼저 넣은 것
+        items = self.exact.get(key)
+        return next(iter(items)) if items else None
+
+    def matches(self, prefix):
+        # 키가 prefix로 시작하는 항목들 (빈 접두사는 아무것도 고르지 않는다)
+        if not prefix:
+            return {}
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return {}
+        return node.items
+
+    def clear(self):
+        self.exact.clear()
+        self.root = _TrieNode()
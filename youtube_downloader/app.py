@@ -1,54 +1,96 @@
+import argparse
+import os
 import sys
-import subprocess
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QTextEdit, QLabel
-from PyQt5.QtCore import QThread, pyqtSignal
+import threading
+from collections import deque
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton, QLabel,
+                             QSpinBox, QDoubleSpinBox, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QProgressBar, QComboBox)
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from download_queue import QUEUED, DONE, FAILED, CANCELLED, SKIPPED, FINISHED_STATES
+from daemon import TOKEN_ENV
+from daemon_client import DaemonError, RemoteEngine
+from engine import DownloadEngine
+from progress import PHASE_POSTPROCESSING, describe
 
-class DownloadThread(QThread):
-    download_output = pyqtSignal(str)
-    download_finished = pyqtSignal(int)
+MAX_CONCURRENT_LIMIT = 16
+UI_UPDATE_INTERVAL = 100 # ms; 진행 상황과 로그는 이 간격으로 모아서 화면에 반영한다
+LOG_MAX_LINES = 2000 # 로그 창에 남기는 최대 줄 수 (오래된 줄부터 지운다)
+MAX_FRAGMENTS = 16
+DAEMON_ENV = 'YTDL_DAEMON' # --connect를 주지 않았을 때 붙을 daemon 주소
 
-    def __init__(self, url):
-        super().__init__()
-        self.url = url
+class QueueBridge(QObject):
+    # 작업 스레드(또는 daemon 이벤트 스레드)에서 오는 엔진 알림을 GUI 스레드로 넘긴다.
+    # 상태 변경은 드물어서 바로 시그널로 보내고 (알림 시점의 상태를 같이 보냄),
+    # 진행 상황은 작업마다 마지막 값만, 로그는 제한된 버퍼에 모아 두었다가
+    # 타이머가 UI_UPDATE_INTERVAL마다 한 번에 내보낸다.
+    changed = pyqtSignal(object, str)
+    progress_batch = pyqtSignal(list) # [(job, event), ...]
+    output_batch = pyqtSignal(list) # [(job, line), ...]
+    message = pyqtSignal(str) # 작업에 속하지 않는 로그 (재생목록 읽기 등)
 
-    def run(self):
-        try:
-            # yt-dlp 명령 실행
-            process = subprocess.Popen(
-                [sys.executable, '-m', 'yt_dlp', '-f', 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best', self.url],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                encoding='utf-8',
-                errors='replace'
-            )
-
-            for line in process.stdout:
-                self.download_output.emit(line.strip())
-            
-            process.wait()
-            self.download_finished.emit(process.returncode)
-
-        except Exception as e:
-            self.download_output.emit(f"Error: {e}")
-            self.download_finished.emit(1) # Indicate error
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lock = threading.Lock()
+        self.pending_progress = {}
+        self.pending_lines = deque(maxlen=LOG_MAX_LINES)
+        self.timer = QTimer(self)
+        self.timer.setInterval(UI_UPDATE_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def job_changed(self, job):
+        self.changed.emit(job, job.state)
+
+    def job_output(self, job, line):
+        with self.lock:
+            self.pending_lines.append((job, line))
+
+    def job_progress(self, job, event):
+        with self.lock:
+            self.pending_progress[job.id] = (job, event)
+
+    def message_posted(self, text):
+        self.message.emit(text)
+
+    def flush(self):
+        with self.lock:
+            progress = list(self.pending_progress.values())
+            lines = list(self.pending_lines)
+            self.pending_progress.clear()
+            self.pending_lines.clear()
+        if progress:
+            self.progress_batch.emit(progress)
+        if lines:
+            self.output_batch.emit(lines)
 
 class YouTubeDownloader(QWidget):
-    def __init__(self):
+    # engine은 같은 프로세스의 DownloadEngine이거나 daemon에 붙은 RemoteEngine이다 (메서드가 같다)
+    def __init__(self, engine):
         super().__init__()
+        self.bridge = QueueBridge()
+        self.bridge.changed.connect(self.update_job)
+        self.bridge.progress_batch.connect(self.update_progress)
+        self.bridge.output_batch.connect(self.update_log)
+        self.bridge.message.connect(self.log_message)
+        self.engine = engine
+        self.engine.add_listener(self.bridge)
+        self.job_rows = {} # 작업 id -> 표의 행 번호
+        self.progress_bars = {} # 작업 id -> QProgressBar
         self.initUI()
+        self.engine.resume_unfinished()
 
     def initUI(self):
         self.setWindowTitle('YouTube Downloader')
-        self.setGeometry(100, 100, 600, 400)
+        self.setGeometry(100, 100, 700, 500)
 
         main_layout = QVBoxLayout()
 
-        # URL 입력 섹션
+        # URL 입력 섹션 (여러 줄 붙여넣기 가능)
         url_layout = QHBoxLayout()
         self.url_label = QLabel('YouTube URL:')
-        self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText('Enter YouTube video URL here')
+        self.url_input = QPlainTextEdit()
+        self.url_input.setPlaceholderText('Enter YouTube video, playlist or channel URLs here (one per line)')
+        self.url_input.setMaximumHeight(60)
         self.download_button = QPushButton('Download')
         self.download_button.clicked.connect(self.start_download)
 
@@ -58,42 +100,210 @@ class YouTubeDownloader(QWidget):
 
         main_layout.addLayout(url_layout)
 
-        # 출력 로그 섹션
-        self.output_log = QTextEdit()
+        # 큐 제어 섹션
+        control_layout = QHBoxLayout()
+        # 처음 값은 엔진(daemon이면 daemon)의 지금 설정에서 가져온다
+        settings = self.engine.settings()
+        control_layout.addWidget(QLabel('Max concurrent:'))
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, MAX_CONCURRENT_LIMIT)
+        self.concurrency_input.setValue(settings['max_concurrent'])
+        self.concurrency_input.valueChanged.connect(self.engine.set_max_concurrent)
+        control_layout.addWidget(self.concurrency_input)
+        control_layout.addWidget(QLabel('Backend:'))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(settings['backends'])
+        self.backend_combo.setCurrentText(settings['backend'])
+        self.backend_combo.currentTextChanged.connect(self.engine.set_backend)
+        control_layout.addWidget(self.backend_combo)
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        control_layout.addWidget(self.cancel_button)
+        self.retry_button = QPushButton('Retry')
+        self.retry_button.clicked.connect(self.retry_selected)
+        control_layout.addWidget(self.retry_button)
+        control_layout.addStretch(1)
+        self.status_label = QLabel('')
+        control_layout.addWidget(self.status_label)
+        main_layout.addLayout(control_layout)
+
+        # 대역폭 섹션
+        bandwidth_layout = QHBoxLayout()
+        bandwidth_layout.addWidget(QLabel('Limit (MB/s):'))
+        self.limit_input = QDoubleSpinBox()
+        self.limit_input.setRange(0, 1000)
+        self.limit_input.setDecimals(1)
+        self.limit_input.setSingleStep(0.5)
+        self.limit_input.setSpecialValueText('Unlimited') # 0
+        self.limit_input.setValue((settings['limit'] or 0) / (1000 * 1000))
+        self.limit_input.valueChanged.connect(self.set_limit)
+        bandwidth_layout.addWidget(self.limit_input)
+        bandwidth_layout.addWidget(QLabel('Fragments:'))
+        self.fragments_input = QSpinBox()
+        self.fragments_input.setRange(1, MAX_FRAGMENTS)
+        self.fragments_input.setValue(settings['fragments'])
+        self.fragments_input.valueChanged.connect(self.engine.set_fragments)
+        bandwidth_layout.addWidget(self.fragments_input)
+        bandwidth_layout.addWidget(QLabel('Priority:'))
+        self.priority_combo = QComboBox()
+        self.priority_combo.addItems(settings['priorities'])
+        self.priority_combo.setCurrentText('Normal')
+        self.priority_combo.activated[str].connect(self.set_priority)
+        bandwidth_layout.addWidget(self.priority_combo)
+        bandwidth_layout.addStretch(1)
+        main_layout.addLayout(bandwidth_layout)
+
+        # 작업 목록
+        self.jobs_table = QTableWidget(0, 5)
+        self.jobs_table.setHorizontalHeaderLabels(['#', 'URL', 'State', 'Progress', 'Details'])
+        self.jobs_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.jobs_table.verticalHeader().setVisible(False)
+        self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.jobs_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        main_layout.addWidget(self.jobs_table)
+
+        # 출력 로그 섹션 (진행 줄은 빼고, 최근 LOG_MAX_LINES줄만 유지)
+        self.output_log = QPlainTextEdit()
         self.output_log.setReadOnly(True)
+        self.output_log.setMaximumBlockCount(LOG_MAX_LINES)
         main_layout.addWidget(self.output_log)
 
         self.setLayout(main_layout)
 
-        self.download_thread = None
-
     def start_download(self):
-        url = self.url_input.text()
-        if not url:
-            self.output_log.append("Please enter a YouTube URL.")
+        # 붙여넣은 URL을 모두 큐에 넣는다; 입력창과 버튼은 막히지 않는다
+        urls = self.url_input.toPlainText().split()
+        if not urls:
+            self.output_log.appendPlainText("Please enter a YouTube URL.")
             return
 
-        self.output_log.clear()
-        self.output_log.append(f"Starting download for: {url}")
-        self.download_button.setEnabled(False)
+        self.url_input.clear()
+        # 재생목록/채널은 엔진이 항목이 나오는 대로 큐에 넣는다
+        self.engine.submit(urls)
 
-        self.download_thread = DownloadThread(url)
-        self.download_thread.download_output.connect(self.update_log)
-        self.download_thread.download_finished.connect(self.download_complete)
-        self.download_thread.start()
+    def log_message(self, text):
+        self.output_log.appendPlainText(text)
 
-    def update_log(self, text):
-        self.output_log.append(text)
+    def set_limit(self, value):
+        self.engine.set_limit(int(value * 1000 * 1000) if value else None)
 
-    def download_complete(self, returncode):
-        if returncode == 0:
-            self.output_log.append("\nDownload finished successfully!")
+    def set_priority(self, priority):
+        # 선택한 작업들의 가중치를 바꾼다; 새로 넣는 작업은 Normal
+        for job_id in self.selected_job_ids():
+            self.engine.set_priority(job_id, priority)
+
+    def selected_job_ids(self):
+        rows = {index.row() for index in self.jobs_table.selectionModel().selectedRows()}
+        return [int(self.jobs_table.item(row, 0).text()) for row in sorted(rows)]
+
+    def cancel_selected(self):
+        for job_id in self.selected_job_ids():
+            self.engine.cancel(job_id)
+
+    def retry_selected(self):
+        # 다시 시작했다는 표시는 작업이 실제로 대기 상태로 돌아올 때 update_job이 남긴다
+        # (daemon 클라이언트는 요청을 보내 두기만 하고, 거절되면 daemon의 메시지가 온다)
+        for job_id in self.selected_job_ids():
+            self.engine.retry(job_id)
+
+    def update_job(self, job, state):
+        if state in FINISHED_STATES:
+            # 이 작업의 남은 진행 상황과 로그를 결과보다 먼저 반영한다 (늦게 온 진행 상황이 결과를 덮지 않게)
+            self.bridge.flush()
+        row = self.job_rows.get(job.id)
+        if row is None:
+            row = self.jobs_table.rowCount()
+            self.jobs_table.insertRow(row)
+            self.jobs_table.setItem(row, 0, QTableWidgetItem(str(job.id)))
+            self.jobs_table.setItem(row, 1, QTableWidgetItem(job.url))
+            self.jobs_table.setItem(row, 2, QTableWidgetItem(''))
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 1000)
+            progress_bar.setValue(0)
+            self.jobs_table.setCellWidget(row, 3, progress_bar)
+            self.progress_bars[job.id] = progress_bar
+            self.jobs_table.setItem(row, 4, QTableWidgetItem(''))
+            self.job_rows[job.id] = row
+        elif state == QUEUED and self.jobs_table.item(row, 2).text() in FINISHED_STATES:
+            self.output_log.appendPlainText(f"[#{job.id}] Retrying")
+        self.jobs_table.item(row, 2).setText(state)
+
+        progress_bar = self.progress_bars[job.id]
+        if state == QUEUED or state in FINISHED_STATES:
+            progress_bar.setRange(0, 1000) # 후처리 중 표시(바쁨 상태)를 끝낸다
+            if state == QUEUED: # 재시도하면 처음부터
+                progress_bar.setValue(0)
+                self.jobs_table.item(row, 4).setText('')
+            elif state == DONE:
+                progress_bar.setValue(1000)
+                merged = f" (merged in {job.merge_seconds:.1f}s)" if job.merge_seconds is not None else ''
+                self.jobs_table.item(row, 4).setText(f"Finished{merged}")
+            elif state == SKIPPED:
+                progress_bar.setValue(1000)
+                self.jobs_table.item(row, 4).setText('Already downloaded')
+        if state in FINISHED_STATES:
+            self.download_complete(job, state)
+        self.update_status()
+
+    def update_progress(self, updates):
+        # 작업마다 마지막 진행 상황만 반영한다
+        for job, event in updates:
+            row = self.job_rows.get(job.id)
+            if row is None:
+                continue
+            progress_bar = self.progress_bars[job.id]
+            if event.phase == PHASE_POSTPROCESSING:
+                progress_bar.setRange(0, 0) # 병합 등 후처리는 진행률을 알 수 없다
+            elif event.percent is not None:
+                progress_bar.setRange(0, 1000)
+                progress_bar.setValue(int(event.percent * 10))
+            self.jobs_table.item(row, 4).setText(describe(event))
+
+    def update_log(self, lines):
+        self.output_log.appendPlainText('\n'.join(f"[#{job.id}] {line}" for job, line in lines))
+
+    def download_complete(self, job, state):
+        if state == CANCELLED:
+            self.output_log.appendPlainText(f"[#{job.id}] Download cancelled.")
+        elif state == SKIPPED:
+            self.output_log.appendPlainText(f"[#{job.id}] Already downloaded, skipped. Select it and press Retry to download again.")
+        elif state == FAILED:
+            detail = job.error if job.error else f"error code: {job.returncode}"
+            self.output_log.appendPlainText(f"[#{job.id}] Download failed with {detail}")
+            # 작업별 링 버퍼에서 마지막 오류 줄을 찾아 보여준다
+            errors = [line for line in job.log if line.startswith('ERROR')]
+            if errors:
+                self.jobs_table.item(self.job_rows[job.id], 4).setText(errors[-1])
         else:
-            self.output_log.append(f"\nDownload failed with error code: {returncode}")
-        self.download_button.setEnabled(True)
+            self.output_log.appendPlainText(f"[#{job.id}] Download finished successfully!")
+
+    def update_status(self):
+        counts = self.engine.counts()
+        self.status_label.setText(', '.join(f"{state}: {count}" for state, count in sorted(counts.items())))
+
+    def closeEvent(self, event):
+        # 같은 프로세스의 엔진이면 실행 중인 yt-dlp 프로세스를 정리하고 닫는다.
+        # daemon에 붙어 있으면 연결만 끊고 다운로드는 daemon에서 계속된다
+        self.engine.shutdown()
+        super().closeEvent(event)
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = YouTubeDownloader()
+    parser = argparse.ArgumentParser(description='YouTube Downloader')
+    parser.add_argument('--connect', metavar='URL', default=os.environ.get(DAEMON_ENV),
+                        help=f"run as a client of a running daemon.py (e.g. http://127.0.0.1:8770; default: ${DAEMON_ENV})")
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f"daemon API token (default: ${TOKEN_ENV} or the daemon's token file)")
+    args, qt_args = parser.parse_known_args()
+    if args.connect:
+        try:
+            engine = RemoteEngine(args.connect, args.token)
+        except DaemonError as e:
+            sys.exit(str(e))
+    else:
+        engine = DownloadEngine()
+    app = QApplication(sys.argv[:1] + qt_args)
+    ex = YouTubeDownloader(engine)
+    if args.connect:
+        engine.start() # 창이 listener로 붙은 뒤에 이벤트를 받기 시작한다
     ex.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
@@ -0,0 +1,192 @@
+import threading
+import time
+
+# 전체 대역폭 제한과 작업별 가중치.
+# BandwidthManager가 전체 한도를 실행 중인 작업들에 가중치대로 나누고, 한도만큼 쓰지 못하는 작업
+# (서버가 느린 경우 등)의 남는 몫은 다른 작업에 다시 나눠 준다. 한도, 가중치가 바뀌거나 속도가 변하면
+# 다시 계산해서 각 작업의 apply(rate)를 부른다.
+# 작업 프로세스는 progress hook에서 TokenBucket으로 받은 만큼 기다려서 속도를 맞추므로
+# 실행 중에도 바로 적용된다. subprocess 방식은 시작할 때 정해진 몫을 --limit-rate로 넘긴다.
+REBALANCE_INTERVAL = 1.0 # 초
+MIN_RATE = 32 * 1024 # bytes/s; 남는 몫을 돌려준 작업도 다시 빨라질 수 있도록 남겨 두는 최소 속도
+SATURATED = 0.8 # 몫의 이 비율보다 느리면 한도가 아니라 다른 이유로 느린 작업으로 본다
+HEADROOM = 1.5 # 그런 작업에는 지금 속도의 이 배수만 남긴다
+SPEED_WINDOW = 0.5 # 초; 속도를 재는 간격
+SPEED_SMOOTHING = 0.5
+BURST_SECONDS = 0.5 # 토큰 버킷 크기 (이 시간 동안 받을 수 있는 양)
+BLOCK_SIZE = 64 * 1024 # 제한 중에는 읽기 단위를 고정해서 hook이 자주 불리게 한다
+DEFAULT_FRAGMENTS = 1 # DASH/HLS 조각 동시 다운로드 수 (yt-dlp -N)
+PRIORITY_WEIGHTS = {'Low': 0.5, 'Normal': 1.0, 'High': 2.0}
+
+
+class TokenBucket:
+    # 받은 바이트만큼 토큰을 쓰고, 모자라면 채워질 때까지 기다린다. rate가 None이면 제한 없음.
+    # 기다리는 동안에도 rate 변경과 취소를 짧은 간격으로 확인한다.
+    def __init__(self, rate=None):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill()
+            self.rate = rate if rate else None
+            if self.rate is not None:
+                self.tokens = min(self.tokens, self.rate * BURST_SECONDS)
+
+    def reset(self, rate):
+        # 새 작업은 쌓여 있던 토큰 없이 시작한다 (작업 사이 쉬는 동안 찬 토큰으로 몰아 받지 않게)
+        with self.lock:
+            self.rate = rate if rate else None
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.rate * BURST_SECONDS, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount, cancel_event=None):
+        with self.lock:
+            self._refill()
+            if self.rate is None:
+                return
+            self.tokens -= amount
+        while cancel_event is None or not cancel_event.is_set():
+            with self.lock:
+                self._refill()
+                if self.rate is None or self.tokens >= 0:
+                    return
+                wait = -self.tokens / self.rate
+            time.sleep(min(wait, 0.1))
+
+
+class _Share:
+    def __init__(self, weight, apply):
+        self.weight = weight
+        self.apply = apply # rate(bytes/s 또는 None)를 작업에 적용하는 함수; 시작할 때만 정하는 경우 None
+        self.rate = None # 지금 배정된 속도
+        self.speed = None # 최근 측정 속도 (지수 이동 평균)
+        self.sample = None # (시각, 파일, 받은 바이트); yt-dlp의 speed는 시작부터의 평균이라 직접 잰다
+
+    def observe(self, filename, downloaded):
+        now = time.monotonic()
+        if self.sample is None or self.sample[1] != filename or downloaded < self.sample[2]:
+            self.sample = (now, filename, downloaded)
+            return
+        elapsed = now - self.sample[0]
+        if elapsed < SPEED_WINDOW:
+            return
+        speed = (downloaded - self.sample[2]) / elapsed
+        self.speed = speed if self.speed is None else self.speed + (speed - self.speed) * SPEED_SMOOTHING
+        self.sample = (now, filename, downloaded)
+
+
+def allocate(limit, shares):
+    # 가중치 비례 배분 + 남는 몫 재분배 (water-filling). {작업 id: rate}
+    if limit is None:
+        return {job_id: None for job_id in shares}
+    demand = {}
+    for job_id, share in shares.items():
+        if share.rate is not None and share.speed is not None and share.speed < share.rate * SATURATED:
+            demand[job_id] = max(MIN_RATE, share.speed * HEADROOM)
+        else:
+            demand[job_id] = float('inf')
+    rates = {}
+    remaining = float(limit)
+    pending = set(shares)
+    while pending:
+        total_weight = sum(shares[job_id].weight for job_id in pending)
+        satisfied = [job_id for job_id in pending if demand[job_id] <= remaining * shares[job_id].weight / total_weight]
+        if not satisfied:
+            for job_id in pending:
+                rates[job_id] = max(MIN_RATE, remaining * shares[job_id].weight / total_weight)
+            break
+        for job_id in satisfied:
+            rates[job_id] = demand[job_id]
+            remaining -= demand[job_id]
+            pending.discard(job_id)
+    return rates
+
+
+class BandwidthManager:
+    # 실행기는 작업을 시작할 때 register(job, apply)로 첫 속도를 받고, 진행 중에 report(job, event),
+    # 끝나면 unregister(job)를 부른다. limit, fragments는 실행 중에 바꿀 수 있다 (bytes/s, None이면 제한 없음).
+    def __init__(self, limit=None, fragments=DEFAULT_FRAGMENTS):
+        self.limit = limit
+        self.fragments = fragments
+        self.shares = {} # 작업 id -> _Share
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        threading.Thread(target=self._rebalance_loop, daemon=True).start()
+
+    def register(self, job, apply=None):
+        with self.lock:
+            share = self.shares[job.id] = _Share(getattr(job, 'weight', 1.0), apply)
+            self._rebalance()
+            return share.rate
+
+    def unregister(self, job):
+        with self.lock:
+            if self.shares.pop(job.id, None) is not None:
+                self._rebalance()
+
+    def report(self, job, event):
+        if event.downloaded_bytes is None:
+            return
+        with self.lock:
+            share = self.shares.get(job.id)
+            if share is not None:
+                share.observe(event.filename, event.downloaded_bytes)
+
+    def set_limit(self, limit):
+        with self.lock:
+            self.limit = limit if limit else None
+            self._rebalance()
+
+    def set_fragments(self, fragments):
+        # 새로 시작하는 작업부터 적용된다
+        self.fragments = max(1, fragments)
+
+    def set_weight(self, job, weight):
+        job.weight = weight
+        with self.lock:
+            share = self.shares.get(job.id)
+            if share is not None:
+                share.weight = weight
+                self._rebalance()
+
+    def rates(self):
+        with self.lock:
+            return {job_id: share.rate for job_id, share in self.shares.items()}
+
+    def _rebalance(self):
+        # self.lock 안에서 부른다. apply도 lock 안에서 불러서 unregister 뒤에는 호출되지 않게 한다
+        for job_id, rate in allocate(self.limit, self.shares).items():
+            share = self.shares[job_id]
+            if rate is not None:
+                rate = int(rate)
+            if rate == share.rate or (rate is not None and share.rate is not None
+                                      and abs(rate - share.rate) < share.rate * 0.05):
+                continue # 작은 변화로 작업 프로세스에 메시지를 계속 보내지 않는다
+            share.rate = rate
+            if share.apply is not None:
+                try:
+                    share.apply(rate)
+                except (OSError, EOFError):
+                    pass # 작업 프로세스가 끝나는 중
+
+    def _rebalance_loop(self):
+        while not self.closed:
+            self.wake.wait(REBALANCE_INTERVAL)
+            with self.lock:
+                if self.shares and self.limit is not None:
+                    self._rebalance()
+
+    def close(self):
+        self.closed = True
+        self.wake.set()
@@ -0,0 +1,382 @@
+import argparse
+import hmac
+import json
+import os
+import re
+import secrets
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from download_queue import DEFAULT_MAX_CONCURRENT, FAILED, FINISHED_STATES
+from engine import DownloadEngine, event_dict, job_dict
+from job_journal import JOURNAL_PATH
+
+# 화면 없이 돌아가는 다운로드 daemon. GUI와 같은 엔진(engine.DownloadEngine)을 쓰고
+# 로컬 HTTP/JSON API로 조작한다. 기본으로 127.0.0.1에만 열린다.
+# 시작할 때마다 새 토큰을 만들어 TOKEN_PATH(본인만 읽을 수 있는 파일)에 쓰고, 모든 요청에
+# `Authorization: Bearer <토큰>`을 요구한다. 브라우저의 웹 페이지가 localhost로 요청을 보내지 못하도록
+# Host 헤더가 이 서버의 이름:포트가 아니면 (DNS rebinding) 거절하고, POST는 Content-Type: application/json만 받는다
+# (단순 요청으로 보낼 수 없어 preflight가 필요한데, CORS 헤더를 주지 않으므로 통과하지 못한다).
+#   GET  /jobs                   작업 목록
+#   POST /jobs                   {"urls": [...], "directory": "..."} 작업 추가 (재생목록/채널은 항목이 나오는 대로)
+#   GET  /jobs/<id>              작업 하나
+#   POST /jobs/<id>/cancel       취소
+#   POST /jobs/<id>/retry        다시 시도
+#   POST /jobs/<id>/priority     {"priority": "High"}
+#   GET  /settings               동시 작업 수, 실행 방식, 대역폭 한도, 조각 수
+#   POST /settings               바꿀 값만 보낸다
+#   GET  /status                 상태별 작업 수
+#   GET  /events                 Server-Sent Events: 처음에 snapshot(작업 목록, 설정), 이후 job / progress / output / message
+# 진행 상황은 GUI처럼 작업마다 마지막 값만 EVENT_INTERVAL마다 모아서 보낸다.
+#   python youtube_downloader/daemon.py --port 8770 --output-dir ~/Videos
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8770
+EVENT_INTERVAL = 0.1 # 초
+KEEPALIVE_INTERVAL = 15.0 # 초; 아무 일이 없어도 연결이 살아 있는지 확인하는 주석 줄을 보낸다
+EVENT_BACKLOG = 10000 # 읽지 못한 클라이언트마다 쌓아 두는 최대 이벤트 수 (넘치면 오래된 것부터 버린다)
+MAX_BODY = 1024 * 1024
+TOKEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'daemon.token')
+TOKEN_ENV = 'YTDL_DAEMON_TOKEN' # 정해 둔 토큰을 쓰려면 (없으면 시작할 때마다 새로 만든다)
+LOOPBACK_NAMES = ('localhost', '127.0.0.1', '[::1]')
+
+JOB_PATH = re.compile(r'^/jobs/(\d+)(?:/(cancel|retry|priority))?$')
+
+
+class Subscriber:
+    # /events 연결 하나. 이벤트는 순서대로 쌓고 진행 상황은 작업마다 마지막 값만 둔다
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.events = deque(maxlen=EVENT_BACKLOG)
+        self.progress = {} # 작업 id -> 마지막 진행 상황
+        self.flushed = 0.0 # 마지막으로 꺼내 간 시각
+        self.closed = False
+
+    def push(self, kind, data, job_id=None):
+        with self.cond:
+            if job_id is not None and job_id in self.progress:
+                # 상태 변경보다 먼저 들어온 진행 상황을 먼저 내보낸다
+                self.events.append(('progress', {'id': job_id, 'progress': self.progress.pop(job_id)}))
+            self.events.append((kind, data))
+            self.cond.notify()
+
+    def set_progress(self, job_id, data):
+        with self.cond:
+            if not self.progress:
+                self.cond.notify()
+            self.progress[job_id] = data
+
+    def take(self, timeout):
+        # 쌓인 이벤트를 모두 꺼낸다. 상태 변경과 로그는 바로, 진행 상황만 있으면
+        # 지난번에 꺼낸 뒤 EVENT_INTERVAL이 지나야 가져간다. timeout 동안 아무것도 없으면 빈 목록
+        with self.cond:
+            deadline = time.monotonic() + timeout
+            while not self.events and not self.closed:
+                now = time.monotonic()
+                wait = self.flushed + EVENT_INTERVAL - now if self.progress else deadline - now
+                if wait <= 0:
+                    break
+                self.cond.wait(wait)
+            self.flushed = time.monotonic()
+            events = list(self.events)
+            events += [('progress', {'id': job_id, 'progress': data}) for job_id, data in self.progress.items()]
+            self.events.clear()
+            self.progress.clear()
+            return events
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+
+class EventHub:
+    # 엔진 listener. 작업 스레드에서 받은 알림을 연결된 /events 클라이언트 모두에게 나눠 준다
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+
+    def subscribe(self):
+        subscriber = Subscriber()
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def _each(self):
+        with self.lock:
+            return list(self.subscribers)
+
+    def job_changed(self, job):
+        data = job_dict(job)
+        for subscriber in self._each():
+            subscriber.push('job', data, job.id)
+
+    def job_output(self, job, line):
+        for subscriber in self._each():
+            subscriber.push('output', {'id': job.id, 'line': line})
+
+    def job_progress(self, job, event):
+        data = event_dict(event)
+        for subscriber in self._each():
+            subscriber.set_progress(job.id, data)
+
+    def message_posted(self, text):
+        for subscriber in self._each():
+            subscriber.push('message', {'text': text})
+
+    def close(self):
+        for subscriber in self._each():
+            subscriber.close()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = 'ytdl-daemon'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def engine(self):
+        return self.server.engine
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0].rstrip('/') or '/'
+        try:
+            self._check_request(method)
+            if method == 'GET' and path == '/events':
+                self._stream_events()
+                return
+            status, body = self._route(method, path)
+        except ApiError as e:
+            status, body = e.status, {'error': str(e)}
+        self._send_json(status, body)
+
+    def _check_request(self, method):
+        if (self.headers.get('Host') or '').lower() not in self.server.allowed_hosts:
+            raise ApiError(403, f"unexpected Host header {self.headers.get('Host')!r}")
+        token = self.headers.get('X-Auth-Token') or ''
+        scheme, _, value = (self.headers.get('Authorization') or '').partition(' ')
+        if scheme.lower() == 'bearer':
+            token = value.strip()
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            raise ApiError(401, f"missing or wrong token (see {self.server.token_path or TOKEN_ENV})")
+        if method == 'POST' and self.headers.get_content_type() != 'application/json':
+            raise ApiError(415, 'expected Content-Type: application/json')
+
+    def _route(self, method, path):
+        if path == '/jobs':
+            if method == 'GET':
+                return 200, {'jobs': [job_dict(job) for job in self.engine.all_jobs()]}
+            body = self._read_json()
+            urls = body.get('urls')
+            if isinstance(urls, str):
+                urls = urls.split()
+            if not urls or not all(isinstance(url, str) for url in urls):
+                raise ApiError(400, 'expected {"urls": [...]}')
+            jobs = self.engine.submit(urls, body.get('directory'))
+            return 201, {'jobs': [job_dict(job) for job in jobs]}
+        match = JOB_PATH.match(path)
+        if match:
+            job = self.engine.get(int(match.group(1)))
+            if job is None:
+                raise ApiError(404, f"no job {match.group(1)}")
+            action = match.group(2)
+            if action is None and method == 'GET':
+                return 200, job_dict(job)
+            if action is not None and method == 'POST':
+                if action == 'cancel':
+                    ok = self.engine.cancel(job.id)
+                elif action == 'retry':
+                    ok = self.engine.retry(job.id)
+                else:
+                    priority = self._read_json().get('priority')
+                    if priority not in self.engine.settings()['priorities']:
+                        raise ApiError(400, f"unknown priority {priority!r}")
+                    ok = self.engine.set_priority(job.id, priority)
+                if not ok:
+                    raise ApiError(409, f"cannot {action} job {job.id} ({job.state})")
+                return 200, job_dict(job)
+        elif path == '/settings':
+            if method == 'GET':
+                return 200, self.engine.settings()
+            try:
+                return 200, self.engine.update_settings(self._read_json())
+            except (TypeError, ValueError) as e:
+                raise ApiError(400, str(e))
+        elif path == '/status' and method == 'GET':
+            return 200, {'counts': self.engine.counts()}
+        raise ApiError(404, f"no route for {method} {path}")
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, 'request body too large')
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            raise ApiError(400, f"invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise ApiError(400, 'expected a JSON object')
+        return body
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self):
+        # 구독을 먼저 하고 snapshot을 보내서 그 사이의 변경을 놓치지 않는다 (중복은 클라이언트가 덮어쓴다)
+        hub = self.server.hub
+        subscriber = hub.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self._write_events([('snapshot', {'jobs': [job_dict(job) for job in self.engine.all_jobs()],
+                                              'settings': self.engine.settings()})])
+            while not subscriber.closed:
+                events = subscriber.take(KEEPALIVE_INTERVAL)
+                if events:
+                    self._write_events(events)
+                else:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass # 클라이언트가 연결을 끊었다
+        finally:
+            hub.unsubscribe(subscriber)
+
+    def _write_events(self, events):
+        self.wfile.write(''.join(f"event: {kind}\ndata: {json.dumps(data)}\n\n" for kind, data in events).encode('utf-8'))
+        self.wfile.flush()
+
+
+class DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, engine, token, token_path=None, allowed_hosts=(), verbose=False):
+        super().__init__(address, ApiHandler)
+        self.engine = engine
+        self.token = token
+        self.token_path = token_path
+        self.verbose = verbose
+        # Host 헤더로 받는 이름:포트 (포트 80이면 포트 없이도)
+        host, port = self.server_address[:2]
+        names = {name.lower() for name in (*LOOPBACK_NAMES, *allowed_hosts)}
+        if host not in ('0.0.0.0', '::', ''):
+            names.add(f"[{host}]" if ':' in host else host)
+        self.allowed_hosts = {f"{name}:{port}" for name in names} | (names if port == 80 else set())
+        self.hub = EventHub()
+        engine.add_listener(self.hub)
+
+    def close(self):
+        # /events 연결을 먼저 끝내고 서버와 엔진을 닫는다.
+        # 기록에는 취소로 남기지 않아서 다음 실행 때 .part 파일부터 이어 받는다
+        self.hub.close()
+        self.shutdown()
+        self.server_close()
+        self.engine.shutdown()
+
+
+def write_token(path, token):
+    # 본인만 읽을 수 있게 만든다 (이미 있던 파일도 권한을 다시 맞춘다)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        os.chmod(path, 0o600)
+        f.write(token + '\n')
+
+
+def read_token(path=TOKEN_PATH):
+    # 환경 변수가 먼저, 없으면 daemon이 쓴 파일. 둘 다 없으면 None
+    if os.environ.get(TOKEN_ENV):
+        return os.environ[TOKEN_ENV]
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class ConsoleLog:
+    # 화면 없이 돌 때 작업 결과와 메시지를 표준 출력에 남긴다
+    def job_changed(self, job):
+        if job.state in FINISHED_STATES:
+            detail = f" ({job.error or f'error code: {job.returncode}'})" if job.state == FAILED else ''
+            print(f"[#{job.id}] {job.state}{detail}: {job.url}", flush=True)
+
+    def job_output(self, job, line):
+        pass
+
+    def job_progress(self, job, event):
+        pass
+
+    def message_posted(self, text):
+        print(text, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless download daemon with a local HTTP/JSON API.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='0 picks a free port')
+    parser.add_argument('--max-concurrent', type=int, default=DEFAULT_MAX_CONCURRENT)
+    parser.add_argument('--output-dir', help='folder for jobs submitted without a directory (default: current folder)')
+    parser.add_argument('--journal', default=JOURNAL_PATH, help='job journal / download archive (SQLite)')
+    parser.add_argument('--no-resume', action='store_true', help='do not re-queue unfinished jobs from the journal')
+    parser.add_argument('--token-file', default=TOKEN_PATH, help='where to write the API token clients must send')
+    parser.add_argument('--allow-host', action='append', default=[], metavar='NAME',
+                        help='extra name accepted in the Host header (besides localhost and the bound address)')
+    parser.add_argument('--verbose', action='store_true', help='log every HTTP request')
+    args = parser.parse_args(argv)
+
+    token = os.environ.get(TOKEN_ENV) or secrets.token_urlsafe(32)
+    write_token(args.token_file, token)
+    engine = DownloadEngine(args.max_concurrent, journal_path=args.journal, directory=args.output_dir)
+    engine.add_listener(ConsoleLog())
+    server = DaemonServer((args.host, args.port), engine, token, args.token_file, args.allow_host, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Listening on http://{host}:{port}", flush=True)
+    if not args.no_resume:
+        engine.resume_unfinished()
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.remove(args.token_file)
+        except OSError:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
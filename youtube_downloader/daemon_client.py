@@ -0,0 +1,264 @@
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+
+from daemon import TOKEN_ENV, read_token
+from download_queue import LOG_LINES_PER_JOB
+from progress import ProgressEvent
+
+# daemon.py에 붙는 얇은 클라이언트. engine.DownloadEngine과 같은 메서드를 HTTP로 보내고,
+# /events 스트림을 읽는 스레드가 작업 상태를 RemoteJob에 맞춰 두면서 listener를 부른다.
+# 그래서 GUI 창은 엔진이 같은 프로세스에 있는지 daemon에 있는지 모르고 같은 코드로 동작한다.
+# 창을 닫아도 daemon의 다운로드는 계속된다.
+# 작업 추가/취소/설정 같은 요청은 GUI 스레드를 막지 않도록 큐에 넣고 바로 돌아오며, 보내는 스레드 하나가
+# 넣은 순서대로 보낸다. 결과는 /events로, 실패는 message_posted로 알린다.
+REQUEST_TIMEOUT = 10 # 초
+SHUTDOWN_TIMEOUT = 2.0 # 초; 창을 닫을 때 아직 보내지 못한 요청을 이만큼 기다려 준다
+RECONNECT_DELAY = 1.0 # 초; /events 연결이 끊기면 이만큼 기다렸다가 다시 붙는다
+
+
+class DaemonError(Exception):
+    pass
+
+
+class RemoteJob:
+    # daemon 작업의 사본 (DownloadJob에서 GUI가 읽는 속성만)
+    def __init__(self, data):
+        self.id = data['id']
+        self.log = deque(maxlen=LOG_LINES_PER_JOB)
+        self.progress = None
+        self.update(data)
+
+    def update(self, data):
+        self.url = data['url']
+        self.directory = data.get('directory')
+        self.state = data['state']
+        self.attempts = data.get('attempts', 0)
+        self.returncode = data.get('returncode')
+        self.error = data.get('error')
+        self.merge_seconds = data.get('merge_seconds')
+        self.priority = data.get('priority')
+        self.progress = ProgressEvent(**data['progress']) if data.get('progress') else None
+        if data.get('last_error') and data['last_error'] not in self.log:
+            self.log.append(data['last_error'])
+
+    def __repr__(self):
+        return f"RemoteJob(#{self.id}, {self.state}, {self.url!r})"
+
+
+class RemoteEngine:
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token or read_token()
+        self.listeners = []
+        self.jobs = {} # 작업 id -> RemoteJob
+        self.lock = threading.Lock()
+        self.closed = False
+        self.response = None
+        self._settings = self._request('GET', '/settings') # daemon이 없거나 토큰이 틀리면 여기서 DaemonError
+        self.requests = queue.Queue() # (method, path, body, 응답을 받을 함수 또는 None); None이면 멈춘다
+        self.sender = threading.Thread(target=self._send_loop, daemon=True)
+        self.sender.start()
+        self.thread = threading.Thread(target=self._event_loop, daemon=True)
+
+    def add_listener(self, listener):
+        # 붙인 뒤 start()를 불러야 이벤트를 받기 시작한다
+        self.listeners.append(listener)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _headers(self):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        return headers
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=self._headers())
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.load(e).get('error')
+            except ValueError:
+                message = None
+            if e.code == 401:
+                message = f"{message or 'unauthorized'}; pass --token or set {TOKEN_ENV}"
+            raise DaemonError(message or f"HTTP {e.code}")
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"daemon at {self.base_url} is not reachable: {e}")
+
+    def _post(self, path, body=None, done=None):
+        # 보내는 스레드에 맡기고 바로 True. 거절되거나(이미 끝난 작업 취소 등) daemon에 닿지 않으면 메시지로 알린다
+        self.requests.put(('POST', path, body or {}, done))
+        return True
+
+    def _send_loop(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            method, path, body, done = item
+            try:
+                result = self._request(method, path, body)
+            except DaemonError as e:
+                self._notify('message_posted', f"[daemon] {e}")
+                continue
+            if done is not None:
+                done(result)
+
+    def _notify(self, method, *args):
+        for listener in self.listeners:
+            getattr(listener, method)(*args)
+
+    # --- 작업 ---
+
+    def submit(self, urls, directory=None):
+        # 만들어진 작업은 (보내는 스레드에서) job_changed로 알린다
+        body = {'urls': list(urls)}
+        if directory:
+            body['directory'] = directory
+        self._post('/jobs', body, self._submitted)
+
+    def _submitted(self, result):
+        for data in result['jobs']:
+            # /events로 먼저 알게 된 작업이면 이미 알린 것이다
+            job, changed = self._apply(data)
+            if changed:
+                self._notify('job_changed', job)
+
+    def resume_unfinished(self):
+        pass # daemon이 시작할 때 한다
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def all_jobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def counts(self):
+        counts = {}
+        for job in self.all_jobs():
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
+
+    def cancel(self, job_id):
+        return self._post(f"/jobs/{job_id}/cancel")
+
+    def retry(self, job_id):
+        return self._post(f"/jobs/{job_id}/retry")
+
+    def set_priority(self, job_id, priority):
+        return self._post(f"/jobs/{job_id}/priority", {'priority': priority})
+
+    # --- 설정 ---
+
+    def settings(self):
+        return dict(self._settings)
+
+    def backends(self):
+        return self._settings['backends']
+
+    def update_settings(self, values):
+        # 바로 반영해 두고 daemon의 응답으로 다시 맞춘다
+        self._settings = {**self._settings, **values}
+        self._post('/settings', values, self._settings_updated)
+        return self.settings()
+
+    def _settings_updated(self, settings):
+        self._settings = settings
+
+    def set_max_concurrent(self, value):
+        self.update_settings({'max_concurrent': value})
+
+    def set_backend(self, backend):
+        self.update_settings({'backend': backend})
+
+    def set_limit(self, limit):
+        self.update_settings({'limit': limit})
+
+    def set_fragments(self, fragments):
+        self.update_settings({'fragments': fragments})
+
+    # --- /events ---
+
+    def _apply(self, data):
+        # (RemoteJob, 상태가 바뀌었는지)
+        with self.lock:
+            job = self.jobs.get(data['id'])
+            if job is None:
+                job = self.jobs[data['id']] = RemoteJob(data)
+                return job, True
+            previous = job.state
+            job.update(data)
+            return job, job.state != previous
+
+    def _dispatch(self, kind, data):
+        if kind == 'snapshot':
+            self._settings = data['settings']
+            for job_data in data['jobs']:
+                job, changed = self._apply(job_data)
+                if changed:
+                    self._notify('job_changed', job)
+        elif kind == 'job':
+            job, changed = self._apply(data)
+            if changed:
+                self._notify('job_changed', job)
+        elif kind == 'progress':
+            job = self.get(data['id'])
+            if job is not None:
+                job.progress = ProgressEvent(**data['progress'])
+                self._notify('job_progress', job, job.progress)
+        elif kind == 'output':
+            job = self.get(data['id'])
+            if job is not None:
+                job.log.append(data['line'])
+                self._notify('job_output', job, data['line'])
+        elif kind == 'message':
+            self._notify('message_posted', data['text'])
+
+    def _event_loop(self):
+        connected = True
+        while not self.closed:
+            try:
+                request = urllib.request.Request(self.base_url + '/events', headers=self._headers())
+                self.response = urllib.request.urlopen(request)
+                if not connected:
+                    self._notify('message_posted', f"[daemon] Reconnected to {self.base_url}")
+                connected = True
+                kind, data = 'message', []
+                for raw in self.response:
+                    line = raw.decode('utf-8').rstrip('\r\n')
+                    if line.startswith('event:'):
+                        kind = line[6:].strip()
+                    elif line.startswith('data:'):
+                        data.append(line[5:].strip())
+                    elif not line and data:
+                        self._dispatch(kind, json.loads('\n'.join(data)))
+                        kind, data = 'message', []
+            except (OSError, ValueError) as e:
+                if self.closed:
+                    break
+                if connected:
+                    self._notify('message_posted', f"[daemon] Lost connection to {self.base_url}: {e}")
+                connected = False
+            time.sleep(RECONNECT_DELAY)
+
+    def shutdown(self):
+        # 이벤트 스트림만 닫는다. daemon과 그 작업은 그대로 둔다 (이미 누른 취소 등은 잠깐 기다려서 보낸다)
+        self.closed = True
+        self.requests.put(None)
+        self.sender.join(SHUTDOWN_TIMEOUT)
+        response = self.response
+        if response is not None:
+            response.close()
@@ -0,0 +1,346 @@
+import itertools
+import json
+import subprocess
+import sys
+import threading
+from collections import deque
+
+from postprocess import STREAM_TEMPLATE, StreamCollector, split_format
+from progress import PROGRESS_ARGS, parse_line
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+MERGING = 'merging'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+SKIPPED = 'skipped' # 이미 받은 영상 (다운로드 기록에 있음)
+ACTIVE_STATES = (RUNNING, MERGING)
+FINISHED_STATES = (DONE, FAILED, CANCELLED, SKIPPED)
+
+DEFAULT_MAX_CONCURRENT = 3
+FORMAT_SELECTOR = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+MERGE_MARKERS = ('[Merger]', '[VideoConvertor]', '[ExtractAudio]') # 후처리 단계로 넘어갔다는 표시
+LOG_LINES_PER_JOB = 200 # 작업마다 진단용으로 남기는 최근 출력 줄 수
+
+
+class DownloadJob:
+    # URL 하나에 대한 다운로드 작업
+    def __init__(self, job_id, url, directory=None):
+        self.id = job_id
+        self.url = url
+        self.directory = directory # 저장 폴더; None이면 현재 폴더
+        self.weight = 1.0 # 대역폭 가중치 (BandwidthManager)
+        self.defer_merge = False # 참이면 실행기는 스트림을 따로 받고 병합은 job.merge로 넘긴다
+        self.merge = None # 실행기가 남긴 postprocess.MergeTask
+        self.merge_seconds = None
+        self.state = QUEUED
+        self.returncode = None
+        self.error = None
+        self.attempts = 0
+        self.cancel_event = threading.Event()
+        self.process = None # 실행 중인 yt-dlp 프로세스
+        self.progress = None # 마지막 ProgressEvent
+        self.log = deque(maxlen=LOG_LINES_PER_JOB) # 진행 줄을 뺀 최근 출력
+
+    def __repr__(self):
+        return f"DownloadJob(#{self.id}, {self.state}, {self.url!r})"
+
+
+def fetch_info(job, url, path, on_line):
+    # yt-dlp -J로 영상 정보와 포맷 선택 결과만 받아 path에 쓴다 (InfoCache의 fetch)
+    with open(path, 'wb') as out:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'yt_dlp', '-J', '-f', FORMAT_SELECTOR, url],
+            stdout=out,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+        job.process = process
+        if job.cancel_event.is_set():
+            process.terminate()
+        for line in process.stderr:
+            on_line(line.strip())
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(f"metadata extraction failed with error code: {process.returncode}")
+    with open(path, encoding='utf-8') as f:
+        info = json.load(f)
+    return info.get('extractor_key'), info.get('id'), info.get('format_id'), info.get('ext')
+
+
+def run_yt_dlp(job, on_line, on_state, on_progress, info_cache=None, bandwidth=None):
+    # 기본 실행기: 작업마다 yt-dlp 프로세스를 하나 띄운다.
+    # 진행 줄은 ProgressEvent로 바꿔 on_progress로, 나머지 줄은 on_line으로 넘긴다.
+    # info_cache가 있으면 캐시된 영상 정보로 받는다 (functools.partial로 넘긴다).
+    # bandwidth(BandwidthManager)의 몫은 시작할 때 --limit-rate로 정해지고 실행 중에는 바뀌지 않는다
+    paths = ['-P', job.directory] if job.directory else []
+    entry = None
+    if info_cache is not None:
+        entry = info_cache.resolve(job.url, lambda url, path: fetch_info(job, url, path, on_line))
+        on_line(f"[info-cache] Using metadata for {entry.key}")
+        source = ['-f', entry.format_id or FORMAT_SELECTOR, '--load-info-json', entry.path]
+    else:
+        source = ['-f', FORMAT_SELECTOR, job.url]
+    streams = split_format(job, entry)
+    if streams: # 스트림만 받고 병합은 후처리 단계에서
+        source = ['-f', streams, '-o', STREAM_TEMPLATE, '--load-info-json', entry.path]
+        on_progress = collector = StreamCollector(on_progress)
+    limits = []
+    if bandwidth is not None:
+        rate = bandwidth.register(job)
+        limits = ['-N', str(bandwidth.fragments)] + (['--limit-rate', str(rate)] if rate else [])
+        report = on_progress
+
+        def on_progress(event):
+            bandwidth.report(job, event)
+            report(event)
+    try:
+        returncode = _run_download(job, source[:2] + PROGRESS_ARGS + paths + limits + source[2:],
+                                   on_line, on_state, on_progress)
+    finally:
+        if bandwidth is not None:
+            bandwidth.unregister(job)
+        if entry is not None:
+            info_cache.release(entry)
+    if entry is not None and returncode != 0 and not job.cancel_event.is_set():
+        info_cache.invalidate(entry) # 만료된 스트림 주소일 수 있으니 다음에는 새로 받는다
+    if streams and returncode == 0:
+        job.merge = collector.task(entry.ext)
+    return returncode
+
+
+def _run_download(job, args, on_line, on_state, on_progress):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'yt_dlp'] + args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    job.process = process
+    if job.cancel_event.is_set(): # 프로세스가 뜨기 전에 취소된 경우
+        process.terminate()
+    for line in process.stdout:
+        line = line.strip()
+        event = parse_line(line)
+        if event is not None:
+            if event.is_merge:
+                on_state(MERGING)
+            on_progress(event)
+            continue
+        if line.startswith(MERGE_MARKERS):
+            on_state(MERGING)
+        on_line(line)
+    process.wait()
+    return process.returncode
+
+
+class DownloadQueue:
+    # 최대 max_concurrent개의 작업을 동시에 실행하는 큐.
+    # 작업이 끝나면 바로 다음 대기 작업으로 빈자리를 채운다.
+    # listener는 작업 스레드에서 호출된다:
+    #   listener.job_changed(job), listener.job_output(job, line),
+    #   listener.job_progress(job, event)
+    # archive.contains(url)가 참인 URL은 네트워크 요청 없이 SKIPPED로 끝낸다 (Retry로 다시 받을 수 있다).
+    # postprocessor(PostProcessPool)가 있으면 병합은 다운로드 칸 밖에서 한다: 스트림을 다 받은 작업은
+    # MERGING 상태로 넘어가고 그 칸에는 바로 다음 작업이 들어간다.
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, runner=run_yt_dlp, listener=None, archive=None,
+                 postprocessor=None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.runner = runner
+        self.archive = archive
+        self.postprocessor = postprocessor
+        self.listeners = [listener] if listener is not None else []
+        self.jobs = {}
+        self.pending = [] # 대기 중인 작업 id (순서대로)
+        self.running = set()
+        self.merging = set()
+        self.threads = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _notify(self, method, *args):
+        for listener in self.listeners:
+            getattr(listener, method)(*args)
+
+    def add(self, url, directory=None):
+        skip = self.archive is not None and self.archive.contains(url)
+        with self.lock:
+            job = DownloadJob(next(self.ids), url, directory)
+            self.jobs[job.id] = job
+            if skip:
+                job.state = SKIPPED
+            else:
+                self.pending.append(job.id)
+        self._notify('job_changed', job)
+        self._schedule()
+        return job
+
+    def add_many(self, urls):
+        return [self.add(url) for url in urls]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+
+    def all_jobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def set_max_concurrent(self, max_concurrent):
+        # 늘리면 즉시 빈자리를 채우고, 줄이면 실행 중인 작업이 끝나는 대로 맞춰진다
+        with self.lock:
+            self.max_concurrent = max(1, max_concurrent)
+        self._schedule()
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            job.cancel_event.set()
+            if job.state == QUEUED:
+                self.pending.remove(job_id)
+                job.state = CANCELLED
+                queued = True
+            else:
+                queued = False
+                process = job.process
+        if queued:
+            self._notify('job_changed', job)
+        elif process is not None and process.poll() is None:
+            process.terminate() # 작업 스레드가 종료를 확인하고 상태를 바꾼다
+        return True
+
+    def retry(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state not in (FAILED, CANCELLED, SKIPPED):
+                return False
+            job.state = QUEUED
+            job.returncode = None
+            job.error = None
+            job.process = None
+            job.progress = None
+            job.cancel_event = threading.Event()
+            self.pending.append(job_id)
+        self._notify('job_changed', job)
+        self._schedule()
+        return True
+
+    def counts(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.state] = counts.get(job.state, 0) + 1
+            return counts
+
+    def _schedule(self):
+        started = []
+        with self.lock:
+            while not self.closed and self.pending and len(self.running) < self.max_concurrent:
+                job = self.jobs[self.pending.pop(0)]
+                job.state = RUNNING
+                job.attempts += 1
+                job.defer_merge = self.postprocessor is not None
+                job.merge = None
+                job.merge_seconds = None
+                self.running.add(job.id)
+                thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+                self.threads[job.id] = thread
+                started.append((job, thread))
+        for job, thread in started:
+            self._notify('job_changed', job)
+            thread.start()
+
+    def _set_state(self, job, state):
+        with self.lock:
+            if job.state == state or job.state in FINISHED_STATES:
+                return
+            job.state = state
+        self._notify('job_changed', job)
+
+    def _on_line(self, job, line):
+        job.log.append(line)
+        self._notify('job_output', job, line)
+
+    def _on_progress(self, job, event):
+        job.progress = event
+        self._notify('job_progress', job, event)
+
+    def _run_job(self, job):
+        try:
+            returncode = self.runner(job, lambda line: self._on_line(job, line),
+                                     lambda state: self._set_state(job, state),
+                                     lambda event: self._on_progress(job, event))
+            error = None
+        except Exception as e:
+            returncode = 1
+            error = str(e)
+        with self.lock:
+            job.returncode = returncode
+            job.error = error
+            job.process = None
+            handoff = returncode == 0 and job.merge is not None and not job.cancel_event.is_set()
+            if handoff:
+                job.state = MERGING
+                self.merging.add(job.id)
+            elif job.cancel_event.is_set():
+                job.state = CANCELLED
+            elif returncode == 0:
+                job.state = DONE
+            else:
+                job.state = FAILED
+            self.running.discard(job.id)
+            self.threads.pop(job.id, None)
+        self._notify('job_changed', job)
+        if handoff:
+            self.postprocessor.submit(job, job.merge, lambda event: self._on_progress(job, event),
+                                      lambda returncode, error, seconds: self._merge_done(job, returncode, error, seconds))
+        self._schedule() # 빈자리를 바로 채운다
+
+    def _merge_done(self, job, returncode, error, seconds):
+        with self.lock:
+            job.returncode = returncode
+            job.error = error
+            job.process = None
+            job.merge_seconds = seconds
+            if job.cancel_event.is_set():
+                job.state = CANCELLED
+            elif returncode == 0:
+                job.state = DONE
+            else:
+                job.state = FAILED
+            self.merging.discard(job.id)
+        if returncode == 0:
+            self._on_line(job, f"[merge] Merged into \"{job.merge.output}\" in {seconds:.2f}s")
+        self._notify('job_changed', job)
+
+    def shutdown(self, wait=True):
+        # 대기 작업은 취소하고 실행 중인 프로세스는 종료한다
+        with self.lock:
+            self.closed = True
+            job_ids = list(self.pending) + list(self.running) + list(self.merging)
+        for job_id in job_ids:
+            self.cancel(job_id)
+        if wait:
+            with self.lock:
+                threads = list(self.threads.values())
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,207 @@
+import functools
+import os
+import threading
+
+from bandwidth import BandwidthManager, PRIORITY_WEIGHTS
+from download_queue import DownloadQueue, DEFAULT_MAX_CONCURRENT, run_yt_dlp
+from info_cache import InfoCache
+from job_journal import JOURNAL_PATH, JobJournal
+from playlist import PlaylistIngestor, is_collection
+from postprocess import PostProcessPool, ffmpeg_available
+from progress import format_bytes
+from ydl_pool import WorkerPool, pool_available
+
+# GUI 창(app.py)과 daemon(daemon.py)이 같이 쓰는 다운로드 엔진.
+# 영상 정보 캐시, 대역폭 관리, 작업 프로세스 풀, 작업 기록, 병합 풀, 큐를 한 번에 만들고 정리한다.
+# listener는 큐 listener(job_changed, job_output, job_progress)에 더해
+# message_posted(text)를 받는다: 작업에 속하지 않는 로그 (재생목록 읽기, 이어 받기 등). 모두 작업 스레드에서 불린다.
+BACKEND_POOL = 'Worker pool' # yt_dlp를 미리 import해 둔 작업 프로세스 재사용
+BACKEND_SUBPROCESS = 'Subprocess' # 작업마다 python -m yt_dlp 실행 (예전 방식)
+
+
+def event_dict(event):
+    # ProgressEvent -> JSON으로 보낼 수 있는 dict (ProgressEvent(**d)로 되돌릴 수 있다)
+    return None if event is None else dict(vars(event))
+
+
+def priority_name(weight):
+    for name, value in PRIORITY_WEIGHTS.items():
+        if value == weight:
+            return name
+    return None
+
+
+def job_dict(job):
+    return {
+        'id': job.id,
+        'url': job.url,
+        'directory': job.directory,
+        'state': job.state,
+        'attempts': job.attempts,
+        'returncode': job.returncode,
+        'error': job.error,
+        'merge_seconds': job.merge_seconds,
+        'priority': priority_name(job.weight),
+        'progress': event_dict(job.progress),
+        'last_error': next((line for line in reversed(job.log) if line.startswith('ERROR')), None),
+    }
+
+
+class DownloadEngine:
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, journal_path=JOURNAL_PATH, directory=None):
+        self.directory = directory # 저장 폴더를 따로 주지 않은 작업의 폴더; None이면 현재 폴더
+        self.listeners = []
+        # yt_dlp를 import할 수 있으면 작업 프로세스 풀을 기본으로 쓰고, 아니면 subprocess 방식으로 돌아간다
+        # 영상 정보 캐시는 두 실행 방식이 같이 쓴다 (재시도, 같은 영상 여러 번 넣기)
+        self.info_cache = InfoCache()
+        # 전체 대역폭 한도와 작업별 우선순위 (작업 프로세스 풀에서는 실행 중에도 바로 적용된다)
+        self.bandwidth = BandwidthManager()
+        self.run_subprocess = functools.partial(run_yt_dlp, info_cache=self.info_cache, bandwidth=self.bandwidth)
+        self.pool = WorkerPool(info_cache=self.info_cache, bandwidth=self.bandwidth) if pool_available() else None
+        self.backend = BACKEND_POOL if self.pool else BACKEND_SUBPROCESS
+        # 작업 기록: 이미 받은 영상은 건너뛰고, 지난번에 끝나지 않은 작업은 이어 받는다
+        self.journal = JobJournal(journal_path)
+        # 영상/음성 병합은 다운로드 칸과 따로 돌린다 (ffmpeg가 없으면 yt-dlp가 작업 안에서 처리)
+        self.postprocessor = PostProcessPool() if ffmpeg_available() else None
+        self.queue = DownloadQueue(max_concurrent, runner=self.pool.run if self.pool else self.run_subprocess,
+                                   archive=self.journal, postprocessor=self.postprocessor)
+        self.queue.add_listener(self.journal)
+        if self.pool:
+            self.pool.prewarm(max_concurrent)
+        self.ingestors = set() # 항목을 읽고 있는 재생목록/채널 (다 읽으면 빠진다)
+        self.ingestors_lock = threading.Lock()
+
+    def add_listener(self, listener):
+        # 작업을 넣기 전에 붙인다
+        self.listeners.append(listener)
+        self.queue.add_listener(listener)
+
+    def post_message(self, text):
+        for listener in self.listeners:
+            listener.message_posted(text)
+
+    # --- 작업 ---
+
+    def submit(self, urls, directory=None):
+        # URL을 모두 큐에 넣고 새로 만든 작업을 돌려준다.
+        # 재생목록/채널은 항목이 나오는 대로 큐에 넣으므로 돌려주는 목록에는 없다
+        directory = directory or self.directory
+        jobs = []
+        for url in urls:
+            if is_collection(url):
+                self.post_message(f"[playlist] Listing {url}")
+                ingestor = PlaylistIngestor(self.queue, url, directory,
+                                            on_line=lambda line: self.post_message(f"[playlist] {line}"),
+                                            on_done=self._ingestion_done)
+                with self.ingestors_lock: # 시작하자마자 끝나도 _ingestion_done에서 빠지도록 먼저 넣는다
+                    self.ingestors.add(ingestor)
+                ingestor.start()
+            else:
+                jobs.append(self.queue.add(url, directory))
+        return jobs
+
+    def _ingestion_done(self, ingestor):
+        # 재생목록 스레드에서 불린다
+        with self.ingestors_lock:
+            self.ingestors.discard(ingestor)
+        self.post_message(f"[playlist] {ingestor.url}: queued {ingestor.added} videos, "
+                          f"skipped {ingestor.skipped} already downloaded")
+
+    def resume_unfinished(self):
+        for url, directory, part_path, part_bytes in self.journal.unfinished():
+            if part_path and os.path.exists(part_path):
+                detail = f" from {format_bytes(os.path.getsize(part_path))}"
+            else:
+                detail = ''
+            job = self.queue.add(url, directory)
+            self.post_message(f"[#{job.id}] Resuming unfinished download{detail}")
+
+    def get(self, job_id):
+        return self.queue.get(job_id)
+
+    def all_jobs(self):
+        return self.queue.all_jobs()
+
+    def counts(self):
+        return self.queue.counts()
+
+    def cancel(self, job_id):
+        return self.queue.cancel(job_id)
+
+    def retry(self, job_id):
+        return self.queue.retry(job_id)
+
+    def set_priority(self, job_id, priority):
+        # 새로 넣는 작업은 Normal
+        job = self.queue.get(job_id)
+        if job is None or priority not in PRIORITY_WEIGHTS:
+            return False
+        self.bandwidth.set_weight(job, PRIORITY_WEIGHTS[priority])
+        return True
+
+    # --- 설정 ---
+
+    def backends(self):
+        return [BACKEND_POOL, BACKEND_SUBPROCESS] if self.pool else [BACKEND_SUBPROCESS]
+
+    def set_max_concurrent(self, value):
+        self.queue.set_max_concurrent(value)
+        if self.pool and self.backend == BACKEND_POOL:
+            self.pool.prewarm(value)
+
+    def set_backend(self, backend):
+        # 새로 시작하는 작업부터 적용된다
+        if backend == BACKEND_POOL and self.pool:
+            self.backend = BACKEND_POOL
+            self.queue.runner = self.pool.run
+            self.pool.prewarm(self.queue.max_concurrent)
+        else:
+            self.backend = BACKEND_SUBPROCESS
+            self.queue.runner = self.run_subprocess
+
+    def set_limit(self, limit):
+        # bytes/s, None 또는 0이면 제한 없음
+        self.bandwidth.set_limit(limit)
+
+    def set_fragments(self, fragments):
+        self.bandwidth.set_fragments(fragments)
+
+    def settings(self):
+        return {
+            'max_concurrent': self.queue.max_concurrent,
+            'backend': self.backend,
+            'backends': self.backends(),
+            'limit': self.bandwidth.limit,
+            'fragments': self.bandwidth.fragments,
+            'priorities': list(PRIORITY_WEIGHTS),
+        }
+
+    def update_settings(self, values):
+        # settings()와 같은 키의 dict에서 들어 있는 값만 바꾼다
+        if 'max_concurrent' in values:
+            self.set_max_concurrent(int(values['max_concurrent']))
+        if 'backend' in values:
+            self.set_backend(values['backend'])
+        if 'limit' in values:
+            self.set_limit(int(values['limit']) if values['limit'] else None)
+        if 'fragments' in values:
+            self.set_fragments(int(values['fragments']))
+        return self.settings()
+
+    def shutdown(self):
+        # 실행 중인 yt-dlp 프로세스를 정리한다.
+        # 기록에는 취소로 남기지 않아서 다음 실행 때 .part 파일부터 이어 받는다
+        with self.ingestors_lock:
+            ingestors = list(self.ingestors)
+        for ingestor in ingestors:
+            ingestor.stop()
+        self.queue.remove_listener(self.journal)
+        self.queue.shutdown()
+        if self.postprocessor:
+            self.postprocessor.shutdown()
+        if self.pool:
+            self.pool.shutdown()
+        self.info_cache.close()
+        self.bandwidth.close()
+        self.journal.close()
+
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from job_journal import archive_key, resolved_key
+
+# 영상 정보(info dict)와 고른 포맷 id 캐시.
+# 재시도나 같은 영상을 여러 번 넣을 때 메타데이터 추출과 포맷 선택을 다시 하지 않도록
+# 한 번 받은 info를 JSON 파일로 두고 yt-dlp의 --load-info-json(작업 프로세스는 download_with_info_file)으로 쓴다.
+# 키는 'youtube <id>' 같은 영상 id이고, 같은 키를 동시에 요청하면 한 번만 받아 온다 (single-flight).
+DEFAULT_TTL = 30 * 60 # 초; YouTube 스트림 주소는 몇 시간 뒤 만료되므로 그보다 짧게 둔다
+DEFAULT_MAX_ENTRIES = 100
+
+
+class CacheEntry:
+    def __init__(self, key, path, format_id, ext, expires):
+        self.key = key
+        self.path = path # info JSON 파일
+        self.format_id = format_id # 포맷 선택 결과 (예: '137+140'); 모르면 None
+        self.ext = ext # 결과 파일 확장자 (병합할 때의 컨테이너)
+        self.expires = expires
+        self.urls = set()
+        self.users = 0 # 이 파일을 쓰는 중인 작업 수; 쓰는 중에는 지우지 않는다
+        self.stale = False
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+
+
+class InfoCache:
+    # resolve(url, fetch): 캐시에 있으면 바로, 없으면 fetch(url, path)로 받아 온다.
+    # fetch는 path에 info JSON을 쓰고 (extractor_key, video_id, format_id, ext)를 돌려준다.
+    # 돌려받은 entry는 다 쓰고 나서 release(entry)로 돌려준다.
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, directory=None):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.directory = directory or tempfile.mkdtemp(prefix='ytdl-info-')
+        os.makedirs(self.directory, exist_ok=True)
+        self.entries = OrderedDict() # key -> CacheEntry (오래 안 쓴 것부터)
+        self.aliases = {} # URL -> key; 네트워크 없이 id를 알 수 없는 URL용
+        self.inflight = {} # 키 또는 URL -> _Flight
+        self.files = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _name(self, url):
+        return archive_key(url) or self.aliases.get(url) or url
+
+    def _lookup(self, url):
+        entry = self.entries.get(self._name(url))
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._remove(entry)
+            return None
+        self.entries.move_to_end(entry.key)
+        return entry
+
+    def get(self, url):
+        # 캐시에 있을 때만 entry를 돌려준다 (받아 오지 않음)
+        with self.lock:
+            entry = self._lookup(url)
+            if entry is not None:
+                entry.users += 1
+            return entry
+
+    def resolve(self, url, fetch):
+        while True:
+            with self.lock:
+                entry = self._lookup(url)
+                if entry is not None:
+                    entry.users += 1
+                    self.hits += 1
+                    return entry
+                name = self._name(url)
+                flight = self.inflight.get(name)
+                leader = flight is None
+                if leader:
+                    flight = self.inflight[name] = _Flight()
+                    self.misses += 1
+                    self.files += 1
+                    path = os.path.join(self.directory, f"info-{self.files}.json")
+            if not leader:
+                flight.done.wait()
+                if flight.entry is not None:
+                    with self.lock:
+                        if not flight.entry.stale:
+                            flight.entry.users += 1
+                            self.hits += 1
+                            return flight.entry
+                # 먼저 받던 작업이 실패했거나 취소됐으면 직접 받아 본다
+                continue
+            try:
+                extractor, video_id, format_id, ext = fetch(url, path)
+                with self.lock:
+                    entry = self._store(url, resolved_key(extractor, video_id) or name, path, format_id, ext)
+                flight.entry = entry
+                return entry
+            except BaseException:
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+            finally:
+                with self.lock:
+                    self.inflight.pop(name, None)
+                flight.done.set()
+
+    def _store(self, url, key, path, format_id, ext):
+        old = self.entries.get(key)
+        if old is not None:
+            self._remove(old)
+        entry = CacheEntry(key, path, format_id, ext, time.monotonic() + self.ttl)
+        entry.users = 1 # 받아 온 작업이 바로 쓴다; 방금 넣은 것이 먼저 밀려나지 않게 한다
+        entry.urls.add(url)
+        self.entries[key] = entry
+        if archive_key(url) != key:
+            self.aliases[url] = key
+        self._evict()
+        return entry
+
+    def _evict(self):
+        # 크기 제한: 만료된 것부터, 그다음 오래 안 쓴 것부터 지운다 (사용 중인 것은 남긴다)
+        now = time.monotonic()
+        for entry in [entry for entry in self.entries.values() if entry.expires <= now and entry.users == 0]:
+            self._remove(entry)
+        for entry in list(self.entries.values()):
+            if len(self.entries) <= self.max_entries:
+                break
+            if entry.users == 0:
+                self._remove(entry)
+
+    def _remove(self, entry):
+        if self.entries.get(entry.key) is entry:
+            del self.entries[entry.key]
+        for url in entry.urls:
+            if self.aliases.get(url) == entry.key:
+                del self.aliases[url]
+        entry.stale = True
+        if entry.users == 0 and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def release(self, entry):
+        with self.lock:
+            entry.users -= 1
+            if entry.stale and entry.users == 0 and os.path.exists(entry.path):
+                os.remove(entry.path)
+            elif len(self.entries) > self.max_entries: # 사용 중이라 남겨 두었던 만큼 줄인다
+                self._evict()
+
+    def invalidate(self, entry):
+        # 캐시된 info로 받기에 실패했을 때 (예: 스트림 주소 만료) 다음 시도는 새로 받는다
+        with self.lock:
+            self._remove(entry)
+
+    def set_ttl(self, ttl):
+        with self.lock:
+            self.ttl = ttl
+
+    def close(self):
+        with self.lock:
+            self.entries.clear()
+            self.aliases.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
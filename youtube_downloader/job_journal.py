@@ -0,0 +1,157 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from download_queue import ACTIVE_STATES, DONE, QUEUED, SKIPPED
+from progress import PHASE_POSTPROCESSING
+
+# 다운로드 작업 기록 (SQLite, WAL 모드).
+# 큐 listener로 붙어서 작업마다 URL, 확인된 영상 id, 저장 폴더, .part 파일 상태를 남긴다.
+# 프로그램이 중간에 꺼져도 다음 실행 때 끝나지 않은 작업을 다시 큐에 넣으면
+# yt-dlp가 같은 이름의 .part 파일에서 이어 받는다.
+# 끝난 영상은 archive 표에 남겨서 같은 영상을 다시 넣으면 네트워크 요청 없이 건너뛴다.
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads.db')
+WRITE_INTERVAL = 1.0 # 초; 진행 상황(.part 크기)은 작업마다 이 간격으로만 기록한다
+
+# URL만 보고 알 수 있는 YouTube 영상 id. 키 형식은 yt-dlp의 --download-archive와 같다 ('youtube <id>')
+YOUTUBE_ID = re.compile(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/|v/)|youtu\.be/)([0-9A-Za-z_-]{11})')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    archive_key TEXT,
+    directory TEXT NOT NULL,
+    state TEXT NOT NULL,
+    part_path TEXT,
+    part_bytes INTEGER,
+    output_path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS archive (
+    archive_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    output_path TEXT,
+    completed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archive_url ON archive (url);
+"""
+
+
+def archive_key(url):
+    # 네트워크 없이 URL에서 바로 알 수 있는 경우에만 키를 돌려준다
+    match = YOUTUBE_ID.search(url)
+    return f"youtube {match.group(1)}" if match else None
+
+
+def resolved_key(extractor, video_id):
+    if extractor and video_id:
+        return f"{extractor.lower()} {video_id}"
+    return None
+
+
+class JobJournal:
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        # 큐의 작업 스레드에서 호출되므로 연결 하나를 lock으로 보호해서 같이 쓴다
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL') # WAL에서는 전원이 꺼져도 DB가 깨지지 않는다
+        self.db.executescript(SCHEMA)
+        self.live = {} # 작업 id -> 실행 중에 알게 된 정보 (키, .part 파일, 결과 파일)
+
+    # --- 큐 listener ---
+
+    def job_changed(self, job):
+        state = job.state
+        if state == SKIPPED: # 기록에 있는 URL이라 건드리지 않는다
+            return
+        now = time.time()
+        info = self.live.setdefault(job.id, {'written': 0.0})
+        directory = os.path.abspath(job.directory or os.getcwd())
+        with self.lock:
+            if state == QUEUED:
+                self.db.execute(
+                    'INSERT INTO jobs (url, archive_key, directory, state, attempts, created, updated) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (url) DO UPDATE SET directory = excluded.directory, state = excluded.state, '
+                    'error = NULL, updated = excluded.updated',
+                    (job.url, archive_key(job.url), directory, state, job.attempts, now, now))
+            elif state == DONE:
+                key = info.get('key') or archive_key(job.url) or job.url
+                output = self._absolute(info.get('output'), directory)
+                self.db.execute('BEGIN')
+                self.db.execute(
+                    'UPDATE jobs SET state = ?, archive_key = ?, output_path = ?, part_path = NULL, part_bytes = NULL, '
+                    'attempts = ?, error = NULL, updated = ? WHERE url = ?',
+                    (state, key, output, job.attempts, now, job.url))
+                self.db.execute('INSERT OR REPLACE INTO archive (archive_key, url, output_path, completed) VALUES (?, ?, ?, ?)',
+                                (key, job.url, output, now))
+                self.db.execute('COMMIT')
+            else:
+                self.db.execute('UPDATE jobs SET state = ?, attempts = ?, error = ?, updated = ? WHERE url = ?',
+                                (state, job.attempts, job.error, now, job.url))
+        if state not in ACTIVE_STATES and state != QUEUED:
+            self.live.pop(job.id, None)
+
+    def job_output(self, job, line):
+        pass
+
+    def job_progress(self, job, event):
+        info = self.live.setdefault(job.id, {'written': 0.0})
+        key = resolved_key(event.extractor, event.video_id)
+        changed = False
+        if key and key != info.get('key'):
+            info['key'] = key
+            changed = True
+        if event.filename:
+            if event.phase == PHASE_POSTPROCESSING:
+                info['output'] = event.filename
+            elif event.filename != info.get('part'):
+                info['part'] = event.filename
+                changed = True
+        if event.downloaded_bytes is not None:
+            info['bytes'] = int(event.downloaded_bytes)
+        now = time.monotonic()
+        if not changed and now - info['written'] < WRITE_INTERVAL:
+            return
+        info['written'] = now
+        directory = os.path.abspath(job.directory or os.getcwd())
+        with self.lock:
+            self.db.execute(
+                'UPDATE jobs SET archive_key = COALESCE(?, archive_key), part_path = ?, part_bytes = ?, updated = ? '
+                'WHERE url = ?',
+                (info.get('key'), self._absolute(info.get('part'), directory), info.get('bytes'), time.time(), job.url))
+
+    @staticmethod
+    def _absolute(path, directory):
+        if path is None:
+            return None
+        return path if os.path.isabs(path) else os.path.join(directory, path)
+
+    # --- 조회 ---
+
+    def contains(self, url, key=None):
+        # 이미 받은 영상인지: 키(재생목록 항목처럼 미리 알고 있으면)나 URL에서 알 수 있는 id, URL 자체로 찾는다.
+        # 네트워크 요청은 하지 않는다
+        key = key or archive_key(url)
+        with self.lock:
+            row = self.db.execute('SELECT 1 FROM archive WHERE archive_key = ? OR url = ? LIMIT 1', (key, url)).fetchone()
+        return row is not None
+
+    def unfinished(self):
+        # 지난 실행에서 끝나지 않은 작업: [(url, directory, part_path, part_bytes), ...] (넣은 순서대로)
+        states = (QUEUED,) + ACTIVE_STATES
+        with self.lock:
+            return self.db.execute(
+                f"SELECT url, directory, part_path, part_bytes FROM jobs WHERE state IN ({', '.join('?' * len(states))}) "
+                'ORDER BY created', states).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
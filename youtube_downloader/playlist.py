@@ -0,0 +1,108 @@
+from collections import OrderedDict
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from job_journal import archive_key, resolved_key
+
+# 재생목록/채널 URL을 항목이 나오는 대로 큐에 넣는다.
+# yt-dlp --flat-playlist --lazy-playlist는 항목을 페이지 단위로 받아 오면서 바로 한 줄씩 출력하므로
+# 첫 영상은 목록 전체를 다 받기 전에 시작된다. 큐에 대기 중인 작업이 MAX_PENDING_AHEAD개를 넘으면
+# 출력을 읽지 않고 기다려서 (yt-dlp도 파이프가 차면 멈춘다) 아무리 긴 채널이라도 메모리는 일정하다.
+COLLECTION_URL = re.compile(r'youtube\.com/(?:playlist\?|@[^/?#]+|channel/|c/|user/)')
+ENTRY_TEMPLATE = '%(ie_key)s\t%(id)s\t%(url)s'
+MAX_PENDING_AHEAD = 50
+# 같은 목록에 두 번 나오는 영상을 거르려고 기억해 두는 최근 항목 수. 대기 작업이 MAX_PENDING_AHEAD개를 넘지
+# 않으므로 이보다 앞에 나온 항목은 이미 받았거나 받는 중이고, 받은 것은 다운로드 기록(archive)이 거른다
+SEEN_WINDOW = 10000
+ROOM_POLL_INTERVAL = 0.2 # 초
+
+
+def is_collection(url):
+    # 영상 하나가 아니라 재생목록이나 채널 주소인지 (watch?v=...&list=...는 영상 하나로 본다)
+    return archive_key(url) is None and COLLECTION_URL.search(url) is not None
+
+
+def _value(text):
+    return None if text in ('NA', 'None', '') else text
+
+
+def iter_entries(url, on_line=None):
+    # (archive 키 또는 None, 항목 URL)을 하나씩 내놓는 generator. 중간에 닫으면 yt-dlp도 멈춘다
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'yt_dlp', '--flat-playlist', '--lazy-playlist', '--print', ENTRY_TEMPLATE, url],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    try:
+        for line in process.stdout:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) == 3 and _value(fields[2]):
+                ie_key, video_id, entry_url = map(_value, fields)
+                yield resolved_key(ie_key, video_id) or archive_key(entry_url), entry_url
+            elif on_line is not None and line.strip():
+                on_line(line.strip())
+        process.wait()
+        if process.returncode != 0 and on_line is not None:
+            on_line(f"ERROR: listing {url} failed with error code: {process.returncode}")
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+
+
+class PlaylistIngestor:
+    # 재생목록 하나를 읽어 큐에 넣는 스레드.
+    # 다운로드 기록(queue.archive)에 있는 항목은 작업을 만들지 않고 건너뛴다.
+    # on_line(text)와 on_done(ingestor)는 이 스레드에서 불린다.
+    def __init__(self, queue, url, directory=None, on_line=None, on_done=None, max_pending=MAX_PENDING_AHEAD):
+        self.queue = queue
+        self.url = url
+        self.directory = directory
+        self.on_line = on_line
+        self.on_done = on_done
+        self.max_pending = max_pending
+        self.added = 0
+        self.skipped = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _wait_for_room(self):
+        while self.queue.pending_count() >= self.max_pending and not self.stop_event.is_set():
+            time.sleep(ROOM_POLL_INTERVAL)
+
+    def _run(self):
+        seen = OrderedDict() # 최근 SEEN_WINDOW개 항목 (메모리가 목록 길이에 따라 늘지 않게)
+        entries = iter_entries(self.url, self.on_line)
+        try:
+            for key, entry_url in entries:
+                if (key or entry_url) in seen:
+                    continue
+                seen[key or entry_url] = None
+                if len(seen) > SEEN_WINDOW:
+                    seen.popitem(last=False)
+                archive = self.queue.archive
+                if archive is not None and archive.contains(entry_url, key):
+                    self.skipped += 1
+                    continue
+                self._wait_for_room()
+                if self.stop_event.is_set():
+                    break
+                self.queue.add(entry_url, self.directory)
+                self.added += 1
+        finally:
+            entries.close()
+            if self.on_done is not None:
+                self.on_done(self)
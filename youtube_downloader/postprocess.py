@@ -0,0 +1,103 @@
+import os
+import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from progress import PHASE_POSTPROCESSING, ProgressEvent
+
+# 영상/음성 스트림 병합을 다운로드와 떼어 낸 후처리 단계.
+# 병합이 필요한 포맷('137+140')은 스트림별로 따로 받고 ('137,140'), 다운로드 칸은 바로 다음 URL로 넘어간다.
+# 받은 스트림은 PostProcessPool이 제한된 수의 ffmpeg 프로세스로 합친다.
+STREAM_TEMPLATE = '%(title)s [%(id)s].f%(format_id)s.%(ext)s' # yt-dlp가 병합 전 스트림에 붙이는 이름과 같은 꼴
+STREAM_SUFFIX = re.compile(r'\.f[^.]+\.[^.]+$')
+DEFAULT_MERGE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+def ffmpeg_available():
+    return shutil.which('ffmpeg') is not None
+
+
+def split_format(job, entry):
+    # 병합을 후처리 단계로 넘길 수 있으면 스트림별로 받을 포맷 ('137,140'), 아니면 None
+    if not job.defer_merge or entry is None or not entry.format_id or '+' not in entry.format_id:
+        return None
+    return entry.format_id.replace('+', ',') if ffmpeg_available() else None
+
+
+class MergeTask:
+    def __init__(self, streams, output):
+        self.streams = streams # 받은 스트림 파일 (영상이 먼저)
+        self.output = output
+
+
+class StreamCollector:
+    # on_progress를 감싸서 스트림별로 받은 최종 파일 이름을 모은다 (MoveFiles 후처리 이벤트)
+    def __init__(self, on_progress):
+        self.on_progress = on_progress
+        self.files = []
+
+    def __call__(self, event):
+        if event.phase == PHASE_POSTPROCESSING and event.postprocessor == 'MoveFiles' and event.filename:
+            if event.filename not in self.files:
+                self.files.append(event.filename)
+        self.on_progress(event)
+
+    def task(self, ext):
+        if len(self.files) < 2:
+            return None
+        base = STREAM_SUFFIX.sub('', self.files[0])
+        return MergeTask(list(self.files), f"{base}.{ext or 'mp4'}")
+
+
+def merge_streams(job, task):
+    # ffmpeg로 스트림을 다시 인코딩하지 않고 합친다. 끝나면 스트림 파일은 지운다
+    if job.cancel_event.is_set():
+        return 1, 'cancelled'
+    root, ext = os.path.splitext(task.output)
+    temp = f"{root}.temp{ext}"
+    args = ['ffmpeg', '-y', '-nostdin', '-loglevel', 'error']
+    for stream in task.streams:
+        args += ['-i', stream]
+    for index in range(len(task.streams)):
+        args += ['-map', str(index)]
+    args += ['-c', 'copy', temp]
+    process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               universal_newlines=True, encoding='utf-8', errors='replace')
+    job.process = process
+    if job.cancel_event.is_set():
+        process.terminate()
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        if os.path.exists(temp):
+            os.remove(temp)
+        return process.returncode, stderr.strip().splitlines()[-1] if stderr.strip() else None
+    os.replace(temp, task.output)
+    for stream in task.streams:
+        if os.path.exists(stream):
+            os.remove(stream)
+    return 0, None
+
+
+class PostProcessPool:
+    # 병합 작업을 최대 max_workers개까지 동시에 돌린다.
+    # on_done(returncode, error, seconds)은 병합 스레드에서 불린다 (seconds는 대기 시간을 뺀 병합 시간)
+    def __init__(self, max_workers=DEFAULT_MERGE_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='merge')
+
+    def submit(self, job, task, on_progress, on_done):
+        self.executor.submit(self._run, job, task, on_progress, on_done)
+
+    def _run(self, job, task, on_progress, on_done):
+        on_progress(ProgressEvent(PHASE_POSTPROCESSING, postprocessor='Merger', filename=task.output))
+        start = time.perf_counter()
+        try:
+            returncode, error = merge_streams(job, task)
+        except Exception as e:
+            returncode, error = 1, str(e)
+        on_done(returncode, error, time.perf_counter() - start)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,138 @@
+import re
+
+# yt-dlp가 진행 상황을 기계가 읽기 쉬운 한 줄로 출력하도록 하는 옵션
+PROGRESS_PREFIX = '__progress__'
+POSTPROCESS_PREFIX = '__postprocess__'
+PROGRESS_DELTA = 0.1 # 초; yt-dlp가 이보다 자주 진행 줄을 쓰지 않는다
+PROGRESS_ARGS = [
+    '--newline',
+    '--progress-delta', str(PROGRESS_DELTA),
+    '--progress-template', 'download:' + PROGRESS_PREFIX + ' %(progress.status)s %(progress.downloaded_bytes)s '
+                           '%(progress.total_bytes)s %(progress.total_bytes_estimate)s %(progress.speed)s %(progress.eta)s '
+                           '%(info.extractor_key)s %(info.id)s %(progress.tmpfilename)s',
+    '--progress-template', 'postprocess:' + POSTPROCESS_PREFIX + ' %(progress.status)s %(progress.postprocessor)s %(info.filepath)s',
+]
+
+# 진행 단계
+PHASE_DOWNLOADING = 'downloading'
+PHASE_DOWNLOADED = 'downloaded' # 한 스트림(영상 또는 음성) 받기 완료
+PHASE_POSTPROCESSING = 'postprocessing'
+MERGE_POSTPROCESSORS = ('Merger', 'FFmpegMerger')
+
+# 템플릿을 쓰지 않은 기본 출력 형식: "[download]  45.3% of ~ 10.00MiB at 2.00MiB/s ETA 00:05"
+LEGACY_PROGRESS = re.compile(
+    r'^\[download\]\s+(?P<percent>[\d.]+)%\s+of\s+~?\s*(?P<total>[\d.]+\s*[KMGT]?i?B)'
+    r'(?:\s+at\s+(?P<speed>[\d.]+\s*[KMGT]?i?B)/s)?(?:\s+ETA\s+(?P<eta>[\d:]+))?')
+UNITS = {'B': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'TiB': 1024 ** 4,
+         'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3, 'TB': 1000 ** 4}
+
+
+class ProgressEvent:
+    # 진행 상황 한 건; 모르는 값은 None
+    def __init__(self, phase, downloaded_bytes=None, total_bytes=None, speed=None, eta=None, postprocessor=None, percent=None,
+                 extractor=None, video_id=None, filename=None):
+        self.phase = phase
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed # bytes/s
+        self.eta = eta # 초
+        self.postprocessor = postprocessor
+        self.extractor = extractor # yt-dlp extractor key (예: 'Youtube')
+        self.video_id = video_id
+        self.filename = filename # 받는 중에는 .part 파일, 후처리 중에는 결과 파일
+        if percent is None and downloaded_bytes is not None and total_bytes:
+            percent = min(100.0, 100.0 * downloaded_bytes / total_bytes)
+        self.percent = percent
+
+    @property
+    def is_merge(self):
+        return self.phase == PHASE_POSTPROCESSING and self.postprocessor in MERGE_POSTPROCESSORS
+
+    def __repr__(self):
+        return (f"ProgressEvent({self.phase}, {self.percent}%, {self.downloaded_bytes}/{self.total_bytes} B, "
+                f"{self.speed} B/s, eta {self.eta})")
+
+
+def _number(text):
+    if text in ('NA', 'None', ''):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _size(text):
+    match = re.match(r'([\d.]+)\s*([KMGT]?i?B)', text or '')
+    if not match:
+        return None
+    return float(match.group(1)) * UNITS.get(match.group(2), 1)
+
+
+def _clock(text):
+    if not text:
+        return None
+    seconds = 0
+    for part in text.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _text(text):
+    return None if text in (None, 'NA', 'None', '') else text
+
+
+def parse_line(line):
+    # 진행 줄이면 ProgressEvent, 아니면 None.
+    # 파일 이름에는 공백이 있을 수 있어서 항상 마지막 필드로 둔다
+    if line.startswith(PROGRESS_PREFIX):
+        fields = line[len(PROGRESS_PREFIX):].split(None, 8)
+        if len(fields) < 6:
+            return None
+        status, downloaded, total, estimate, speed, eta = fields[:6]
+        extractor, video_id, filename = (fields[6:] + [None, None, None])[:3]
+        total_bytes = _number(total) or _number(estimate)
+        phase = PHASE_DOWNLOADED if status == 'finished' else PHASE_DOWNLOADING
+        return ProgressEvent(phase, _number(downloaded), total_bytes, _number(speed), _number(eta),
+                             extractor=_text(extractor), video_id=_text(video_id), filename=_text(filename))
+    if line.startswith(POSTPROCESS_PREFIX):
+        fields = line[len(POSTPROCESS_PREFIX):].split(None, 2)
+        return ProgressEvent(PHASE_POSTPROCESSING, postprocessor=fields[1] if len(fields) > 1 else None,
+                             filename=_text(fields[2]) if len(fields) > 2 else None)
+    match = LEGACY_PROGRESS.match(line)
+    if match:
+        percent = float(match.group('percent'))
+        total_bytes = _size(match.group('total'))
+        downloaded = total_bytes * percent / 100 if total_bytes else None
+        return ProgressEvent(PHASE_DOWNLOADING, downloaded, total_bytes, _size(match.group('speed')),
+                             _clock(match.group('eta')), percent=percent)
+    return None
+
+
+def format_bytes(value):
+    if value is None:
+        return '?'
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if value < 1024:
+            return f"{value:.1f} {unit}" if unit != 'B' else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return '?'
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}" if seconds < 3600 else f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def describe(event):
+    # 표에 보여줄 짧은 설명
+    if event.phase == PHASE_POSTPROCESSING:
+        return f"{event.postprocessor or 'post-processing'}..."
+    parts = [f"{format_bytes(event.downloaded_bytes)} / {format_bytes(event.total_bytes)}"]
+    if event.speed:
+        parts.append(f"{format_bytes(event.speed)}/s")
+    if event.phase == PHASE_DOWNLOADING and event.eta is not None:
+        parts.append(f"ETA {format_eta(event.eta)}")
+    return ' · '.join(parts)
@@ -0,0 +1,421 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from bandwidth import BLOCK_SIZE, TokenBucket
+from download_queue import FORMAT_SELECTOR, MERGING
+from postprocess import STREAM_TEMPLATE, StreamCollector, split_format
+from progress import PHASE_DOWNLOADED, PHASE_DOWNLOADING, PHASE_POSTPROCESSING, PROGRESS_DELTA, ProgressEvent
+
+# yt_dlp를 미리 import해 둔 작업 프로세스들. 작업마다 인터프리터를 새로 띄우는 대신
+# 대기 중인 프로세스에 URL을 보내고, 진행 상황은 progress hook에서 구조화된 메시지로 받는다.
+# 작업 프로세스는 이 파일을 스크립트로 실행하고 (python ydl_pool.py --worker HOST PORT)
+# 부모의 Listener에 접속한다. multiprocessing의 spawn처럼 메인 모듈(PyQt GUI)을
+# 다시 import하지 않는다.
+AUTHKEY_ENV = 'YDL_POOL_AUTHKEY'
+SPAWN_TIMEOUT = 30 # 초; 작업 프로세스가 접속할 때까지 기다리는 시간
+SPAWN_BACKLOG = 64
+CANCEL_GRACE = 5 # 초; 취소 요청 후 이 시간 안에 끝나지 않으면 프로세스를 강제 종료한다
+
+
+def pool_available():
+    # 이 인터프리터에서 yt_dlp를 import할 수 있어야 작업 프로세스를 쓸 수 있다
+    try:
+        import importlib.util
+        return importlib.util.find_spec('yt_dlp') is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# --- 작업 프로세스 쪽 ---------------------------------------------------
+
+class _WorkerLogger:
+    # yt-dlp 화면 출력을 'line' 메시지로 보낸다
+    def __init__(self, send):
+        self.send = send
+
+    def debug(self, message):
+        if not message.startswith('[debug] '):
+            self.send(('line', message))
+
+    def info(self, message):
+        self.send(('line', message))
+
+    def warning(self, message):
+        self.send(('line', f"WARNING: {message}"))
+
+    def error(self, message):
+        self.send(('line', message))
+
+
+def worker_main(host, port):
+    import yt_dlp
+    from yt_dlp.utils import DownloadCancelled
+
+    try:
+        conn = Client((host, port), authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    except OSError:
+        return # 접속하기 전에 풀이 닫혔다
+    send_lock = threading.Lock()
+    jobs = queue.Queue()
+    cancel_event = threading.Event()
+    bucket = TokenBucket() # 부모의 BandwidthManager가 정해 주는 이 작업의 속도
+
+    def send(message):
+        with send_lock: # 조각 병렬 다운로드(-N)에서는 hook이 여러 스레드에서 불린다
+            conn.send(message)
+
+    def reader():
+        # 다운로드 중에도 취소 메시지를 받을 수 있도록 따로 읽는다
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ('exit',)
+            if message[0] == 'cancel':
+                cancel_event.set()
+            elif message[0] == 'rate': # 실행 중인 작업에도 바로 적용된다
+                bucket.set_rate(message[1])
+            else:
+                if message[0] == 'download': # 뒤따르는 'rate'보다 먼저 적용되도록 여기서 정한다
+                    bucket.reset(message[2].get('bandwidth_rate'))
+                jobs.put(message)
+            if message[0] == 'exit':
+                cancel_event.set()
+                return
+
+    threading.Thread(target=reader, daemon=True).start()
+    send(('hello', os.getpid()))
+
+    while True:
+        message = jobs.get()
+        if message[0] == 'exit':
+            break
+        kind, url, options, info_path = message
+        cancel_event.clear()
+        last_sent = [0.0, None]
+        managed = 'bandwidth_rate' in options
+        options.pop('bandwidth_rate', None)
+        received = {} # 파일별로 지금까지 받은 바이트 (토큰 계산용)
+        received_lock = threading.Lock()
+
+        def throttle(d):
+            # 지난 hook 호출 뒤로 받은 만큼 토큰을 쓴다. 여기서 기다리는 동안 소켓을 읽지 않으므로
+            # TCP 흐름 제어로 실제 전송 속도가 줄어든다
+            downloaded = d.get('downloaded_bytes')
+            if d.get('status') != 'downloading' or downloaded is None:
+                return
+            name = d.get('tmpfilename') or d.get('filename')
+            with received_lock:
+                delta = downloaded - received.get(name, 0)
+                received[name] = downloaded
+            if delta > 0:
+                bucket.consume(delta, cancel_event)
+
+        def progress_hook(d):
+            if cancel_event.is_set():
+                raise DownloadCancelled('cancelled')
+            throttle(d)
+            if cancel_event.is_set():
+                raise DownloadCancelled('cancelled')
+            # --progress-delta처럼 같은 상태는 PROGRESS_DELTA마다 한 번만 보낸다
+            now = time.monotonic()
+            status = d.get('status')
+            if status == last_sent[1] and now - last_sent[0] < PROGRESS_DELTA:
+                return
+            last_sent[0], last_sent[1] = now, status
+            info = d.get('info_dict') or {}
+            send(('progress', status, d.get('downloaded_bytes'), d.get('total_bytes') or d.get('total_bytes_estimate'),
+                  d.get('speed'), d.get('eta'), info.get('extractor_key'), info.get('id'), d.get('tmpfilename')))
+
+        def postprocessor_hook(d):
+            if cancel_event.is_set():
+                raise DownloadCancelled('cancelled')
+            send(('postprocess', d.get('status'), d.get('postprocessor'), (d.get('info_dict') or {}).get('filepath')))
+
+        params = {'format': FORMAT_SELECTOR, 'noprogress': True}
+        if managed: # 고정된 작은 읽기 단위로 받아야 제한이 고르게 걸린다
+            params.update({'buffersize': BLOCK_SIZE, 'noresizebuffer': True})
+        params.update(options)
+        params.update({'logger': _WorkerLogger(send), 'progress_hooks': [progress_hook],
+                       'postprocessor_hooks': [postprocessor_hook]})
+        result = None
+        try:
+            with yt_dlp.YoutubeDL(params) as ydl:
+                if kind == 'extract':
+                    # 영상 정보와 포맷 선택 결과만 info_path에 쓴다 (InfoCache의 fetch)
+                    info = ydl.extract_info(url, download=False)
+                    with open(info_path, 'w', encoding='utf-8') as f:
+                        json.dump(ydl.sanitize_info(info), f)
+                    result = (info.get('extractor_key'), info.get('id'), info.get('format_id'), info.get('ext'))
+                    returncode = 0
+                elif info_path:
+                    returncode = ydl.download_with_info_file(info_path)
+                else:
+                    returncode = ydl.download([url])
+            error = None
+        except DownloadCancelled:
+            returncode, error = 1, 'cancelled'
+        except yt_dlp.utils.DownloadError as e:
+            returncode, error = 1, str(e)
+        except Exception as e:
+            returncode, error = 1, f"{type(e).__name__}: {e}"
+        send(('done', returncode, error, result))
+    conn.close()
+
+
+# --- 부모 쪽 -------------------------------------------------------------
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.conn.send(message)
+
+    def alive(self):
+        return self.process.poll() is None
+
+
+class WorkerHandle:
+    # 큐가 job.process로 다루는 객체 (subprocess.Popen의 poll/terminate와 같은 모양)
+    def __init__(self, worker):
+        self.worker = worker
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        # 먼저 hook에서 멈추도록 요청하고, 응답이 없으면 프로세스를 죽인다
+        try:
+            self.worker.send(('cancel',))
+        except (OSError, EOFError):
+            pass
+        timer = threading.Timer(CANCEL_GRACE, self._kill_if_running)
+        timer.daemon = True
+        timer.start()
+
+    def _kill_if_running(self):
+        if self.returncode is None and self.worker.alive():
+            self.worker.process.kill()
+
+
+class WorkerPool:
+    # run(job, on_line, on_state, on_progress)은 download_queue.run_yt_dlp와 같은 실행기 인터페이스다
+    def __init__(self, options=None, python=sys.executable, info_cache=None, bandwidth=None):
+        self.options = dict(options or {})
+        self.info_cache = info_cache # InfoCache; 있으면 영상 정보를 캐시해서 쓴다
+        self.bandwidth = bandwidth # BandwidthManager; 있으면 작업 프로세스 안에서 속도를 맞춘다
+        self.python = python
+        self.authkey = os.urandom(16)
+        # backlog: 여러 작업 프로세스가 한꺼번에 접속해도 거절되지 않게 한다
+        self.listener = Listener(('127.0.0.1', 0), backlog=SPAWN_BACKLOG, authkey=self.authkey)
+        self.idle = []
+        self.workers = set()
+        self.spawning = 0 # prewarm으로 띄우는 중인 프로세스 수
+        self.lock = threading.Lock()
+        self.connected = {} # pid -> conn; acceptor 스레드가 채운다
+        self.connected_cond = threading.Condition()
+        self.closed = False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+                _, pid = conn.recv()
+            except (OSError, EOFError):
+                if self.closed:
+                    return
+                continue
+            with self.connected_cond:
+                self.connected[pid] = conn
+                self.connected_cond.notify_all()
+
+    def _spawn(self):
+        host, port = self.listener.address
+        env = dict(os.environ)
+        env[AUTHKEY_ENV] = self.authkey.hex()
+        process = subprocess.Popen([self.python, os.path.abspath(__file__), '--worker', host, str(port)],
+                                   env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + SPAWN_TIMEOUT
+        with self.connected_cond:
+            while process.pid not in self.connected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or process.poll() is not None:
+                    process.kill()
+                    raise RuntimeError('yt-dlp worker process failed to start')
+                self.connected_cond.wait(min(remaining, 0.5))
+            conn = self.connected.pop(process.pid)
+        worker = _Worker(process, conn)
+        with self.lock:
+            self.workers.add(worker)
+        return worker
+
+    def prewarm(self, count):
+        # 백그라운드에서 작업 프로세스를 미리 띄워 둔다
+        def spawn():
+            try:
+                worker = self._spawn()
+            except RuntimeError:
+                return
+            finally:
+                with self.lock:
+                    self.spawning -= 1
+            self._checkin(worker)
+        with self.lock:
+            missing = max(0, count - len(self.workers) - self.spawning)
+            self.spawning += missing
+        for _ in range(missing):
+            threading.Thread(target=spawn, daemon=True).start()
+
+    def _checkout(self):
+        with self.lock:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.alive():
+                    return worker
+                self.workers.discard(worker)
+        return self._spawn()
+
+    def _checkin(self, worker):
+        with self.lock:
+            if self.closed or not worker.alive():
+                self.workers.discard(worker)
+                closing = self.closed
+            else:
+                self.idle.append(worker)
+                return
+        if closing and worker.alive():
+            self._stop_worker(worker)
+
+    def _discard(self, worker):
+        with self.lock:
+            self.workers.discard(worker)
+        if worker.alive():
+            worker.process.kill()
+
+    def run(self, job, on_line, on_state, on_progress):
+        worker = self._checkout()
+        handle = WorkerHandle(worker)
+        job.process = handle
+        if job.cancel_event.is_set(): # 작업이 배정되기 전에 취소된 경우
+            handle.returncode = 1
+            self._checkin(worker)
+            return 1
+        options = dict(self.options)
+        options.update(getattr(job, 'options', None) or {})
+        if job.directory:
+            options['paths'] = {'home': job.directory}
+        entry = None
+        try:
+            info_path = None
+            if self.info_cache is not None:
+                entry = self.info_cache.resolve(job.url, lambda url, path: self._extract(worker, url, path, options, on_line))
+                on_line(f"[info-cache] Using metadata for {entry.key}")
+                info_path = entry.path
+                if entry.format_id:
+                    options['format'] = entry.format_id
+            streams = split_format(job, entry)
+            if streams: # 스트림만 받고 병합은 후처리 단계에서
+                options['format'] = streams
+                options['outtmpl'] = {'default': STREAM_TEMPLATE}
+                on_progress = collector = StreamCollector(on_progress)
+            if self.bandwidth is not None:
+                options['concurrent_fragment_downloads'] = self.bandwidth.fragments
+                options['bandwidth_rate'] = self.bandwidth.register(job, lambda rate: worker.send(('rate', rate)))
+                report = on_progress
+
+                def on_progress(event):
+                    self.bandwidth.report(job, event)
+                    report(event)
+            returncode, error, _ = self._exchange(worker, ('download', job.url, options, info_path),
+                                                  on_line, on_state, on_progress)
+        except (EOFError, OSError):
+            # 작업 프로세스가 죽었다 (강제 취소 포함); 다음 작업에는 새 프로세스를 쓴다
+            handle.returncode = -1
+            self._discard(worker)
+            if job.cancel_event.is_set():
+                return -1
+            raise RuntimeError('yt-dlp worker process exited unexpectedly')
+        except RuntimeError:
+            handle.returncode = 1 # 정보 추출 실패; 작업 프로세스는 멀쩡하다
+            self._checkin(worker)
+            raise
+        finally:
+            if self.bandwidth is not None:
+                self.bandwidth.unregister(job) # 작업 프로세스를 돌려주기 전에 속도 변경 메시지를 멈춘다
+            if entry is not None:
+                self.info_cache.release(entry)
+        handle.returncode = returncode
+        self._checkin(worker)
+        if entry is not None and returncode != 0 and not job.cancel_event.is_set():
+            self.info_cache.invalidate(entry) # 만료된 스트림 주소일 수 있으니 다음에는 새로 받는다
+        if streams and returncode == 0:
+            job.merge = collector.task(entry.ext)
+        if error and error != 'cancelled' and not error.startswith('ERROR'):
+            on_line(f"ERROR: {error}")
+        return returncode
+
+    def _extract(self, worker, url, path, options, on_line):
+        returncode, error, result = self._exchange(worker, ('extract', url, options, path),
+                                                   on_line, lambda state: None, lambda event: None)
+        if returncode != 0:
+            raise RuntimeError(error or 'metadata extraction failed')
+        return result
+
+    def _exchange(self, worker, message, on_line, on_state, on_progress):
+        # 작업 프로세스에 요청 하나를 보내고 'done'이 올 때까지 메시지를 넘긴다
+        worker.send(message)
+        while True:
+            message = worker.conn.recv()
+            kind = message[0]
+            if kind == 'line':
+                on_line(message[1])
+            elif kind == 'progress':
+                status, downloaded, total, speed, eta, extractor, video_id, filename = message[1:]
+                phase = PHASE_DOWNLOADED if status == 'finished' else PHASE_DOWNLOADING
+                on_progress(ProgressEvent(phase, downloaded, total, speed, eta,
+                                          extractor=extractor, video_id=video_id, filename=filename))
+            elif kind == 'postprocess':
+                event = ProgressEvent(PHASE_POSTPROCESSING, postprocessor=message[2], filename=message[3])
+                if event.is_merge:
+                    on_state(MERGING)
+                on_progress(event)
+            elif kind == 'done':
+                return message[1:]
+
+    def _stop_worker(self, worker):
+        try:
+            worker.send(('exit',))
+        except (OSError, EOFError):
+            pass
+        try:
+            worker.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            busy = [worker for worker in self.workers if worker not in idle]
+        for worker in idle:
+            self._stop_worker(worker)
+        for worker in busy:
+            if worker.alive():
+                worker.process.kill()
+        self.listener.close()
+
+
+if __name__ == '__main__' and len(sys.argv) == 4 and sys.argv[1] == '--worker':
+    worker_main(sys.argv[2], int(sys.argv[3]))